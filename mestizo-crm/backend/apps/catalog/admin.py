@@ -8,3 +8,12 @@ class CatalogItemAdmin(admin.ModelAdmin):
     list_filter = ('type', 'category', 'active')
     search_fields = ('name', 'description', 'category')
     list_editable = ('price_ref', 'active')
+    actions = ['propagate_prices']
+    
+    @admin.action(description='Actualizar precios en cotizaciones en borrador')
+    def propagate_prices(self, request, queryset):
+        from apps.quotes.pricing import propagate_catalog_prices
+        result = propagate_catalog_prices(list(queryset.values_list('pk', flat=True)))
+        self.message_user(
+            request, f'{result.rows} líneas actualizadas en {result.quotes} cotizaciones en borrador'
+        )
@@ -5,3 +5,7 @@ class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.catalog'
     verbose_name = 'Catálogo'
+    
+    def ready(self):
+        from . import signals
+        signals.connect_signals()
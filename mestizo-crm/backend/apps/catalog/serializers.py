@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.common.sparse import SparseModelSerializer
 from .models import CatalogItem
 
 
-class CatalogItemSerializer(serializers.ModelSerializer):
+class CatalogItemSerializer(SparseModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     
     class Meta:
@@ -17,3 +18,9 @@ class CatalogItemSerializer(serializers.ModelSerializer):
         if value < 0:
             raise serializers.ValidationError("El precio de referencia no puede ser negativo")
         return value
+
+
+class PricePropagationSerializer(serializers.Serializer):
+    """Which catalog items to propagate (all when omitted) and whether to only report."""
+    items = serializers.ListField(child=serializers.IntegerField(), required=False)
+    dry_run = serializers.BooleanField(default=False)
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+
+from . import snapshot
+
+
+def connect_signals():
+    from .models import CatalogItem
+    
+    post_save.connect(snapshot.invalidate, sender=CatalogItem, dispatch_uid='catalog_snapshot_save')
+    post_delete.connect(snapshot.invalidate, sender=CatalogItem, dispatch_uid='catalog_snapshot_delete')
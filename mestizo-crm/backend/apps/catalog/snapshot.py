@@ -0,0 +1,81 @@
+"""
+The active catalog as one precomputed JSON document.
+
+The rendered body, its gzip encoding and a strong ETag (hash of the body)
+are kept in process memory for the catalog version they were built from.
+CatalogItem writes bump the version in the shared cache, so every process
+rebuilds on its next request; CATALOG_SNAPSHOT_TTL bounds staleness for
+writes that bypass signals (queryset updates).
+"""
+import gzip
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.common import versions
+from .models import CatalogItem
+from .serializers import CatalogItemSerializer
+
+
+VERSION_KEY = 'catalog:version'
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    etag: str
+    body: bytes
+    gzipped: bytes
+    built_at: float
+
+
+_current = None
+_lock = threading.Lock()
+
+
+def invalidate(**kwargs):
+    """Signal receiver: every process rebuilds its snapshot on next use."""
+    # Again once committed: a snapshot built in between holds the old rows
+    # and would be tagged with the version bumped here.
+    versions.bump(VERSION_KEY)
+    transaction.on_commit(partial(versions.bump, VERSION_KEY))
+
+
+def build(version):
+    items = CatalogItem.objects.filter(active=True).order_by('category', 'name')
+    results = CatalogItemSerializer(items, many=True).data
+    body = JSONRenderer().render({'version': version, 'count': len(results), 'results': results})
+    return Snapshot(
+        version=version,
+        etag=f'"{hashlib.sha256(body).hexdigest()}"',
+        body=body,
+        # mtime=0 keeps the encoding identical across processes.
+        gzipped=gzip.compress(body, compresslevel=9, mtime=0),
+        built_at=time.monotonic(),
+    )
+
+
+def is_fresh(snapshot, version):
+    return (
+        snapshot is not None and snapshot.version == version
+        and time.monotonic() - snapshot.built_at < settings.CATALOG_SNAPSHOT_TTL
+    )
+
+
+def get_snapshot():
+    """The current snapshot: one cache read when fresh, one query when not."""
+    global _current
+    version = versions.get_version(VERSION_KEY)
+    if is_fresh(_current, version):
+        return _current
+    with _lock:
+        # Another thread may have rebuilt it while we waited.
+        if not is_fresh(_current, version):
+            _current = build(version)
+        return _current
@@ -1,17 +1,60 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.sparse import SparseQuerysetMixin
+from apps.search.filters import IndexedSearchFilter
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 
 from .models import CatalogItem
-from .serializers import CatalogItemSerializer
+from .snapshot import get_snapshot
+from .serializers import CatalogItemSerializer, PricePropagationSerializer
 
 
-class CatalogItemViewSet(viewsets.ModelViewSet):
+class CatalogItemViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for CatalogItem CRUD operations."""
     queryset = CatalogItem.objects.all()
     serializer_class = CatalogItemSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
     filterset_fields = ['type', 'category', 'active']
     search_fields = ['name', 'description', 'category']
     ordering_fields = ['name', 'price_ref', 'created_at']
     ordering = ['category', 'name']
+    
+    @action(detail=False, methods=['get'])
+    def snapshot(self, request):
+        """
+        Every active item in one precomputed JSON document (no pagination).
+        
+        Served gzipped when accepted, with a strong ETag so clients
+        revalidate with If-None-Match and mostly get 304.
+        """
+        current = get_snapshot()
+        if current.etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = HttpResponse(current.gzipped, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(current.body, content_type='application/json')
+        response['ETag'] = current.etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+    
+    @action(detail=False, methods=['post'])
+    def propagate_prices(self, request):
+        """Push current reference prices to draft quotes (all items or `items`)."""
+        from apps.quotes.pricing import propagate_catalog_prices
+        serializer = PricePropagationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = propagate_catalog_prices(
+            serializer.validated_data.get('items'), dry_run=serializer.validated_data['dry_run']
+        )
+        return Response({'rows': result.rows, 'quotes': result.quotes, 'dry_run': result.dry_run})
@@ -0,0 +1 @@
+# Shared API building blocks (pagination, mixins) used by every app
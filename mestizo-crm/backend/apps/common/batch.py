@@ -0,0 +1,135 @@
+"""
+Several API calls in one round trip: POST /api/batch/.
+
+Each sub-request is resolved against the API URLconf and handed straight to
+its view. Middleware is skipped and so is authentication: the user and token
+of the batch request are forced onto every sub-request, so the JWT is decoded
+once. A run of consecutive reads (GET/HEAD) goes to a thread pool of
+BATCH_WORKERS; a write waits for everything before it and runs alone, so
+reads listed after a write see its result.
+"""
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api'
+READ_METHODS = ('GET', 'HEAD')
+METHODS = (*READ_METHODS, 'POST', 'PUT', 'PATCH', 'DELETE')
+# Headers of the batch request that describe its own body or cache state.
+PRIVATE_META = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+class BatchError(ValueError):
+    """The batch envelope itself is invalid; the message is shown to the client."""
+
+
+def parse(data):
+    """Validate the envelope; returns the list of sub-requests."""
+    requests = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(requests, list) or not requests:
+        raise BatchError('requests debe ser una lista no vacía')
+    if len(requests) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(f'Se admiten como máximo {settings.BATCH_MAX_REQUESTS} solicitudes por lote')
+    for position, item in enumerate(requests):
+        if not isinstance(item, dict) or not isinstance(item.get('url'), str) or not item['url'].startswith('/'):
+            raise BatchError(f'La solicitud {position} necesita una url que empiece con /')
+        if str(item.get('method', 'GET')).upper() not in METHODS:
+            raise BatchError(f'La solicitud {position} tiene un método no soportado')
+        if not isinstance(item.get('headers', {}), dict):
+            raise BatchError(f'Los headers de la solicitud {position} deben ser un objeto')
+    return requests
+
+
+def build_request(request, item):
+    """A WSGIRequest for `item`, carrying the batch request's authentication."""
+    path, _, query = item['url'].partition('?')
+    body = json.dumps(item['body']).encode() if item.get('body') is not None else b''
+    environ = {key: value for key, value in request.META.items() if key not in PRIVATE_META}
+    environ.update({
+        'REQUEST_METHOD': str(item.get('method', 'GET')).upper(),
+        'PATH_INFO': API_PREFIX + path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    })
+    for name, value in item.get('headers', {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+    sub_request = WSGIRequest(environ)
+    # Picked up by rest_framework.request.Request instead of the authenticators.
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    sub_request.user = request.user
+    return sub_request
+
+
+def error(code, message):
+    return {'status': code, 'headers': {}, 'body': {'error': message}}
+
+
+def dispatch(request, item):
+    """Run one sub-request; returns its {'status', 'headers', 'body'} entry."""
+    sub_request = build_request(request, item)
+    try:
+        match = resolve(sub_request.path_info)
+    except Resolver404:
+        return error(status.HTTP_404_NOT_FOUND, 'Ruta no encontrada')
+    if match.url_name == 'batch':
+        return error(status.HTTP_400_BAD_REQUEST, 'No se puede anidar un lote')
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    except Exception:
+        logger.exception('Batch sub-request %s %s failed', sub_request.method, sub_request.get_full_path())
+        return error(status.HTTP_500_INTERNAL_SERVER_ERROR, 'Error interno')
+    body = None
+    if response.get('Content-Type', '').startswith('application/json') and response.content:
+        body = json.loads(response.content)
+    headers = {name: value for name, value in response.items() if name not in ('Content-Type', 'Content-Length')}
+    return {'status': response.status_code, 'headers': headers, 'body': body}
+
+
+def dispatch_in_thread(request, item):
+    try:
+        return dispatch(request, item)
+    finally:
+        # Like Django after a request: keep the thread's connection only within CONN_MAX_AGE.
+        close_old_connections()
+
+
+@lru_cache(maxsize=None)
+def get_pool():
+    return ThreadPoolExecutor(max_workers=settings.BATCH_WORKERS, thread_name_prefix='batch')
+
+
+def run(request, items):
+    """Responses for `items`, in order."""
+    responses, reads = [], []
+    
+    def flush():
+        if len(reads) > 1 and settings.BATCH_WORKERS > 1:
+            responses.extend(get_pool().map(lambda item: dispatch_in_thread(request, item), reads))
+        else:
+            responses.extend(dispatch(request, item) for item in reads)
+        reads.clear()
+    
+    for item in items:
+        if str(item.get('method', 'GET')).upper() in READ_METHODS:
+            reads.append(item)
+            continue
+        flush()
+        responses.append(dispatch(request, item))
+    flush()
+    return responses
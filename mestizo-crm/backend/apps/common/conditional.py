@@ -0,0 +1,137 @@
+"""
+Conditional GET for model viewsets.
+
+ConditionalGetMixin computes validators for list and detail responses
+without serializing anything and answers If-None-Match / If-Modified-Since
+with 304 Not Modified:
+
+- page-number lists: the newest `updated_at` and the row count of the
+  filtered queryset (one aggregate query, which replaces the paginator's
+  COUNT), the query string and the requesting user;
+- keyset lists (?pagination=cursor): the ids and `updated_at` of the fetched
+  page and its links, so no query spans the whole queryset; a 304 saves the
+  serialization only;
+- details: the row's `updated_at` and the query string.
+
+Both also carry the last-write stamp of the model and of the models its
+serializers embed (DEPENDENCIES), kept in the shared cache and set on
+post_save / post_delete, both before and after the writer commits. That
+catches nested rows (a customer's contacts), denormalised names and saves
+that leave `updated_at` alone (update_fields).
+Writes that bypass signals call touch() themselves. If-Modified-Since has
+one-second resolution, so clients should prefer the ETag.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from . import versions
+
+
+# Models whose responses embed fields of other models, and those models.
+DEPENDENCIES = {
+    'customers.Customer': ['customers.Contact', 'customers.Address', 'users.User'],
+    'sales.Lead': ['customers.Customer'],
+    'sales.Opportunity': ['customers.Customer', 'users.User'],
+    'quotes.Quote': ['quotes.QuoteItem', 'customers.Customer', 'sales.Opportunity'],
+    'projects.Project': ['projects.ProjectMedia', 'customers.Customer', 'quotes.Quote'],
+    'catalog.CatalogItem': [],
+}
+
+
+def stamp_key(label):
+    return f'conditional:{label}'
+
+
+def tracked_labels():
+    return sorted(set(DEPENDENCIES).union(*DEPENDENCIES.values()))
+
+
+def touch(sender, **kwargs):
+    """Signal receiver (or direct call with a model): its rows just changed."""
+    key = stamp_key(sender._meta.label)
+    # Before commit and again after it: a reader that sees the new stamp with
+    # the old rows (e.g. an item saved before its quote's total is updated)
+    # gets an ETag the second stamp invalidates.
+    versions.touch(key)
+    transaction.on_commit(partial(versions.touch, key))
+
+
+def last_write(model):
+    """Microsecond timestamp of the last write to `model` or its dependencies."""
+    label = model._meta.label
+    return max(versions.get_version(stamp_key(name)) for name in [label, *DEPENDENCIES.get(label, [])])
+
+
+def connect_signals():
+    for label in tracked_labels():
+        model = apps.get_model(label)
+        post_save.connect(touch, sender=model, dispatch_uid=f'conditional_save_{label}')
+        post_delete.connect(touch, sender=model, dispatch_uid=f'conditional_delete_{label}')
+
+
+class ConditionalGetMixin:
+    """Answer list and detail GETs with 304 when the client's copy is current."""
+    conditional_field = 'updated_at'
+    
+    def list(self, request, *args, **kwargs):
+        use_keyset = getattr(self.paginator, 'use_keyset', None)
+        if use_keyset and use_keyset(request):
+            return self.keyset_list(request)
+        summary = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last=Max(self.conditional_field), count=Count('pk')
+        )
+        # FlexiblePagination reuses the count instead of running its own.
+        self.list_count = summary['count']
+        etag, last_modified = self.get_validators(request, summary['last'], summary['count'], request.user.pk)
+        return self.conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+    
+    def keyset_list(self, request):
+        """Keyset pages skip the aggregate: the validators come from the fetched rows."""
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        keyset = self.paginator.keyset
+        rows = [(row.pk, getattr(row, self.conditional_field)) for row in page]
+        etag, last_modified = self.get_validators(
+            request, max((modified for _, modified in rows if modified), default=None),
+            [(pk, modified and modified.isoformat()) for pk, modified in rows],
+            keyset.next_link, keyset.previous_link, keyset.count, request.user.pk,
+        )
+        return self.conditional_response(
+            request, etag, last_modified, lambda: self.get_paginated_response(self.get_serializer(page, many=True).data)
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_validators(request, getattr(instance, self.conditional_field), instance.pk)
+        return self.conditional_response(
+            request, etag, last_modified, lambda: Response(self.get_serializer(instance).data)
+        )
+    
+    def get_validators(self, request, modified, *parts):
+        """(weak ETag, Last-Modified timestamp) for the given row state."""
+        stamp = last_write(self.queryset.model)
+        last_modified = datetime.fromtimestamp(stamp / 1e6, tz=timezone.utc)
+        if modified is not None:
+            last_modified = max(last_modified, modified)
+        key = repr([stamp, modified and modified.isoformat(), *parts, sorted(request.query_params.lists())])
+        return f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"', int(last_modified.timestamp())
+    
+    def conditional_response(self, request, etag, last_modified, render):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Browsers may keep the response but must revalidate before reusing it.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
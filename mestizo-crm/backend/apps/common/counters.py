@@ -0,0 +1,20 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def increment(model, lookup, defaults=None, **deltas):
+    """
+    Add `deltas` to the counter row matching `lookup`, creating it if needed.
+    
+    The UPDATE uses F() expressions so concurrent writers never lose counts;
+    `lookup` must match a unique constraint so a racing INSERT fails cleanly.
+    """
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **deltas)
+    except IntegrityError:
+        # A concurrent transaction created the row first.
+        model.objects.filter(**lookup).update(**changes)
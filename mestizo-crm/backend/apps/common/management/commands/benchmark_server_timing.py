@@ -0,0 +1,41 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of Server-Timing instrumentation on an API URL'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/quotes/', help='API URL to request')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per round and sample rate')
+        parser.add_argument('--rounds', type=int, default=5, help='Alternating rounds per sample rate')
+    
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('No hay usuarios activos para autenticar')
+        client = APIClient()
+        client.force_authenticate(user)
+        url, count = options['url'], options['requests']
+        
+        timings = {0: [], 1: []}
+        with override_settings(ALLOWED_HOSTS=['*']):
+            if client.get(url).status_code != 200:
+                raise CommandError(f'{url} no responde 200')
+            # Alternate the rates so drift (caches, autovacuum) hits both alike.
+            for _ in range(options['rounds']):
+                for rate in timings:
+                    with override_settings(SERVER_TIMING_SAMPLE_RATE=rate):
+                        started = time.perf_counter()
+                        for _ in range(count):
+                            client.get(url)
+                        timings[rate].append((time.perf_counter() - started) / count)
+        
+        plain, sampled = (statistics.median(timings[rate]) for rate in (0, 1))
+        self.stdout.write(f'Sample rate 0: {plain * 1e6:.0f} us/request')
+        self.stdout.write(f'Sample rate 1: {sampled * 1e6:.0f} us/request')
+        self.stdout.write(self.style.SUCCESS(f'Instrumentation overhead on {url}: {(sampled / plain - 1) * 100:.2f}%'))
@@ -0,0 +1,241 @@
+"""
+Pagination for all list endpoints.
+
+By default lists are paginated by page number, as before, but honour
+`?page_size=` (and its alias `?limit=`). Sending `?pagination=cursor` (or a
+`?cursor=` token) switches the same endpoint to keyset pagination: rows are
+fetched with a WHERE on the view's ordering instead of OFFSET, no COUNT(*)
+runs unless `?count=exact` or `?count=estimate` is asked for, and `id` is
+appended to the ordering as a stable tiebreak.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import partial
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def positive_int(value, cutoff=None):
+    value = int(value)
+    if value <= 0:
+        raise ValueError(value)
+    return min(value, cutoff) if cutoff else value
+
+
+def estimate_count(queryset):
+    """Planner row estimate on PostgreSQL; an exact COUNT(*) elsewhere."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over an arbitrary ordering.
+    
+    NULLs sort as the largest value (PostgreSQL's default, forced on other
+    databases) so the seek predicate and btree indexes agree. The cursor
+    carries the ordering values of the boundary row.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Cursor inválido'
+    
+    def __init__(self, page_size):
+        self.page_size = page_size
+    
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        if any(issubclass(backend, OrderingFilter) for backend in getattr(view, 'filter_backends', [])):
+            ordering = OrderingFilter().get_ordering(request, queryset, view)
+        if not ordering:
+            ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        
+        keys = []
+        for field in ordering:
+            name = field.lstrip('-')
+            name = 'id' if name == 'pk' else name
+            keys.append((name, field.startswith('-')))
+        if not any(name == 'id' for name, _ in keys):
+            keys.append(('id', keys[-1][1] if keys else False))
+        return keys
+    
+    def is_nullable(self, model, name):
+        try:
+            return model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+    
+    def attname(self, model, name):
+        try:
+            return model._meta.get_field(name).attname
+        except FieldDoesNotExist:
+            return name
+    
+    def order_by(self, keys, reverse):
+        return [
+            F(name).desc(nulls_first=True) if descending != reverse else F(name).asc(nulls_last=True)
+            for name, descending in keys
+        ]
+    
+    def seek_filter(self, model, keys, values, reverse):
+        """Rows strictly after (or, when reverse, before) the cursor row."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(keys, values):
+            if descending != reverse:
+                # Walking down: NULLs (the largest values) are already behind.
+                if value is None:
+                    beyond = Q(**{f'{name}__isnull': False})
+                else:
+                    beyond = Q(**{f'{name}__lt': value})
+            else:
+                # Walking up: NULLs are still ahead.
+                if value is None:
+                    beyond = None
+                else:
+                    beyond = Q(**{f'{name}__gt': value})
+                    if self.is_nullable(model, name):
+                        beyond |= Q(**{f'{name}__isnull': True})
+            if beyond is not None:
+                condition |= equal & beyond
+            equal &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return condition
+    
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            return data['v'], bool(data.get('r'))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+    
+    def encode_cursor(self, row, reverse):
+        values = [encode_value(getattr(row, self.attname(type(row), name))) for name, _ in self.keys]
+        token = base64.urlsafe_b64encode(json.dumps({'v': values, 'r': reverse}).encode('utf-8'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token.decode('ascii'))
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keys = self.get_ordering(request, queryset, view)
+        cursor = self.decode_cursor(request)
+        values, reverse = cursor if cursor else (None, False)
+        if values is not None and len(values) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        
+        self.count = None
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = queryset.count()
+        elif count_mode == 'estimate':
+            self.count = estimate_count(queryset)
+        
+        page = queryset.order_by(*self.order_by(self.keys, reverse))
+        if values is not None:
+            page = page.filter(self.seek_filter(queryset.model, self.keys, values, reverse))
+        rows = list(page[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+        
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else values is not None
+        self.next_link = self.encode_cursor(rows[-1], False) if rows and has_next else None
+        self.previous_link = self.encode_cursor(rows[0], True) if rows and has_previous else None
+        return rows
+    
+    def get_paginated_response(self, data):
+        payload = {'next': self.next_link, 'previous': self.previous_link}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+
+class CountedPaginator(Paginator):
+    """Django paginator that reuses a row count the view already has."""
+    
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+class FlexiblePagination(PageNumberPagination):
+    """Page-number pagination with `?page_size`/`?limit` and opt-in keyset mode."""
+    page_size_query_param = 'page_size'
+    limit_query_param = 'limit'
+    max_page_size = 500
+    mode_query_param = 'pagination'
+    
+    def get_page_size(self, request):
+        for param in (self.page_size_query_param, self.limit_query_param):
+            try:
+                return positive_int(request.query_params[param], cutoff=self.max_page_size)
+            except (KeyError, ValueError):
+                continue
+        return self.page_size
+    
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = KeysetPagination(self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        # Views that counted the rows already (ConditionalGetMixin) skip the COUNT.
+        self.django_paginator_class = partial(CountedPaginator, count=getattr(view, 'list_count', None))
+        return super().paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+    
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        for name, description in [
+            (self.limit_query_param, 'Alias of page_size.'),
+            (self.mode_query_param, 'Set to "cursor" for keyset pagination.'),
+            (KeysetPagination.cursor_query_param, 'Keyset cursor from a previous next/previous link.'),
+            (KeysetPagination.count_query_param, 'Keyset mode only: "exact" or "estimate" adds a count.'),
+        ]:
+            parameters.append({
+                'name': name, 'required': False, 'in': 'query',
+                'description': description, 'schema': {'type': 'string'},
+            })
+        return parameters
@@ -0,0 +1,157 @@
+"""
+Sparse fieldsets (`?fields=`) and opt-in expansion (`?expand=`).
+
+On GET requests the top-level serializer keeps only the fields named in
+?fields= (all of them when absent). Fields listed in the serializer's
+`Meta.expandable_fields`, nested relations, are left out unless named in
+?expand= (or ?fields=). Writes and serializers used without a request keep
+their full representation.
+
+SparseQuerysetMixin makes list and detail querysets follow the same
+choice: `.only()` the columns the kept fields read, select_related the
+forward relations they traverse, and prefetch only expanded relations.
+Fields whose source cannot be mapped to columns (properties, method
+fields) need a `Meta.field_sources` entry; without one the columns are
+not restricted.
+"""
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import SAFE_METHODS
+
+from .timing import TimedSerializerMixin
+
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+DISPLAY_METHOD = re.compile(r'get_(\w+)_display$')
+
+
+def param_names(request, param):
+    """Comma-separated names of a query parameter, or None when it is absent."""
+    if request is None or request.method not in SAFE_METHODS or param not in request.query_params:
+        return None
+    return {name.strip() for name in request.query_params[param].split(',') if name.strip()}
+
+
+def is_wanted(request, name, expandable=False):
+    """Whether field `name` is part of the response the request asks for."""
+    fields = param_names(request, FIELDS_PARAM)
+    if expandable:
+        return name in (param_names(request, EXPAND_PARAM) or set()) or name in (fields or set())
+    return fields is None or name in fields
+
+
+class SparseFieldsMixin:
+    """Serializer mixin applying ?fields= and ?expand= to the top-level serializer."""
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self.is_root():
+            return fields
+        expandable = set(getattr(self.Meta, 'expandable_fields', ()))
+        return {
+            name: field for name, field in fields.items()
+            if is_wanted(request, name, expandable=name in expandable)
+        }
+    
+    def is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+class SparseModelSerializer(SparseFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    """Base of the apps' model serializers: sparse fieldsets and Server-Timing."""
+
+
+def model_path(model, attrs):
+    """'customer__name' for ['customer', 'name'], or None if not made of model fields."""
+    path = []
+    for position, attr in enumerate(attrs):
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            match = DISPLAY_METHOD.match(attr)
+            if not match or position != len(attrs) - 1:
+                return None
+            field = model._meta.get_field(match.group(1))
+        if field.many_to_many or field.one_to_many:
+            return None
+        path.append(field.name)
+        model = field.related_model
+    return '__'.join(path)
+
+
+def load_plan(serializer, queryset):
+    """(columns for .only() or None, relations to select, relations to prefetch)."""
+    model = queryset.model
+    hints = getattr(getattr(serializer, 'Meta', None), 'field_sources', {})
+    columns, related, prefetch = {model._meta.pk.name}, set(), set()
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.ListSerializer):
+            prefetch.add(field.source)
+            continue
+        if name in hints:
+            paths = hints[name]
+        elif field.source in queryset.query.annotations:
+            continue
+        elif field.source == '*' or isinstance(field, serializers.SerializerMethodField):
+            paths = None
+        else:
+            path = model_path(model, field.source_attrs)
+            paths = [path] if path else None
+        if paths is None:
+            columns = None
+        for path in paths or ():
+            if columns is not None:
+                columns.add(path)
+            if '__' in path:
+                related.add(path.rsplit('__', 1)[0])
+    return columns, related, prefetch
+
+
+class SparseQuerysetMixin:
+    """
+    Viewset mixin loading only what the list/retrieve serializer will read.
+    
+    `?fields=` and `?expand=` shape the serializer (SparseModelSerializer);
+    this narrows the SELECT to match and prefetches expanded relations only.
+    """
+    sparse_actions = ('list', 'retrieve')
+    
+    def wants(self, name, expandable=False):
+        """Whether the response includes field `name`, e.g. to skip an annotation."""
+        return is_wanted(self.request, name, expandable)
+    
+    def filter_queryset(self, queryset):
+        # After get_queryset() and the filters, so annotations and ordering are known.
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.sparse_actions or self.request.method not in SAFE_METHODS:
+            return queryset
+        columns, related, prefetch = load_plan(self.get_serializer(), queryset)
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        if columns is None:
+            return queryset.select_related(*sorted(related)) if related else queryset
+        # Validators, ordering and cursors read these whatever the fields.
+        columns.update(self.required_columns(queryset))
+        return queryset.select_related(None).select_related(*sorted(related)).only(*sorted(columns))
+    
+    def required_columns(self, queryset):
+        names = [getattr(self, 'conditional_field', None)]
+        if any(issubclass(backend, OrderingFilter) for backend in self.filter_backends):
+            names += OrderingFilter().get_ordering(self.request, queryset, self) or []
+        names += list(queryset.query.order_by or queryset.model._meta.ordering)
+        columns = set()
+        for name in filter(None, names):
+            path = model_path(queryset.model, name.lstrip('-').split('__'))
+            if path and '__' not in path:
+                columns.add(path)
+        return columns
@@ -0,0 +1,138 @@
+"""
+Per-request performance breakdown: Server-Timing header and log line.
+
+ServerTimingMiddleware samples SERVER_TIMING_SAMPLE_RATE of the requests.
+For a sampled request it records, on the request's thread:
+
+- db: every statement through connection.execute_wrapper, with its count and
+  the duplicates (the same SQL run again with any parameters, the N+1
+  signature);
+- serialize: the top-level to_representation() of the apps' model
+  serializers, net of the SQL it ran;
+- render: TimedJSONRenderer;
+- total: the whole middleware chain below it.
+
+It answers with `Server-Timing: db;dur=..;desc="..", serialize;dur=..,
+render;dur=.., total;dur=..` and logs one JSON line on the
+`apps.common.timing` logger. Sub-requests a batch runs on its thread pool
+are not included.
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters of one sampled request. Durations are in seconds."""
+    
+    def __init__(self):
+        self.sql_time = 0.0
+        self.statements = Counter()
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+    
+    @property
+    def queries(self):
+        return sum(self.statements.values())
+    
+    @property
+    def duplicates(self):
+        return self.queries - len(self.statements)
+    
+    def execute(self, execute, sql, params, many, context):
+        """connection.execute_wrapper() hook."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.statements[sql] += 1
+    
+    def header(self, total):
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries, {self.duplicates} duplicates"',
+            f'serialize;dur={self.serialize_time * 1000:.2f}',
+            f'render;dur={self.render_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+    
+    def summary(self, request, response, total):
+        summary = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(self.sql_time * 1000, 2),
+            'queries': self.queries,
+            'duplicate_queries': self.duplicates,
+            'serialize_ms': round(self.serialize_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+        }
+        if self.duplicates:
+            sql, count = self.statements.most_common(1)[0]
+            summary['most_repeated'] = {'sql': sql[:200], 'count': count}
+        return summary
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.execute))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = metrics.header(total)
+        logger.info(json.dumps(metrics.summary(request, response, total)))
+        return response
+
+
+class TimedSerializerMixin:
+    """Adds the time of top-level to_representation() calls to the request's metrics."""
+    
+    def to_representation(self, instance):
+        metrics = _current.get()
+        parent = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if metrics is None or parent is not None:
+            return super().to_representation(instance)
+        started, sql_before = time.perf_counter(), metrics.sql_time
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += time.perf_counter() - started - (metrics.sql_time - sql_before)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics.render_time += time.perf_counter() - started
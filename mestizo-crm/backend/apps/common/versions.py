@@ -0,0 +1,43 @@
+"""
+Version counters kept in the shared cache.
+
+Readers embed the version in their cache keys (or compare it with the one
+their cached value was built for), writers bump it, so one increment makes
+every derived value stale without knowing which ones exist.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def initial_version():
+    # Time-based rather than 1, so a counter lost with the cache (restart,
+    # eviction) never comes back at a value some process already built for.
+    return time.time_ns() // 1000
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        version = initial_version()
+        if not cache.add(key, version, timeout=None):
+            # Another process initialised it first.
+            version = cache.get(key, version)
+    return version
+
+
+def touch(key):
+    """Set the counter to the current time, so it doubles as a last-write stamp."""
+    version = initial_version()
+    cache.set(key, version, timeout=None)
+    return version
+
+
+def bump(key):
+    """Increment the counter; returns the new version."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = initial_version()
+        cache.add(key, version, timeout=None)
+        return version
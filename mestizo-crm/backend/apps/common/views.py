@@ -0,0 +1,22 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import batch
+
+
+class BatchView(APIView):
+    """
+    Several API calls in one request, for pages that load a few lists at once.
+    
+    Body: {"requests": [{"method": "GET", "url": "/quotes/?status=SENT"}, ...]}
+    with URLs relative to /api and optional "body" and "headers". Answers
+    {"responses": [{"status", "headers", "body"}, ...]} in the same order.
+    """
+    
+    def post(self, request):
+        try:
+            items = batch.parse(request.data)
+        except batch.BatchError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'responses': batch.run(request, items)})
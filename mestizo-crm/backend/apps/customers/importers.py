@@ -0,0 +1,22 @@
+from apps.imports.importers import import_csv
+
+from .models import Customer
+
+
+def build_customer(row, user):
+    return Customer(
+        name=row.get('name', row.get('nombre', '')),
+        type=row.get('type', row.get('tipo', 'INDIVIDUAL')).upper(),
+        phone=row.get('phone', row.get('telefono', '')),
+        email=row.get('email', ''),
+        notes=row.get('notes', row.get('notas', '')),
+        created_by=user,
+    )
+
+
+def import_customers_csv(uploaded_file, user, chunk_size=None, on_progress=None):
+    """Stream customers from a CSV upload, writing them in chunks."""
+    return import_csv(
+        uploaded_file, lambda row: build_customer(row, user),
+        chunk_size=chunk_size, on_progress=on_progress
+    )
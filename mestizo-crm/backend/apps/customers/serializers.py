@@ -1,36 +1,34 @@
 from rest_framework import serializers
+from apps.common.sparse import SparseModelSerializer
 from .models import Customer, Contact, Address
 
 
-class ContactSerializer(serializers.ModelSerializer):
+class ContactSerializer(SparseModelSerializer):
     class Meta:
         model = Contact
         fields = ['id', 'customer', 'name', 'phone', 'email', 'role_title', 'created_at']
         read_only_fields = ['id', 'created_at']
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class AddressSerializer(SparseModelSerializer):
     class Meta:
         model = Address
         fields = ['id', 'customer', 'label', 'city', 'zone', 'details', 'lat', 'lng', 'created_at']
         read_only_fields = ['id', 'created_at']
 
 
-class CustomerListSerializer(serializers.ModelSerializer):
+class CustomerListSerializer(SparseModelSerializer):
     """Serializer for customer list view."""
-    contacts_count = serializers.SerializerMethodField()
+    contacts_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Customer
         fields = ['id', 'type', 'name', 'phone', 'email', 'created_at', 'contacts_count']
         read_only_fields = ['id', 'created_at']
-    
-    def get_contacts_count(self, obj):
-        return obj.contacts.count()
 
 
-class CustomerDetailSerializer(serializers.ModelSerializer):
-    """Serializer for customer detail with nested contacts and addresses."""
+class CustomerDetailSerializer(SparseModelSerializer):
+    """Serializer for customer detail; contacts and addresses via ?expand=."""
     contacts = ContactSerializer(many=True, read_only=True)
     addresses = AddressSerializer(many=True, read_only=True)
     created_by_email = serializers.EmailField(source='created_by.email', read_only=True)
@@ -43,6 +41,7 @@ class CustomerDetailSerializer(serializers.ModelSerializer):
             'contacts', 'addresses'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
+        expandable_fields = ['contacts', 'addresses']
     
     def create(self, validated_data):
         request = self.context.get('request')
@@ -1,35 +1,45 @@
-import csv
-import io
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.sparse import SparseQuerysetMixin
+from apps.search.filters import IndexedSearchFilter
+from django.db.models import Count
 
 from .models import Customer, Contact, Address
 from .serializers import (
     CustomerListSerializer, CustomerDetailSerializer,
     ContactSerializer, AddressSerializer
 )
+from apps.imports.jobs import create_import_job
+from apps.imports.serializers import ImportJobSerializer
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Customer CRUD operations."""
     queryset = Customer.objects.all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
     filterset_fields = ['type']
     search_fields = ['name', 'email', 'phone']
     ordering_fields = ['name', 'created_at']
     ordering = ['-created_at']
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and self.wants('contacts_count'):
+            queryset = queryset.annotate(contacts_count=Count('contacts'))
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return CustomerListSerializer
         return CustomerDetailSerializer
 
 
-class ContactViewSet(viewsets.ModelViewSet):
+class ContactViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Contact CRUD operations."""
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
@@ -38,7 +48,7 @@ class ContactViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'email', 'phone']
 
 
-class AddressViewSet(viewsets.ModelViewSet):
+class AddressViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Address CRUD operations."""
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
@@ -48,7 +58,7 @@ class AddressViewSet(viewsets.ModelViewSet):
 
 
 class ImportCustomersView(APIView):
-    """Import customers from CSV file."""
+    """Queue a background import of customers from a CSV file."""
     parser_classes = [MultiPartParser]
     
     def post(self, request):
@@ -56,31 +66,5 @@ class ImportCustomersView(APIView):
         if not file:
             return Response({'error': 'No se proporcionó archivo'}, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            decoded_file = file.read().decode('utf-8')
-            reader = csv.DictReader(io.StringIO(decoded_file))
-            
-            created = 0
-            errors = []
-            
-            for row_num, row in enumerate(reader, start=2):
-                try:
-                    Customer.objects.create(
-                        name=row.get('name', row.get('nombre', '')),
-                        type=row.get('type', row.get('tipo', 'INDIVIDUAL')).upper(),
-                        phone=row.get('phone', row.get('telefono', '')),
-                        email=row.get('email', ''),
-                        notes=row.get('notes', row.get('notas', '')),
-                        created_by=request.user
-                    )
-                    created += 1
-                except Exception as e:
-                    errors.append(f"Fila {row_num}: {str(e)}")
-            
-            return Response({
-                'created': created,
-                'errors': errors[:10]  # Limit errors shown
-            }, status=status.HTTP_201_CREATED)
-        
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        job = create_import_job('CUSTOMERS', file, request.user)
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import ImportJob
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'kind', 'status', 'rows_processed', 'rows_created', 'errors_count', 'created_at')
+    list_filter = ('kind', 'status', 'created_at')
+    readonly_fields = (
+        'rows_processed', 'rows_created', 'errors_count', 'errors', 'error_message',
+        'created_at', 'started_at', 'finished_at'
+    )
@@ -0,0 +1,67 @@
+"""
+Pluggable executors for import jobs.
+
+The executor is chosen with settings.IMPORT_JOB_EXECUTOR. The default runs
+jobs in a local thread pool; DatabaseQueueExecutor leaves them PENDING so a
+`run_import_worker` process on any node picks them up (the uploaded files
+must then live on shared storage).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+
+class BaseJobExecutor:
+    """Interface: submit(job_id) schedules the job for execution."""
+    
+    def submit(self, job_id):
+        raise NotImplementedError
+
+
+class SynchronousJobExecutor(BaseJobExecutor):
+    """Run the job inline. Useful for tests and management commands."""
+    
+    def submit(self, job_id):
+        from .jobs import run_job
+        run_job(job_id)
+
+
+class ThreadPoolJobExecutor(BaseJobExecutor):
+    """Run jobs in a process-local thread pool."""
+    
+    def __init__(self, max_workers=None):
+        self.pool = ThreadPoolExecutor(
+            max_workers=max_workers or settings.IMPORT_JOB_WORKERS,
+            thread_name_prefix='import-job',
+        )
+    
+    def submit(self, job_id):
+        return self.pool.submit(self._run, job_id)
+    
+    @staticmethod
+    def _run(job_id):
+        from .jobs import run_job
+        try:
+            run_job(job_id)
+        finally:
+            # Each worker thread owns its own connection.
+            connection.close()
+
+
+class DatabaseQueueExecutor(BaseJobExecutor):
+    """Leave the job PENDING; the ImportJob table is the queue."""
+    
+    def submit(self, job_id):
+        return None
+
+
+@lru_cache(maxsize=None)
+def _load_executor(path):
+    return import_string(path)()
+
+
+def get_executor():
+    return _load_executor(settings.IMPORT_JOB_EXECUTOR)
@@ -0,0 +1,94 @@
+import codecs
+import csv
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+from apps.search import registry as search_registry
+
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 10
+
+
+def iter_csv_rows(uploaded_file):
+    """Yield (row_num, row) pairs decoding the upload line by line."""
+    lines = codecs.iterdecode(uploaded_file, 'utf-8-sig')
+    reader = csv.DictReader(lines)
+    return enumerate(reader, start=2)
+
+
+def format_error(row_num, error):
+    if isinstance(error, ValidationError) and hasattr(error, 'message_dict'):
+        detail = '; '.join(
+            f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()
+        )
+    else:
+        detail = str(error)
+    return f"Fila {row_num}: {detail}"
+
+
+class ImportResult:
+    """Running totals of a chunked import; only the first errors are kept."""
+    
+    def __init__(self):
+        self.created = 0
+        self.processed = 0
+        self.errors = []
+        self.errors_count = 0
+    
+    def add_error(self, message):
+        self.errors_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+
+def import_csv(uploaded_file, build_instance, chunk_size=None, on_progress=None):
+    """
+    Stream model instances from a CSV upload into the database.
+    
+    build_instance maps a CSV row to an unsaved model instance. Rows are
+    validated in chunks and each chunk is written with a single bulk_create
+    inside its own transaction, so memory stays bounded by chunk_size
+    whatever the size of the file. on_progress, if given, is called with
+    the running ImportResult after every chunk.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    result = ImportResult()
+    rows = iter_csv_rows(uploaded_file)
+    
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        
+        valid = []
+        for row_num, row in chunk:
+            try:
+                instance = build_instance(row)
+                instance.full_clean(exclude=['created_by'])
+            except (ValidationError, AttributeError) as e:
+                result.add_error(format_error(row_num, e))
+            else:
+                valid.append(instance)
+        
+        if valid:
+            model = type(valid[0])
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(valid)
+                    # bulk_create skips post_save, so index the rows here.
+                    if search_registry.is_indexed(model):
+                        search_registry.index_objects(valid)
+            except DatabaseError as e:
+                first, last = chunk[0][0], chunk[-1][0]
+                result.add_error(f"Filas {first}-{last}: {str(e)}")
+            else:
+                result.created += len(valid)
+        
+        result.processed += len(chunk)
+        if on_progress:
+            on_progress(result)
+    
+    return result
@@ -0,0 +1,92 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .executors import get_executor
+from .models import ImportJob
+
+
+logger = logging.getLogger(__name__)
+
+IMPORTERS = {
+    'CUSTOMERS': 'apps.customers.importers.import_customers_csv',
+    'LEADS': 'apps.sales.importers.import_leads_csv',
+}
+
+
+def create_import_job(kind, uploaded_file, user):
+    """Store the upload and hand the job to the configured executor."""
+    job = ImportJob.objects.create(kind=kind, file=uploaded_file, created_by=user)
+    transaction.on_commit(lambda: get_executor().submit(job.pk))
+    return job
+
+
+def claim_job(job_id):
+    """Atomically move a PENDING job to RUNNING; False if someone else got it."""
+    now = timezone.now()
+    return ImportJob.objects.filter(pk=job_id, status='PENDING').update(
+        status='RUNNING', started_at=now, heartbeat_at=now
+    ) == 1
+
+
+def fail_stale_jobs():
+    """
+    Fail RUNNING jobs whose worker died (process recycled, killed mid-import).
+    
+    They are not requeued: the rows of the chunks already saved would be
+    imported twice. Returns the number of jobs failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT)
+    stale = ImportJob.objects.filter(status='RUNNING', heartbeat_at__lt=cutoff)
+    count = stale.update(
+        status='FAILED', finished_at=timezone.now(),
+        error_message='La importación se interrumpió antes de terminar',
+    )
+    if count:
+        logger.warning('Failed %s import jobs whose worker stopped reporting progress', count)
+    return count
+
+
+def claim_next_job():
+    """Claim the oldest PENDING job, or return None when the queue is empty."""
+    fail_stale_jobs()
+    pending = ImportJob.objects.filter(status='PENDING').order_by('created_at')
+    for job_id in pending.values_list('pk', flat=True)[:10]:
+        if claim_job(job_id):
+            return job_id
+    return None
+
+
+def run_job(job_id, claimed=False):
+    """Run an import job to completion, saving progress after every chunk."""
+    if not claimed and not claim_job(job_id):
+        return
+    job = ImportJob.objects.select_related('created_by').get(pk=job_id)
+    importer = import_string(IMPORTERS[job.kind])
+    
+    def save_progress(result):
+        ImportJob.objects.filter(pk=job_id).update(
+            rows_processed=result.processed,
+            rows_created=result.created,
+            errors_count=result.errors_count,
+            errors=result.errors,
+            heartbeat_at=timezone.now(),
+        )
+    
+    try:
+        with job.file.open('rb') as uploaded_file:
+            result = importer(uploaded_file, job.created_by, on_progress=save_progress)
+    except Exception as e:
+        logger.exception('Import job %s failed', job_id)
+        ImportJob.objects.filter(pk=job_id).update(
+            status='FAILED', error_message=str(e), finished_at=timezone.now()
+        )
+        return
+    
+    save_progress(result)
+    job.file.delete(save=False)
+    ImportJob.objects.filter(pk=job_id).update(status='DONE', file='', finished_at=timezone.now())
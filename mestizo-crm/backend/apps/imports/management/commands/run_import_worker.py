@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.imports.jobs import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process PENDING import jobs from the database queue'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when idle')
+    
+    def handle(self, *args, **options):
+        self.stdout.write('Waiting for import jobs...')
+        
+        while True:
+            job_id = claim_next_job()
+            if job_id is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            
+            self.stdout.write(f'Running import job {job_id}')
+            run_job(job_id, claimed=True)
+            self.stdout.write(self.style.SUCCESS(f'Import job {job_id} finished'))
@@ -0,0 +1,58 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class ImportJob(models.Model):
+    """CSV import processed in the background, with progress counters."""
+    
+    KIND_CHOICES = [
+        ('CUSTOMERS', 'Clientes'),
+        ('LEADS', 'Leads'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pendiente'),
+        ('RUNNING', 'En Proceso'),
+        ('DONE', 'Terminado'),
+        ('FAILED', 'Fallido'),
+    ]
+    
+    kind = models.CharField(max_length=15, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    file = models.FileField(upload_to='imports/%Y/%m/')
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    errors_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set when claimed and on every progress save; RUNNING jobs whose worker
+    # stopped beating for IMPORT_JOB_TIMEOUT are failed by fail_stale_jobs().
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='import_jobs'
+    )
+    
+    class Meta:
+        verbose_name = 'Importación'
+        verbose_name_plural = 'Importaciones'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"IMP-{self.id:04d} - {self.get_kind_display()} ({self.get_status_display()})"
+    
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return 0.0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        if elapsed <= 0:
+            return float(self.rows_processed)
+        return round(self.rows_processed / elapsed, 1)
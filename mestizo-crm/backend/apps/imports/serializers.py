@@ -0,0 +1,20 @@
+from rest_framework import serializers
+from apps.common.sparse import SparseModelSerializer
+from .models import ImportJob
+
+
+class ImportJobSerializer(SparseModelSerializer):
+    kind_display = serializers.CharField(source='get_kind_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    rows_per_second = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'kind_display', 'status', 'status_display',
+            'rows_processed', 'rows_created', 'rows_per_second',
+            'errors_count', 'errors', 'error_message',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+        field_sources = {'rows_per_second': ['rows_processed', 'started_at', 'finished_at']}
@@ -0,0 +1,18 @@
+from rest_framework import generics
+
+from .jobs import fail_stale_jobs
+from .models import ImportJob
+from .serializers import ImportJobSerializer
+
+
+class ImportJobDetailView(generics.RetrieveAPIView):
+    """Progress of a background import job."""
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    
+    def get_object(self):
+        job = super().get_object()
+        # In-process executors have no poller to notice a dead worker; reads do.
+        if job.status == 'RUNNING' and fail_stale_jobs():
+            job.refresh_from_db()
+        return job
@@ -5,12 +5,14 @@ from .models import Project, ProjectMedia
 class ProjectMediaInline(admin.TabularInline):
     model = ProjectMedia
     extra = 1
+    fields = ('media_type', 'url', 'file', 'caption')
+    readonly_fields = ('file',)
 
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ('title', 'customer', 'status', 'start_date', 'end_date', 'created_at')
-    list_filter = ('status', 'created_at')
+    list_display = ('title', 'customer', 'status', 'recurrence', 'start_date', 'end_date', 'created_at')
+    list_filter = ('status', 'recurrence', 'created_at')
     search_fields = ('title', 'customer__name', 'description')
     inlines = [ProjectMediaInline]
     readonly_fields = ('created_at', 'updated_at')
@@ -18,6 +20,7 @@ class ProjectAdmin(admin.ModelAdmin):
 
 @admin.register(ProjectMedia)
 class ProjectMediaAdmin(admin.ModelAdmin):
-    list_display = ('project', 'media_type', 'caption', 'created_at')
+    list_display = ('project', 'media_type', 'caption', 'width', 'height', 'file_size', 'created_at')
     list_filter = ('media_type',)
-    search_fields = ('caption', 'project__title')
+    search_fields = ('caption', 'project__title', 'content_hash')
+    readonly_fields = ('file', 'content_hash', 'width', 'height', 'file_size', 'thumbnails', 'created_at')
@@ -0,0 +1,67 @@
+"""
+Image inspection and thumbnail generation with Pillow.
+
+No Django imports, so process-pool workers can use it directly: functions
+take and return plain bytes and tuples.
+"""
+import io
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+# Longest edge of each thumbnail, in pixels.
+THUMBNAIL_SIZES = {'small': 160, 'medium': 480, 'large': 1280}
+THUMBNAIL_FORMAT = 'JPEG'
+THUMBNAIL_QUALITY = 82
+EXIF_ORIENTATION = 0x0112
+
+
+class ImageTooLarge(ValueError):
+    """The image has more pixels than we are willing to decode."""
+
+
+def inspect(data, max_pixels=None):
+    """
+    (width, height, format) of an encoded image, as it is displayed.
+    
+    Only the header is parsed. Raises ImageTooLarge when the image has more
+    than `max_pixels` (decoding it for the thumbnails would take
+    width * height * 3 bytes, whatever the file size), and ValueError when
+    `data` is not an image Pillow can read.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+            # Orientations 5-8 are rotated by 90 degrees.
+            if image.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+                width, height = height, width
+            image_format = image.format
+    except Image.DecompressionBombError as error:
+        raise ImageTooLarge(str(error)) from error
+    except (UnidentifiedImageError, OSError) as error:
+        raise ValueError(str(error)) from error
+    if max_pixels is not None and width * height > max_pixels:
+        raise ImageTooLarge(f'{width}x{height}')
+    return width, height, image_format
+
+
+def make_thumbnail(image, size):
+    thumbnail = image.copy()
+    # thumbnail() keeps the aspect ratio and never upscales.
+    thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    thumbnail.save(output, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def make_thumbnails(data, sizes=None):
+    """Process-pool entry point: {label: JPEG bytes} for every size."""
+    sizes = sizes or THUMBNAIL_SIZES
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEGs are decoded at a reduced scale (still >= the largest size),
+        # which is much cheaper for camera photos.
+        image.draft('RGB', (max(sizes.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return {label: make_thumbnail(image, size) for label, size in sizes.items()}
@@ -0,0 +1,33 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.projects.recurrence import CHUNK_SIZE, DEFAULT_HORIZON_DAYS, generate
+
+
+class Command(BaseCommand):
+    help = 'Create the maintenance visits of every recurring project up to a horizon (idempotent)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=DEFAULT_HORIZON_DAYS, help='Horizon in days, starting today'
+        )
+        parser.add_argument('--from', dest='date_from', help='Start date (YYYY-MM-DD) instead of today')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options['date_from']) if options['date_from'] else None
+        except ValueError:
+            raise CommandError('--from must be a date (YYYY-MM-DD)')
+        if options['days'] <= 0:
+            raise CommandError('--days must be positive')
+        
+        started = time.monotonic()
+        result = generate(options['days'], date_from=date_from, chunk_size=options['chunk_size'])
+        
+        elapsed = time.monotonic() - started
+        rate = result.projects / elapsed if elapsed else result.projects
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.created} activities created, {result.existing} already existed, '
+            f'{result.projects} projects in {elapsed:.1f}s ({rate:.0f} projects/s)'
+        ))
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.projects.media import generate_batch
+from apps.projects.models import ProjectMedia
+
+
+class Command(BaseCommand):
+    help = 'Generate the thumbnails of uploaded project photos over a process pool'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate existing thumbnails too')
+        parser.add_argument('--workers', type=int, help='Processes (default: PROJECT_MEDIA_WORKERS)')
+    
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        queryset = ProjectMedia.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(thumbnails={})
+        
+        rendered = generate_batch(queryset, workers=options['workers'])
+        
+        elapsed = time.monotonic() - started
+        rate = rendered / elapsed if elapsed else rendered
+        self.stdout.write(self.style.SUCCESS(
+            f'Thumbnails generated for {rendered} images in {elapsed:.1f}s ({rate:.1f} images/s)'
+        ))
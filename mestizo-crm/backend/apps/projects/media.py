@@ -0,0 +1,179 @@
+"""
+Storage of uploaded project photos and their thumbnails.
+
+Files are content-addressed: the original is stored under its SHA-256 and
+thumbnails next to it, so uploading the same photo twice stores it (and
+generates its thumbnails) once, and every URL is immutable. Files are only
+ever added; deleting a ProjectMedia row leaves them in place, since other
+rows may share them.
+
+Thumbnails are generated outside the request: a small thread pool reads
+the original from storage, hands the bytes to a process pool running
+apps.projects.images, and saves the results back to storage.
+"""
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+
+from apps.common import conditional
+from . import images
+from .models import ProjectMedia, project_media_storage
+
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'GIF': '.gif'}
+
+_pool_lock = threading.Lock()
+
+
+def original_name(digest, image_format):
+    return f'originals/{digest[:2]}/{digest}{EXTENSIONS.get(image_format, "")}'
+
+
+def thumbnail_name(digest, label):
+    return f'thumbs/{digest[:2]}/{digest}-{label}.jpg'
+
+
+def save_once(storage, name, data):
+    """Store `data` under `name` unless a file (same content) is already there."""
+    if not storage.exists(name):
+        storage.save(name, ContentFile(data))
+
+
+def store_upload(data, **fields):
+    """
+    Create a ProjectMedia from uploaded bytes.
+    
+    Raises ValueError when `data` is not a supported image (ImageTooLarge
+    beyond PROJECT_MEDIA_MAX_PIXELS). Thumbnails are
+    reused from an earlier upload of the same content, otherwise scheduled.
+    """
+    width, height, image_format = images.inspect(data, max_pixels=settings.PROJECT_MEDIA_MAX_PIXELS)
+    if image_format not in EXTENSIONS:
+        raise ValueError(image_format)
+    digest = hashlib.sha256(data).hexdigest()
+    name = original_name(digest, image_format)
+    save_once(project_media_storage(), name, data)
+    
+    duplicate = ProjectMedia.objects.filter(content_hash=digest).exclude(thumbnails={}).first()
+    media = ProjectMedia.objects.create(
+        file=name, content_hash=digest, width=width, height=height, file_size=len(data),
+        thumbnails=duplicate.thumbnails if duplicate else {}, **fields
+    )
+    if not media.thumbnails:
+        schedule_thumbnails(media)
+    return media
+
+
+def save_thumbnails(digest, rendered):
+    """Store rendered {label: bytes}; returns {label: storage name}."""
+    storage = project_media_storage()
+    names = {}
+    for label, data in rendered.items():
+        names[label] = thumbnail_name(digest, label)
+        save_once(storage, names[label], data)
+    return names
+
+
+def generate_thumbnails(media, in_pool=False):
+    """Render, store and record the thumbnails of one uploaded ProjectMedia."""
+    data = read_original(media.file.name)
+    rendered = render_in_pool(data) if in_pool else images.make_thumbnails(data)
+    media.thumbnails = save_thumbnails(media.content_hash, rendered)
+    # Every row sharing the content gets the same thumbnails.
+    ProjectMedia.objects.filter(content_hash=media.content_hash).update(thumbnails=media.thumbnails)
+    conditional.touch(ProjectMedia)
+    return media.thumbnails
+
+
+def read_original(name):
+    with project_media_storage().open(name, 'rb') as original:
+        return original.read()
+
+
+def generate_batch(queryset, workers=None):
+    """
+    Thumbnails for every uploaded row of `queryset`; returns how many distinct
+    images were rendered.
+    
+    Each content hash is rendered once. Originals are read a few per worker
+    at a time, so memory stays bounded however many rows there are.
+    """
+    pending = dict(queryset.exclude(file='').order_by().values_list('content_hash', 'file'))
+    workers = workers or settings.PROJECT_MEDIA_WORKERS
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        items = iter(pending.items())
+        while chunk := list(islice(items, max(workers, 1) * 4)):
+            originals = [read_original(name) for _, name in chunk]
+            rendered = pool.map(images.make_thumbnails, originals) if pool else map(images.make_thumbnails, originals)
+            for (digest, _), thumbnails in zip(chunk, rendered):
+                ProjectMedia.objects.filter(content_hash=digest).update(
+                    thumbnails=save_thumbnails(digest, thumbnails)
+                )
+            conditional.touch(ProjectMedia)
+    finally:
+        if pool:
+            pool.shutdown()
+    return len(pending)
+
+
+@lru_cache(maxsize=None)
+def get_thread_pool():
+    """Created on first use and kept for the process."""
+    return ThreadPoolExecutor(max_workers=settings.PROJECT_MEDIA_WORKERS, thread_name_prefix='project-media')
+
+
+@lru_cache(maxsize=None)
+def get_process_pool():
+    """Created on first use and kept for the process, until it breaks."""
+    return ProcessPoolExecutor(max_workers=settings.PROJECT_MEDIA_WORKERS)
+
+
+def reset_process_pool(broken):
+    """Drop `broken` so that the next get_process_pool() starts new workers."""
+    with _pool_lock:
+        if get_process_pool.cache_info().currsize and get_process_pool() is broken:
+            get_process_pool.cache_clear()
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def render_in_pool(data):
+    pool = get_process_pool()
+    try:
+        return pool.submit(images.make_thumbnails, data).result()
+    except BrokenProcessPool:
+        # A worker died (OOM kill, crash), maybe on another upload, and the
+        # pool refuses all work from now on: replace it and try once more.
+        logger.warning('Thumbnail process pool broken; starting a new one')
+        reset_process_pool(pool)
+    return get_process_pool().submit(images.make_thumbnails, data).result()
+
+
+def run_in_background(media_id):
+    try:
+        media = ProjectMedia.objects.get(pk=media_id)
+        generate_thumbnails(media, in_pool=True)
+    except Exception:
+        # The row keeps empty thumbnails; the generate_thumbnails command retries it.
+        logger.exception('Thumbnail generation failed for project media %s', media_id)
+    finally:
+        # Each worker thread owns its own connection.
+        connection.close()
+
+
+def schedule_thumbnails(media):
+    if settings.PROJECT_MEDIA_WORKERS <= 0:
+        generate_thumbnails(media)
+    else:
+        # Only once committed is the row visible to the worker thread.
+        transaction.on_commit(lambda: get_thread_pool().submit(run_in_background, media.pk))
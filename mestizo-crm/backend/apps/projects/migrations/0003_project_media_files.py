@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:36
+
+import apps.projects.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projectmedia",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="projectmedia",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                max_length=200,
+                storage=apps.projects.models.project_media_storage,
+                upload_to="",
+            ),
+        ),
+        migrations.AddField(
+            model_name="projectmedia",
+            name="file_size",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="projectmedia",
+            name="height",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="projectmedia",
+            name="thumbnails",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="projectmedia",
+            name="width",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="projectmedia",
+            name="url",
+            field=models.URLField(
+                blank=True,
+                help_text="Imagen externa (si no se subió un archivo)",
+                max_length=500,
+            ),
+        ),
+    ]
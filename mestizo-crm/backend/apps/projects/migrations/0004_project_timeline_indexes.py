@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:41
+
+from django.db import migrations, models
+
+
+def create_period_index(apps, schema_editor):
+    # GiST on the active daterange only exists on PostgreSQL; the expression
+    # must match apps.projects.timeline.ActivePeriod. Not partial: the planner
+    # only keeps statistics for expressions of full indexes, and without them
+    # it overestimates the matches by orders of magnitude.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX project_period_gist ON projects_project USING gist "
+        "(daterange(start_date, CASE WHEN end_date < start_date THEN start_date "
+        "ELSE end_date END, '[]'))"
+    )
+
+
+def drop_period_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS project_period_gist")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_initial"),
+        ("projects", "0003_project_media_files"),
+        ("quotes", "0004_quote_templates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["start_date", "end_date"], name="project_dates_idx"
+            ),
+        ),
+        migrations.RunPython(create_period_index, drop_period_index),
+    ]
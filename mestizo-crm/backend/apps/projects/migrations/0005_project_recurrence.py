@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_project_timeline_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="recurrence",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("WEEKLY", "Semanal"),
+                    ("BIWEEKLY", "Quincenal"),
+                    ("MONTHLY", "Mensual"),
+                    ("QUARTERLY", "Trimestral"),
+                ],
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="recurrence_start",
+            field=models.DateField(
+                blank=True,
+                help_text="Primera visita; si está vacío se usa la fecha de inicio",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,6 +1,11 @@
+from django.core.files.storage import storages
 from django.db import models
 
 
+def project_media_storage():
+    return storages['project_media']
+
+
 class Project(models.Model):
     """Landscaping project model."""
     
@@ -11,6 +16,13 @@ class Project(models.Model):
         ('MAINTENANCE', 'Mantenimiento'),
     ]
     
+    RECURRENCE_CHOICES = [
+        ('WEEKLY', 'Semanal'),
+        ('BIWEEKLY', 'Quincenal'),
+        ('MONTHLY', 'Mensual'),
+        ('QUARTERLY', 'Trimestral'),
+    ]
+    
     customer = models.ForeignKey(
         'customers.Customer', on_delete=models.CASCADE, related_name='projects'
     )
@@ -23,6 +35,11 @@ class Project(models.Model):
     start_date = models.DateField(null=True, blank=True)
     end_date = models.DateField(null=True, blank=True)
     description = models.TextField(blank=True)
+    # Maintenance visits, expanded into activities by generate_recurring_activities
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, blank=True)
+    recurrence_start = models.DateField(
+        null=True, blank=True, help_text='Primera visita; si está vacío se usa la fecha de inicio'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -30,6 +47,11 @@ class Project(models.Model):
         verbose_name = 'Proyecto'
         verbose_name_plural = 'Proyectos'
         ordering = ['-created_at']
+        indexes = [
+            # Timeline range queries; PostgreSQL also gets a GiST index on the
+            # project's daterange (migration 0004).
+            models.Index(fields=['start_date', 'end_date'], name='project_dates_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.customer.name}"
@@ -46,7 +68,14 @@ class ProjectMedia(models.Model):
     
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='media')
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES, default='PROGRESS')
-    url = models.URLField(max_length=500)
+    url = models.URLField(max_length=500, blank=True, help_text='Imagen externa (si no se subió un archivo)')
+    file = models.FileField(storage=project_media_storage, max_length=200, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    # {size label: storage name}, filled in by the thumbnail pipeline
+    thumbnails = models.JSONField(default=dict, blank=True)
     caption = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -0,0 +1,127 @@
+"""
+Expansion of project recurrence rules into maintenance visit activities.
+
+Every MAINTENANCE project with a recurrence gets one VISIT activity per
+occurrence date inside the horizon. (project, occurrence) is unique on
+Activity, so the generator is idempotent: occurrences that already have an
+activity are skipped and a concurrent run cannot insert duplicates. Rows
+are written per chunk of projects with one bulk_create, so tens of
+thousands of projects take a few seconds.
+"""
+import calendar
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.sales import dashboard
+from apps.sales.models import Activity
+from apps.search import registry as search_registry
+from .models import Project
+
+
+CHUNK_SIZE = 2000
+DEFAULT_HORIZON_DAYS = 60
+VISIT_TIME = time(9, 0)
+STEP_DAYS = {'WEEKLY': 7, 'BIWEEKLY': 14}
+STEP_MONTHS = {'MONTHLY': 1, 'QUARTERLY': 3}
+
+
+@dataclass
+class GenerationResult:
+    projects: int = 0
+    created: int = 0
+    existing: int = 0
+
+
+def add_months(day, months):
+    """Same day of the month `months` later, clamped to the month's last day."""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(rule, anchor, date_from, date_to):
+    """Dates of `rule` starting at `anchor` that fall in [date_from, date_to]."""
+    if rule in STEP_DAYS:
+        step = STEP_DAYS[rule]
+        skipped = max(0, -(-(date_from - anchor).days // step))
+        day = anchor + timedelta(days=skipped * step)
+        while day <= date_to:
+            yield day
+            day += timedelta(days=step)
+    elif rule in STEP_MONTHS:
+        step = STEP_MONTHS[rule]
+        months = (date_from.year - anchor.year) * 12 + date_from.month - anchor.month
+        # Start one period early; the day clamping can move a date back.
+        n = max(0, months // step - 1)
+        while (day := add_months(anchor, n * step)) <= date_to:
+            if day >= date_from:
+                yield day
+            n += 1
+
+
+def recurring_projects():
+    """MAINTENANCE projects with a rule and a date to anchor it on."""
+    return Project.objects.filter(status='MAINTENANCE').exclude(recurrence='').filter(
+        Q(recurrence_start__isnull=False) | Q(start_date__isnull=False)
+    )
+
+
+def expand(rows, date_from, date_to):
+    """(project_id, customer_id, title, day) for every occurrence of the chunk's rules."""
+    for project_id, customer_id, title, rule, recurrence_start, start_date, end_date in rows:
+        last = min(end_date, date_to) if end_date else date_to
+        for day in occurrences(rule, recurrence_start or start_date, date_from, last):
+            yield project_id, customer_id, title, day
+
+
+def create_missing(visits, date_from, date_to):
+    """Insert the visits that have no activity yet; returns how many were created."""
+    existing = set(Activity.objects.filter(
+        project_id__in={project_id for project_id, *_ in visits}, occurrence__range=(date_from, date_to)
+    ).values_list('project_id', 'occurrence'))
+    # Instances are only built for missing visits, so re-runs stay cheap.
+    tz = timezone.get_current_timezone()
+    missing = [
+        Activity(
+            type='VISIT', notes=f'Visita de mantenimiento: {title}',
+            due_at=datetime.combine(day, VISIT_TIME, tzinfo=tz),
+            customer_id=customer_id, project_id=project_id, occurrence=day,
+        )
+        for project_id, customer_id, title, day in visits
+        if (project_id, day) not in existing
+    ]
+    if missing:
+        with transaction.atomic():
+            Activity.objects.bulk_create(missing)
+            # bulk_create skips post_save, so index the rows here.
+            search_registry.index_objects(missing)
+    return len(missing)
+
+
+def generate(horizon_days=DEFAULT_HORIZON_DAYS, date_from=None, chunk_size=CHUNK_SIZE):
+    """Create the visits due from `date_from` (today) to `horizon_days` later."""
+    date_from = date_from or timezone.localdate()
+    date_to = date_from + timedelta(days=horizon_days - 1)
+    result = GenerationResult()
+    rows = recurring_projects().order_by('pk').values_list(
+        'id', 'customer_id', 'title', 'recurrence', 'recurrence_start', 'start_date', 'end_date'
+    ).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        visits = list(expand(chunk, date_from, date_to))
+        try:
+            created = create_missing(visits, date_from, date_to)
+        except IntegrityError:
+            # Another run inserted some of them meanwhile; skip those now.
+            created = create_missing(visits, date_from, date_to)
+        result.projects += len(chunk)
+        result.created += created
+        result.existing += len(visits) - created
+    if result.created:
+        # bulk_create sends no post_save, so the dashboard cache is not bumped.
+        dashboard.invalidate()
+    return result
@@ -1,20 +1,60 @@
+from django.conf import settings
 from rest_framework import serializers
+from apps.common.sparse import SparseModelSerializer
 from .models import Project, ProjectMedia
 
 
-class ProjectMediaSerializer(serializers.ModelSerializer):
+class ProjectMediaSerializer(SparseModelSerializer):
     media_type_display = serializers.CharField(source='get_media_type_display', read_only=True)
+    thumbnails = serializers.SerializerMethodField()
     
     class Meta:
         model = ProjectMedia
-        fields = ['id', 'project', 'media_type', 'media_type_display', 'url', 'caption', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'project', 'media_type', 'media_type_display', 'url', 'caption',
+            'width', 'height', 'file_size', 'content_hash', 'thumbnails', 'created_at'
+        ]
+        read_only_fields = ['id', 'width', 'height', 'file_size', 'content_hash', 'created_at']
+        field_sources = {'url': ['url', 'file'], 'thumbnails': ['file', 'thumbnails']}
+    
+    def validate(self, attrs):
+        if self.instance is None and not attrs.get('url'):
+            raise serializers.ValidationError({'url': "Requerido; para subir un archivo use /api/project-media/upload/"})
+        return attrs
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'url' in data and instance.file:
+            # Uploaded files are served from storage; `url` stays the one to show.
+            data['url'] = self.absolute_url(instance.file.url)
+        return data
+    
+    def absolute_url(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_thumbnails(self, obj):
+        storage = obj.file.storage
+        return {label: self.absolute_url(storage.url(name)) for label, name in obj.thumbnails.items()}
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectMediaUploadSerializer(SparseModelSerializer):
+    file = serializers.FileField()
+    
+    class Meta:
+        model = ProjectMedia
+        fields = ['project', 'media_type', 'caption', 'file']
+    
+    def validate_file(self, value):
+        if value.size > settings.PROJECT_MEDIA_MAX_UPLOAD:
+            raise serializers.ValidationError("El archivo supera el tamaño máximo permitido")
+        return value
+
+
+class ProjectListSerializer(SparseModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
-    media_count = serializers.SerializerMethodField()
+    media_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Project
@@ -22,12 +62,9 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'id', 'customer', 'customer_name', 'title', 'status', 'status_display',
             'start_date', 'end_date', 'created_at', 'media_count'
         ]
-    
-    def get_media_count(self, obj):
-        return obj.media.count()
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(SparseModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     quote_number = serializers.SerializerMethodField()
@@ -38,11 +75,13 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'customer', 'customer_name', 'quote', 'quote_number',
             'title', 'status', 'status_display', 'start_date', 'end_date',
-            'description', 'created_at', 'updated_at', 'media'
+            'description', 'recurrence', 'recurrence_start', 'created_at', 'updated_at', 'media'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = ['media']
+        field_sources = {'quote_number': ['quote']}
     
     def get_quote_number(self, obj):
-        if obj.quote:
-            return f"COT-{obj.quote.id:04d}"
+        if obj.quote_id:
+            return f"COT-{obj.quote_id:04d}"
         return None
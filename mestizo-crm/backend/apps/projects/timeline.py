@@ -0,0 +1,94 @@
+"""
+Project timeline: projects active in a date window, grouped per week.
+
+A project is active from start_date to end_date inclusive, open-ended while
+end_date is NULL; projects without a start_date are not scheduled and never
+appear. On PostgreSQL the overlap test is `daterange(...) && window`, which
+the GiST expression index from migration 0004 answers without scanning
+past projects; other databases use the (start_date, end_date) btree index.
+"""
+from datetime import timedelta
+
+from django.contrib.postgres.fields import DateRangeField
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import Case, F, Func, Q, When
+from django.utils import timezone
+
+from .models import Project
+
+
+DEFAULT_WEEKS = 8
+MAX_DAYS = 366
+
+
+class ActivePeriod(Func):
+    """daterange(start_date, end_date, '[]'); an end before the start counts as the start."""
+    function = 'daterange'
+    template = "%(function)s(%(expressions)s, '[]')"
+    output_field = DateRangeField()
+    
+    def __init__(self):
+        end = Case(When(end_date__lt=F('start_date'), then=F('start_date')), default=F('end_date'))
+        super().__init__(F('start_date'), end)
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def default_window():
+    start = week_start(timezone.localdate())
+    return start, start + timedelta(weeks=DEFAULT_WEEKS, days=-1)
+
+
+def active_between(date_from, date_to, queryset=None):
+    queryset = Project.objects.all() if queryset is None else queryset
+    queryset = queryset.filter(start_date__isnull=False)
+    if connection.vendor == 'postgresql':
+        return queryset.alias(period=ActivePeriod()).filter(
+            period__overlap=DateRange(date_from, date_to, '[]')
+        )
+    return queryset.filter(start_date__lte=date_to).filter(
+        Q(end_date__gte=date_from) | Q(end_date__isnull=True)
+        | Q(end_date__lt=F('start_date'), start_date__gte=date_from)
+    )
+
+
+def build(date_from, date_to, statuses=None):
+    """
+    Compact timeline payload for the window, from a single query.
+    
+    `weeks` lists, for every week (Monday) touching the window, the ids of
+    the projects active during it; project rows appear once in `projects`.
+    """
+    queryset = active_between(date_from, date_to)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    rows = queryset.order_by('start_date', 'id').values_list(
+        'id', 'title', 'status', 'customer_id', 'customer__name', 'start_date', 'end_date'
+    )
+    
+    first_week = week_start(date_from)
+    weeks = [first_week + timedelta(weeks=n) for n in range((date_to - first_week).days // 7 + 1)]
+    week_ids = [[] for _ in weeks]
+    projects = []
+    for project_id, title, status, customer_id, customer_name, start, end in rows:
+        projects.append({
+            'id': project_id, 'title': title, 'status': status,
+            'customer': customer_id, 'customer_name': customer_name,
+            'start_date': start, 'end_date': end,
+        })
+        last_day = min(max(end, start), date_to) if end else date_to
+        first = (week_start(max(start, date_from)) - first_week).days // 7
+        last = (week_start(last_day) - first_week).days // 7
+        for index in range(first, last + 1):
+            week_ids[index].append(project_id)
+    
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'count': len(projects),
+        'projects': projects,
+        'weeks': [{'week_start': week, 'projects': ids} for week, ids in zip(weeks, week_ids)],
+    }
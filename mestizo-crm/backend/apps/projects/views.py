@@ -1,31 +1,131 @@
-from rest_framework import viewsets
+import re
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.sparse import SparseQuerysetMixin
+from apps.search.filters import IndexedSearchFilter
+from django.conf import settings
+from django.db.models import Count
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.dateparse import parse_date
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
 
-from .models import Project, ProjectMedia
+from . import images, media, timeline
+from .models import Project, ProjectMedia, project_media_storage
 from .serializers import (
-    ProjectListSerializer, ProjectDetailSerializer, ProjectMediaSerializer
+    ProjectListSerializer, ProjectDetailSerializer, ProjectMediaSerializer,
+    ProjectMediaUploadSerializer
 )
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+# originals/ab/<sha256>.jpg or thumbs/ab/<sha256>-medium.jpg
+MEDIA_FILE_NAME = re.compile(r'(originals|thumbs)/[0-9a-f]{2}/([0-9a-f]{64}(?:-[a-z]+)?)\.[a-z]+')
+
+
+class ProjectViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Project CRUD operations."""
     queryset = Project.objects.all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
     filterset_fields = ['status', 'customer']
     search_fields = ['title', 'customer__name', 'description']
     ordering_fields = ['title', 'created_at', 'start_date', 'end_date']
     ordering = ['-created_at']
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and self.wants('media_count'):
+            queryset = queryset.annotate(media_count=Count('media'))
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return ProjectListSerializer
         return ProjectDetailSerializer
+    
+    @action(detail=False, methods=['get'])
+    def timeline(self, request):
+        """
+        Projects active between ?date_from= and ?date_to= (the next 8 weeks by
+        default), grouped per week; ?status=IN_PROGRESS,MAINTENANCE narrows it.
+        """
+        date_from, date_to = timeline.default_window()
+        try:
+            if 'date_from' in request.query_params:
+                date_from = parse_date(request.query_params['date_from'])
+            if 'date_to' in request.query_params:
+                date_to = parse_date(request.query_params['date_to'])
+        except ValueError:
+            date_from = None
+        if date_from is None or date_to is None or date_from > date_to:
+            return Response({'error': 'Rango de fechas inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        if (date_to - date_from).days >= timeline.MAX_DAYS:
+            return Response(
+                {'error': f'El rango no puede superar {timeline.MAX_DAYS} días'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        statuses = [code for code in request.query_params.get('status', '').split(',') if code]
+        valid = {code for code, _ in Project.STATUS_CHOICES}
+        if not set(statuses) <= valid:
+            return Response({'error': 'Estado inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(timeline.build(date_from, date_to, statuses))
 
 
-class ProjectMediaViewSet(viewsets.ModelViewSet):
+class ProjectMediaViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for ProjectMedia CRUD operations."""
     queryset = ProjectMedia.objects.all()
     serializer_class = ProjectMediaSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['project', 'media_type']
+    
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    def upload(self, request):
+        """Store an uploaded photo; thumbnails are generated in the background."""
+        serializer = ProjectMediaUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        fields = dict(serializer.validated_data)
+        
+        upload = fields.pop('file')
+        try:
+            instance = media.store_upload(upload.read(), **fields)
+        except images.ImageTooLarge:
+            return Response(
+                {'file': [f"La imagen supera los {settings.PROJECT_MEDIA_MAX_PIXELS / 1e6:.0f} megapíxeles"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValueError:
+            return Response(
+                {'file': ["Formato de imagen no soportado (JPEG, PNG, WebP o GIF)"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(self.get_serializer(instance).data, status=status.HTTP_201_CREATED)
+
+
+@require_safe
+def serve_media_file(request, name):
+    """
+    Public, immutable project media files.
+    
+    Names are content hashes, so a URL never changes content and can be cached
+    for a year; they are also unguessable, which is what lets <img> tags load
+    them without the API's bearer token.
+    """
+    match = MEDIA_FILE_NAME.fullmatch(name)
+    storage = project_media_storage()
+    if not match or not storage.exists(name):
+        raise Http404
+    etag = f'"{match.group(2)}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(storage.open(name, 'rb'))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Quote, QuoteItem
+from .models import Quote, QuoteItem, QuoteTemplate, QuoteTemplateItem
 
 
 class QuoteItemInline(admin.TabularInline):
@@ -21,3 +21,17 @@ class QuoteItemAdmin(admin.ModelAdmin):
     list_display = ('name', 'quote', 'item_type', 'qty', 'unit_price', 'line_total')
     list_filter = ('item_type',)
     search_fields = ('name', 'description')
+
+
+class QuoteTemplateItemInline(admin.TabularInline):
+    model = QuoteTemplateItem
+    extra = 1
+
+
+@admin.register(QuoteTemplate)
+class QuoteTemplateAdmin(admin.ModelAdmin):
+    list_display = ('name', 'active', 'updated_at')
+    list_filter = ('active',)
+    search_fields = ('name', 'description')
+    inlines = [QuoteTemplateItemInline]
+    readonly_fields = ('created_at', 'updated_at')
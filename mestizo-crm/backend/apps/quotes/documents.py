@@ -0,0 +1,141 @@
+"""
+Quote PDFs: the document data, a disk cache keyed by its content hash and
+batch rendering.
+
+The hash covers everything printed on the PDF (plus RENDERER_VERSION), so
+a cached file is valid exactly as long as its hash matches and doubles as
+the HTTP ETag. Files are never rewritten in place, only added; serving one
+refreshes its mtime, and prune_cache() deletes those unused for a while
+(the copies left behind by edited quotes among them).
+"""
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from . import pdf
+from .models import Quote, QuoteItem
+
+
+# Bump when the layout changes so every cached PDF is rendered again.
+RENDERER_VERSION = 1
+
+
+def quote_document(quote):
+    """Plain, picklable dict with everything the PDF shows."""
+    customer = quote.customer
+    return {
+        'number': f'COT-{quote.id:04d}',
+        'status': quote.get_status_display(),
+        'date': timezone.localtime(quote.created_at).strftime('%d/%m/%Y'),
+        'valid_until': quote.valid_until.strftime('%d/%m/%Y') if quote.valid_until else None,
+        'customer': {'name': customer.name, 'email': customer.email, 'phone': customer.phone},
+        'items': [
+            {
+                'name': item.name, 'description': item.description,
+                'qty': str(item.qty), 'unit_price': str(item.unit_price), 'line_total': str(item.line_total),
+            }
+            for item in quote.items.all()
+        ],
+        'total': str(quote.total),
+        'notes': quote.notes,
+    }
+
+
+def content_hash(document):
+    payload = json.dumps({'version': RENDERER_VERSION, 'document': document}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cache_path(digest):
+    return Path(settings.QUOTE_PDF_DIR) / digest[:2] / f'{digest}.pdf'
+
+
+def document_queryset(queryset=None):
+    queryset = Quote.objects.all() if queryset is None else queryset
+    return queryset.select_related('customer').prefetch_related(
+        Prefetch('items', queryset=QuoteItem.objects.order_by('pk'))
+    )
+
+
+def get_pdf(quote):
+    """(path, digest) of the quote's PDF, rendering it only on a cache miss."""
+    document = quote_document(quote)
+    digest = content_hash(document)
+    path = cache_path(digest)
+    if path.exists():
+        touch(path)
+    else:
+        pdf.render_to_file(document, str(path))
+    return path, digest
+
+
+def touch(path):
+    """Mark a cached PDF as used, so prune_cache() keeps it."""
+    try:
+        path.touch()
+    except FileNotFoundError:
+        # Pruned in the meantime; the caller still holds the digest.
+        pass
+
+
+def render_batch(queryset, workers=None):
+    """
+    Make sure every quote in `queryset` has a cached PDF.
+    
+    Documents are built in this process; only the rendering fans out over a
+    process pool. Returns (rendered, already_cached).
+    """
+    pending = {}
+    cached = 0
+    for quote in document_queryset(queryset).iterator(chunk_size=500):
+        document = quote_document(quote)
+        path = cache_path(content_hash(document))
+        if path.exists():
+            touch(path)
+            cached += 1
+        else:
+            pending[str(path)] = document
+    
+    workers = workers or settings.QUOTE_PDF_WORKERS
+    if workers <= 1 or len(pending) <= 1:
+        for path, document in pending.items():
+            pdf.render_to_file(document, path)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # chunksize keeps the pickling overhead per quote small.
+            list(pool.map(pdf.render_to_file, pending.values(), pending.keys(), chunksize=16))
+    return len(pending), cached
+
+
+def prune_cache(max_age, dry_run=False):
+    """
+    Delete the cached PDFs not served or rendered in the last `max_age`
+    seconds. Returns (removed, kept, bytes freed).
+    
+    The per-prefix directories stay (there are at most 256): removing one
+    could race with a render that just created it.
+    """
+    root = Path(settings.QUOTE_PDF_DIR)
+    if not root.exists():
+        return 0, 0, 0
+    cutoff = time.time() - max_age
+    removed = kept = size = 0
+    for path in root.glob('*/*.pdf'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if stat.st_mtime >= cutoff:
+            kept += 1
+            continue
+        removed += 1
+        size += stat.st_size
+        if not dry_run:
+            path.unlink(missing_ok=True)
+    return removed, kept, size
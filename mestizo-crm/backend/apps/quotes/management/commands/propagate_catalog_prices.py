@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from apps.quotes.pricing import propagate_catalog_prices
+
+
+class Command(BaseCommand):
+    help = 'Copy catalog reference prices onto the linked lines of DRAFT quotes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+        parser.add_argument('--item', type=int, action='append', dest='items', help='Catalog item id (repeatable)')
+    
+    def handle(self, *args, **options):
+        result = propagate_catalog_prices(options['items'], dry_run=options['dry_run'])
+        verb = 'would change' if result.dry_run else 'updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.rows} quote lines in {result.quotes} draft quotes {verb}'
+        ))
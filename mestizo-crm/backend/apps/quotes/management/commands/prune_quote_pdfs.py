@@ -0,0 +1,25 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.quotes.documents import prune_cache
+
+
+class Command(BaseCommand):
+    help = 'Delete the cached quote PDFs that have not been used for a number of days'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=float, default=settings.QUOTE_PDF_MAX_AGE_DAYS,
+            help='Keep PDFs used within this many days (default: QUOTE_PDF_MAX_AGE_DAYS)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report without deleting')
+    
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        removed, kept, size = prune_cache(options['days'] * 86400, dry_run=options['dry_run'])
+        
+        elapsed = time.monotonic() - started
+        verb = 'would be removed' if options['dry_run'] else 'removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{removed} PDFs {verb} ({size / 1024 / 1024:.1f} MB), {kept} kept, in {elapsed:.1f}s'
+        ))
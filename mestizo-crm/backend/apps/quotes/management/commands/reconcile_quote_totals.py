@@ -0,0 +1,56 @@
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from django.core.management.base import BaseCommand
+from apps.common import conditional
+from apps.quotes.models import Quote
+
+
+CHUNK_SIZE = 1000
+CENT = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = 'Compare every quote total with SUM(qty * unit_price) of its items and fix drift'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drift')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        chunk_size = options['chunk_size']
+        scanned = 0
+        drifted = 0
+        last_pk = 0
+        
+        while True:
+            # Keyset over the primary key; each chunk is one aggregate query.
+            chunk = list(
+                Quote.objects.filter(pk__gt=last_pk).order_by('pk')
+                .annotate(expected=Quote.items_total())
+                .values_list('pk', 'total', 'expected')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            scanned += len(chunk)
+            
+            drift = [
+                (pk, total, expected.quantize(CENT, rounding=ROUND_HALF_UP))
+                for pk, total, expected in chunk
+                if total != expected.quantize(CENT, rounding=ROUND_HALF_UP)
+            ]
+            for pk, total, expected in drift:
+                self.stdout.write(self.style.WARNING(f'Quote {pk}: stored {total}, items add up to {expected}'))
+            drifted += len(drift)
+            if drift and not options['dry_run']:
+                # Recomputed in the UPDATE itself, so edits since the read are not lost.
+                Quote.objects.filter(pk__in=[pk for pk, _, _ in drift]).update(total=Quote.items_total())
+                conditional.touch(Quote)
+        
+        elapsed = time.monotonic() - started
+        rate = scanned / elapsed if elapsed else scanned
+        verb = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{scanned} quotes checked in {elapsed:.1f}s ({rate:.0f} quotes/s), {drifted} drifted totals {verb}'
+        ))
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.quotes.documents import render_batch
+from apps.quotes.models import Quote
+
+
+class Command(BaseCommand):
+    help = 'Render (and cache) the PDFs of many quotes over a process pool'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status', choices=[code for code, _ in Quote.STATUS_CHOICES],
+            help='Only quotes in this status, e.g. SENT'
+        )
+        parser.add_argument('--workers', type=int, help='Processes (default: QUOTE_PDF_WORKERS)')
+    
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        queryset = Quote.objects.order_by('pk')
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+        
+        rendered, cached = render_batch(queryset, workers=options['workers'])
+        
+        elapsed = time.monotonic() - started
+        rate = rendered / elapsed if elapsed else rendered
+        self.stdout.write(self.style.SUCCESS(
+            f'{rendered} PDFs rendered, {cached} already cached, in {elapsed:.1f}s ({rate:.0f} PDFs/s)'
+        ))
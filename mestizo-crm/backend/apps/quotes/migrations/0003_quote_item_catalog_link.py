@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def link_catalog_items(apps, schema_editor):
+    """Link existing lines to the catalog item of the same name, when unambiguous."""
+    CatalogItem = apps.get_model("catalog", "CatalogItem")
+    QuoteItem = apps.get_model("quotes", "QuoteItem")
+    unique_names = (
+        CatalogItem.objects.values("name")
+        .annotate(matches=Count("id"))
+        .filter(matches=1)
+        .values("name")
+    )
+    QuoteItem.objects.filter(name__in=unique_names).update(
+        catalog_item=Subquery(
+            CatalogItem.objects.filter(name=OuterRef("name")).values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0001_initial"),
+        ("quotes", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quoteitem",
+            name="catalog_item",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="quote_items",
+                to="catalog.catalogitem",
+            ),
+        ),
+        migrations.RunPython(link_catalog_items, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,15 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from decimal import Decimal
 
 
+LINE_TOTAL = ExpressionWrapper(
+    F('qty') * F('unit_price'), output_field=DecimalField(max_digits=22, decimal_places=4)
+)
+
+
 class Quote(models.Model):
     """Quote/Quotation model."""
     
@@ -40,13 +47,25 @@ class Quote(models.Model):
         return f"COT-{self.id:04d} - {self.customer.name}"
     
     def recalculate_total(self):
-        """Recalculate total from items."""
-        total = sum(
-            item.qty * item.unit_price for item in self.items.all()
-        )
+        """Recalculate total from items with a single SUM in the database."""
+        total = self.items.aggregate(total=Sum(LINE_TOTAL))['total'] or Decimal('0')
         self.total = total
         self.save(update_fields=['total'])
         return total
+    
+    @classmethod
+    def add_to_total(cls, quote_id, amount):
+        """Shift a stored total by `amount` in a single UPDATE ... SET total = total + amount."""
+        if amount:
+            cls.objects.filter(pk=quote_id).update(total=F('total') + amount)
+    
+    @staticmethod
+    def items_total():
+        """Subquery with SUM(qty * unit_price) of the outer quote's items (0 without items)."""
+        totals = QuoteItem.objects.filter(quote=OuterRef('pk')).order_by().values('quote').annotate(
+            total=Sum(LINE_TOTAL)
+        ).values('total')
+        return Coalesce(Subquery(totals), Value(Decimal('0')), output_field=LINE_TOTAL.output_field)
 
 
 class QuoteItem(models.Model):
@@ -58,6 +77,10 @@ class QuoteItem(models.Model):
     ]
     
     quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name='items')
+    catalog_item = models.ForeignKey(
+        'catalog.CatalogItem', on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='quote_items'
+    )
     item_type = models.CharField(max_length=10, choices=TYPE_CHOICES, default='PRODUCT')
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -75,11 +98,85 @@ class QuoteItem(models.Model):
     def line_total(self):
         return self.qty * self.unit_price
     
+    def locked_state(self):
+        """(quote_id, line_total) as stored, locking the row until commit."""
+        row = QuoteItem.objects.select_for_update().filter(pk=self.pk).values_list(
+            'quote_id', 'qty', 'unit_price'
+        ).first()
+        return (row[0], row[1] * row[2]) if row else None
+    
+    def refresh_quote_total(self):
+        if QuoteItem.quote.is_cached(self):
+            self.quote.refresh_from_db(fields=['total'])
+    
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.quote.recalculate_total()
+        # Apply only this line's change to the quote total, so concurrent
+        # edits of other lines never overwrite each other.
+        with transaction.atomic():
+            old = self.locked_state() if not self._state.adding and self.pk else None
+            super().save(*args, **kwargs)
+            line_total = Decimal(str(self.qty)) * Decimal(str(self.unit_price))
+            if old and old[0] != self.quote_id:
+                Quote.add_to_total(old[0], -old[1])
+            elif old:
+                line_total -= old[1]
+            Quote.add_to_total(self.quote_id, line_total)
+        self.refresh_quote_total()
     
     def delete(self, *args, **kwargs):
-        quote = self.quote
-        super().delete(*args, **kwargs)
-        quote.recalculate_total()
+        with transaction.atomic():
+            old = self.locked_state()
+            result = super().delete(*args, **kwargs)
+            if old:
+                Quote.add_to_total(old[0], -old[1])
+        self.refresh_quote_total()
+        return result
+
+
+class QuoteTemplate(models.Model):
+    """Reusable set of lines (e.g. "Mantenimiento Mensual") to start quotes from."""
+    
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    notes = models.TextField(blank=True, help_text='Notas copiadas a cada cotización nueva')
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='created_quote_templates'
+    )
+    
+    class Meta:
+        verbose_name = 'Plantilla de Cotización'
+        verbose_name_plural = 'Plantillas de Cotización'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class QuoteTemplateItem(models.Model):
+    """Line item of a quote template."""
+    
+    template = models.ForeignKey(QuoteTemplate, on_delete=models.CASCADE, related_name='items')
+    catalog_item = models.ForeignKey(
+        'catalog.CatalogItem', on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='template_items'
+    )
+    item_type = models.CharField(max_length=10, choices=QuoteItem.TYPE_CHOICES, default='PRODUCT')
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    qty = models.DecimalField(max_digits=10, decimal_places=2, default=1)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = 'Item de Plantilla'
+        verbose_name_plural = 'Items de Plantilla'
+    
+    def __str__(self):
+        return f"{self.name} x {self.qty}"
+    
+    @property
+    def line_total(self):
+        return self.qty * self.unit_price
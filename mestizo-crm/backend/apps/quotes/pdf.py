@@ -0,0 +1,199 @@
+"""
+Minimal pure-Python PDF writer for quote documents.
+
+Only what a quote needs: the standard Helvetica fonts (no embedding),
+WinAnsi text (Spanish accents included), lines and automatic page breaks.
+Output is deterministic for the same input, which lets rendered files be
+cached by content hash. No Django imports, so process-pool workers can
+use it directly.
+"""
+import os
+import tempfile
+from decimal import Decimal
+
+
+PAGE_WIDTH = 595  # A4, in points
+PAGE_HEIGHT = 842
+MARGIN = 50
+LINE_HEIGHT = 14
+
+FONTS = {'regular': 'F1', 'bold': 'F2'}
+# Helvetica advance widths (1/1000 em) for the characters used in amounts.
+NUMBER_WIDTHS = {**{digit: 556 for digit in '0123456789'}, '.': 278, ',': 278, '$': 556, ' ': 278, '-': 333}
+DEFAULT_WIDTH = 556
+
+
+def escape(text):
+    encoded = str(text).encode('cp1252', errors='replace')
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def text_width(text, size):
+    return sum(NUMBER_WIDTHS.get(char, DEFAULT_WIDTH) for char in str(text)) * size / 1000
+
+
+def format_amount(value):
+    """1234567.5 -> '$ 1.234.567,50' (es-AR)."""
+    amount = f'{Decimal(value):,.2f}'
+    return '$ ' + amount.replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def format_quantity(value):
+    """'2.00' -> '2', '1.50' -> '1,5'."""
+    return f'{Decimal(value).normalize():f}'.replace('.', ',')
+
+
+def truncate(text, limit):
+    text = ' '.join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+class PdfDocument:
+    """Accumulates pages of drawing operators and serializes them to PDF bytes."""
+    
+    def __init__(self):
+        self.pages = []
+        self.new_page()
+    
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - MARGIN
+    
+    def text(self, x, y, value, size=10, font='regular'):
+        self.ops.append(b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET' % (
+            FONTS[font].encode(), size, x, y, escape(value)
+        ))
+    
+    def text_right(self, right, y, value, size=10, font='regular'):
+        self.text(right - text_width(value, size), y, value, size, font)
+    
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.ops.append(b'%.2f w %.2f %.2f m %.2f %.2f l S' % (width, x1, y1, x2, y2))
+    
+    def ensure_space(self, height):
+        """Start a new page when fewer than `height` points are left."""
+        if self.y - height < MARGIN:
+            self.new_page()
+            return True
+        return False
+    
+    def render(self):
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            None,  # page tree, filled in once the page objects are numbered
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        ]
+        kids = []
+        for ops in self.pages:
+            stream = b'\n'.join(ops)
+            objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+            objects.append(
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+                b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+                % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+            )
+            kids.append(b'%d 0 R' % len(objects))
+        objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(kids), len(kids))
+        
+        output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(output))
+            output += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        xref = len(output)
+        output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+        return bytes(output)
+
+
+COLUMNS = [
+    # (header, x or right edge, right-aligned)
+    ('Descripción', MARGIN, False),
+    ('Cant.', 360, True),
+    ('Precio unit.', 450, True),
+    ('Subtotal', PAGE_WIDTH - MARGIN, True),
+]
+
+
+def item_header(pdf):
+    for label, x, right in COLUMNS:
+        (pdf.text_right if right else pdf.text)(x, pdf.y, label, size=9, font='bold')
+    pdf.line(MARGIN, pdf.y - 4, PAGE_WIDTH - MARGIN, pdf.y - 4)
+    pdf.y -= LINE_HEIGHT + 4
+
+
+def render_quote(document):
+    """
+    Render a quote to PDF bytes.
+    
+    `document` is the plain dict built by apps.quotes.documents.quote_document
+    (number, status, dates, customer, items, total, notes).
+    """
+    pdf = PdfDocument()
+    right = PAGE_WIDTH - MARGIN
+    
+    pdf.text(MARGIN, pdf.y, 'Mestizo', size=20, font='bold')
+    pdf.text_right(right, pdf.y, document['number'], size=16, font='bold')
+    pdf.y -= 18
+    pdf.text_right(right, pdf.y, f"Fecha: {document['date']}", size=9)
+    if document['valid_until']:
+        pdf.y -= 12
+        pdf.text_right(right, pdf.y, f"Válida hasta: {document['valid_until']}", size=9)
+    pdf.y -= 12
+    pdf.text_right(right, pdf.y, f"Estado: {document['status']}", size=9)
+    
+    pdf.y -= 30
+    customer = document['customer']
+    pdf.text(MARGIN, pdf.y, 'Cliente', size=9, font='bold')
+    pdf.y -= LINE_HEIGHT
+    pdf.text(MARGIN, pdf.y, customer['name'], size=11, font='bold')
+    for detail in (customer['email'], customer['phone']):
+        if detail:
+            pdf.y -= LINE_HEIGHT
+            pdf.text(MARGIN, pdf.y, detail, size=9)
+    
+    pdf.y -= 30
+    item_header(pdf)
+    for item in document['items']:
+        lines = 2 if item['description'] else 1
+        if pdf.ensure_space(lines * LINE_HEIGHT):
+            item_header(pdf)
+        pdf.text(MARGIN, pdf.y, truncate(item['name'], 55), size=9)
+        pdf.text_right(360, pdf.y, format_quantity(item['qty']), size=9)
+        pdf.text_right(450, pdf.y, format_amount(item['unit_price']), size=9)
+        pdf.text_right(right, pdf.y, format_amount(item['line_total']), size=9)
+        if item['description']:
+            pdf.y -= LINE_HEIGHT - 3
+            pdf.text(MARGIN + 8, pdf.y, truncate(item['description'], 80), size=7)
+        pdf.y -= LINE_HEIGHT
+    
+    pdf.ensure_space(3 * LINE_HEIGHT)
+    pdf.line(MARGIN, pdf.y + 6, right, pdf.y + 6)
+    pdf.y -= 6
+    pdf.text_right(450, pdf.y, 'Total', size=11, font='bold')
+    pdf.text_right(right, pdf.y, format_amount(document['total']), size=11, font='bold')
+    
+    if document['notes']:
+        pdf.y -= 2 * LINE_HEIGHT
+        pdf.ensure_space(2 * LINE_HEIGHT)
+        pdf.text(MARGIN, pdf.y, 'Notas', size=9, font='bold')
+        for note in document['notes'].splitlines():
+            pdf.ensure_space(LINE_HEIGHT)
+            pdf.y -= LINE_HEIGHT
+            pdf.text(MARGIN, pdf.y, truncate(note, 100), size=9)
+    
+    return pdf.render()
+
+
+def render_to_file(document, path):
+    """Process-pool entry point: render and write atomically to `path`."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(handle, 'wb') as output:
+        output.write(render_quote(document))
+    os.replace(temporary, path)
+    return path
@@ -0,0 +1,52 @@
+"""
+Propagation of catalog reference prices to draft quotes.
+
+Only lines linked to a catalog item (QuoteItem.catalog_item) on DRAFT
+quotes are touched; sent or answered quotes keep the price the customer
+saw. Everything is set-based: one UPDATE for the lines and one UPDATE
+recomputing the affected totals from a grouped subquery.
+"""
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+
+from apps.catalog.models import CatalogItem
+from apps.common import conditional
+from .models import Quote, QuoteItem
+
+
+@dataclass
+class PropagationResult:
+    rows: int
+    quotes: int
+    dry_run: bool
+
+
+def stale_items(catalog_item_ids=None):
+    """Linked lines on DRAFT quotes whose unit price differs from the catalog."""
+    items = QuoteItem.objects.filter(
+        quote__status='DRAFT', catalog_item__isnull=False
+    ).exclude(unit_price=F('catalog_item__price_ref'))
+    if catalog_item_ids is not None:
+        items = items.filter(catalog_item_id__in=catalog_item_ids)
+    return items
+
+
+def propagate_catalog_prices(catalog_item_ids=None, dry_run=False):
+    """Copy price_ref onto stale draft lines and fix the totals they belong to."""
+    with transaction.atomic():
+        items = stale_items(catalog_item_ids)
+        quote_ids = list(items.order_by().values_list('quote_id', flat=True).distinct())
+        if dry_run or not quote_ids:
+            return PropagationResult(rows=items.count(), quotes=len(quote_ids), dry_run=dry_run)
+        
+        # Lock the quotes first so concurrent item edits (which shift the
+        # totals by deltas) wait for the recomputation below.
+        list(Quote.objects.select_for_update().filter(pk__in=quote_ids).values_list('pk', flat=True))
+        price = CatalogItem.objects.filter(pk=OuterRef('catalog_item_id')).values('price_ref')
+        rows = stale_items(catalog_item_ids).update(unit_price=Subquery(price))
+        Quote.objects.filter(pk__in=quote_ids).update(total=Quote.items_total())
+    # Queryset updates send no post_save.
+    conditional.touch(Quote)
+    return PropagationResult(rows=rows, quotes=len(quote_ids), dry_run=False)
@@ -1,17 +1,21 @@
 from rest_framework import serializers
-from .models import Quote, QuoteItem
+from apps.common.sparse import SparseModelSerializer
+from apps.customers.models import Customer
+from apps.sales.models import Opportunity
+from .models import Quote, QuoteItem, QuoteTemplate, QuoteTemplateItem
 
 
-class QuoteItemSerializer(serializers.ModelSerializer):
+class QuoteItemSerializer(SparseModelSerializer):
     line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     
     class Meta:
         model = QuoteItem
         fields = [
-            'id', 'quote', 'item_type', 'name', 'description',
+            'id', 'quote', 'catalog_item', 'item_type', 'name', 'description',
             'qty', 'unit_price', 'line_total'
         ]
         read_only_fields = ['id']
+        field_sources = {'line_total': ['qty', 'unit_price']}
     
     def validate_qty(self, value):
         if value <= 0:
@@ -24,10 +28,45 @@ class QuoteItemSerializer(serializers.ModelSerializer):
         return value
 
 
-class QuoteListSerializer(serializers.ModelSerializer):
+class QuoteLineSerializer(QuoteItemSerializer):
+    """A line item inside a bulk edit; the quote comes from the URL."""
+    id = serializers.IntegerField(required=False)
+    
+    class Meta(QuoteItemSerializer.Meta):
+        fields = [field for field in QuoteItemSerializer.Meta.fields if field != 'quote']
+
+
+class QuoteItemBulkSerializer(serializers.Serializer):
+    """Items to add, replace (by id) and delete (ids) in one request."""
+    MAX_ITEMS = 500
+    
+    add = QuoteLineSerializer(many=True, required=False, max_length=MAX_ITEMS)
+    replace = QuoteLineSerializer(many=True, required=False, max_length=MAX_ITEMS)
+    delete = serializers.ListField(
+        child=serializers.IntegerField(), required=False, max_length=MAX_ITEMS
+    )
+    
+    def validate_add(self, value):
+        if any('id' in item for item in value):
+            raise serializers.ValidationError("Los items a agregar no llevan id")
+        return value
+    
+    def validate_replace(self, value):
+        if any('id' not in item for item in value):
+            raise serializers.ValidationError("Cada item a reemplazar necesita su id")
+        return value
+    
+    def validate(self, attrs):
+        replaced = {item['id'] for item in attrs.get('replace', [])}
+        if replaced & set(attrs.get('delete', [])):
+            raise serializers.ValidationError("Un item no puede reemplazarse y eliminarse a la vez")
+        return attrs
+
+
+class QuoteListSerializer(SparseModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
-    items_count = serializers.SerializerMethodField()
+    items_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Quote
@@ -35,12 +74,9 @@ class QuoteListSerializer(serializers.ModelSerializer):
             'id', 'customer', 'customer_name', 'status', 'status_display',
             'total', 'valid_until', 'created_at', 'items_count'
         ]
-    
-    def get_items_count(self, obj):
-        return obj.items.count()
 
 
-class QuoteDetailSerializer(serializers.ModelSerializer):
+class QuoteDetailSerializer(SparseModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     opportunity_title = serializers.CharField(source='opportunity.title', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -54,6 +90,7 @@ class QuoteDetailSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'created_by', 'items'
         ]
         read_only_fields = ['id', 'total', 'created_at', 'updated_at', 'created_by']
+        expandable_fields = ['items']
     
     def create(self, validated_data):
         request = self.context.get('request')
@@ -65,3 +102,69 @@ class QuoteDetailSerializer(serializers.ModelSerializer):
 class QuoteStatusSerializer(serializers.Serializer):
     """Serializer for status change action."""
     status = serializers.ChoiceField(choices=Quote.STATUS_CHOICES)
+
+
+class QuoteTemplateItemSerializer(QuoteItemSerializer):
+    class Meta:
+        model = QuoteTemplateItem
+        fields = [
+            'id', 'catalog_item', 'item_type', 'name', 'description',
+            'qty', 'unit_price', 'line_total'
+        ]
+        read_only_fields = ['id']
+        field_sources = {'line_total': ['qty', 'unit_price']}
+
+
+class QuoteTemplateSerializer(SparseModelSerializer):
+    items = QuoteTemplateItemSerializer(many=True, required=False)
+    
+    class Meta:
+        model = QuoteTemplate
+        fields = [
+            'id', 'name', 'description', 'notes', 'active', 'items',
+            'created_at', 'updated_at', 'created_by'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
+    
+    def save_items(self, template, items):
+        QuoteTemplateItem.objects.bulk_create(
+            QuoteTemplateItem(template=template, **item) for item in items
+        )
+    
+    def create(self, validated_data):
+        items = validated_data.pop('items', [])
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            validated_data['created_by'] = request.user
+        template = super().create(validated_data)
+        self.save_items(template, items)
+        return template
+    
+    def update(self, instance, validated_data):
+        items = validated_data.pop('items', None)
+        template = super().update(instance, validated_data)
+        if items is not None:
+            # Sending items replaces the whole list.
+            template.items.all().delete()
+            self.save_items(template, items)
+        return template
+
+
+class QuoteCloneSerializer(serializers.Serializer):
+    """Source (a quote or a template) and overrides for the new quote."""
+    quote = serializers.PrimaryKeyRelatedField(queryset=Quote.objects.all(), required=False)
+    template = serializers.PrimaryKeyRelatedField(
+        queryset=QuoteTemplate.objects.filter(active=True), required=False
+    )
+    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all(), required=False)
+    opportunity = serializers.PrimaryKeyRelatedField(
+        queryset=Opportunity.objects.all(), required=False, allow_null=True
+    )
+    valid_until = serializers.DateField(required=False, allow_null=True)
+    
+    def validate(self, attrs):
+        if ('quote' in attrs) == ('template' in attrs):
+            raise serializers.ValidationError("Indique una cotización o una plantilla de origen")
+        if 'template' in attrs and 'customer' not in attrs:
+            raise serializers.ValidationError({'customer': "Requerido al usar una plantilla"})
+        return attrs
@@ -2,24 +2,43 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.sparse import SparseQuerysetMixin
+from apps.search.filters import IndexedSearchFilter
+from django.db import transaction
+from django.db.models import Count
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
 
-from .models import Quote, QuoteItem
+from . import cloning, documents
+from .models import Quote, QuoteItem, QuoteTemplate
+from .renderers import PDFRenderer
 from .serializers import (
     QuoteListSerializer, QuoteDetailSerializer, QuoteStatusSerializer,
-    QuoteItemSerializer
+    QuoteItemSerializer, QuoteItemBulkSerializer, QuoteCloneSerializer,
+    QuoteTemplateSerializer
 )
 
 
-class QuoteViewSet(viewsets.ModelViewSet):
+class QuoteViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Quote CRUD operations."""
     queryset = Quote.objects.all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
     filterset_fields = ['status', 'customer', 'opportunity']
     search_fields = ['customer__name', 'notes']
     ordering_fields = ['created_at', 'total', 'valid_until']
     ordering = ['-created_at']
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and self.wants('items_count'):
+            queryset = queryset.annotate(items_count=Count('items'))
+        elif self.action == 'pdf':
+            queryset = documents.document_queryset(queryset)
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return QuoteListSerializer
@@ -37,11 +56,100 @@ class QuoteViewSet(viewsets.ModelViewSet):
             return Response(QuoteDetailSerializer(quote).data)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'])
+    def clone(self, request):
+        """New draft quote copied from `quote` or `template`, lines included."""
+        serializer = QuoteCloneSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = dict(serializer.validated_data)
+        
+        quote = data.pop('quote', None)
+        template = data.pop('template', None)
+        if request.user.is_authenticated:
+            data['created_by'] = request.user
+        if quote is not None:
+            new_quote = cloning.clone_quote(quote, **data)
+        else:
+            new_quote = cloning.quote_from_template(template, **data)
+        return Response(QuoteDetailSerializer(new_quote).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, PDFRenderer])
+    def pdf(self, request, pk=None):
+        """The quote as a PDF, cached by content hash and revalidated with its ETag."""
+        quote = self.get_object()
+        document = documents.quote_document(quote)
+        etag = f'"{documents.content_hash(document)}"'
+        
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in etags or '*' in etags:
+            response = HttpResponseNotModified()
+        else:
+            path, _ = documents.get_pdf(quote)
+            # FileResponse streams the file in blocks instead of loading it.
+            response = FileResponse(
+                open(path, 'rb'), content_type='application/pdf', filename=f"{document['number']}.pdf"
+            )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    @action(detail=True, methods=['post'], url_path='items/bulk')
+    def bulk_items(self, request, pk=None):
+        """
+        Add, replace and delete many items at once.
+        
+        Everything runs in one transaction with one bulk statement per kind of
+        change and a single total recalculation at the end.
+        """
+        quote = self.get_object()
+        serializer = QuoteItemBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        
+        with transaction.atomic():
+            quote = Quote.objects.select_for_update().get(pk=quote.pk)
+            replace = {item.pop('id'): item for item in data.get('replace', [])}
+            delete = set(data.get('delete', []))
+            existing = set(quote.items.filter(pk__in=replace.keys() | delete).values_list('pk', flat=True))
+            missing = (replace.keys() | delete) - existing
+            if missing:
+                return Response(
+                    {'error': f'Items inexistentes en esta cotización: {sorted(missing)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            if delete:
+                # Queryset delete skips QuoteItem.delete() and its recalculation.
+                QuoteItem.objects.filter(pk__in=delete).delete()
+            if replace:
+                QuoteItem.objects.bulk_update(
+                    [QuoteItem(pk=pk, quote=quote, **item) for pk, item in replace.items()],
+                    fields=['catalog_item', 'item_type', 'name', 'description', 'qty', 'unit_price'],
+                )
+            QuoteItem.objects.bulk_create(
+                [QuoteItem(quote=quote, **item) for item in data.get('add', [])]
+            )
+            quote.recalculate_total()
+        
+        return Response(QuoteDetailSerializer(quote).data)
 
 
-class QuoteItemViewSet(viewsets.ModelViewSet):
+class QuoteItemViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for QuoteItem CRUD operations."""
     queryset = QuoteItem.objects.all()
     serializer_class = QuoteItemSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['quote', 'item_type']
+
+
+class QuoteTemplateViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
+    """ViewSet for QuoteTemplate CRUD operations (items nested)."""
+    queryset = QuoteTemplate.objects.prefetch_related('items')
+    serializer_class = QuoteTemplateSerializer
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['active']
+    ordering_fields = ['name', 'created_at']
+    ordering = ['name']
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Lead, Opportunity, Activity
+from .models import Lead, Opportunity, Activity, StageTransition
 
 
 @admin.register(Lead)
@@ -18,6 +18,15 @@ class OpportunityAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'updated_at')
 
 
+@admin.register(StageTransition)
+class StageTransitionAdmin(admin.ModelAdmin):
+    list_display = ('opportunity', 'from_stage', 'to_stage', 'changed_at', 'seconds_in_stage')
+    list_filter = ('to_stage', 'changed_at')
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Activity)
 class ActivityAdmin(admin.ModelAdmin):
     list_display = ('type', 'notes_short', 'customer', 'opportunity', 'due_at', 'is_done')
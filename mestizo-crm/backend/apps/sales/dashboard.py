@@ -0,0 +1,88 @@
+"""
+Dashboard statistics: one conditional-aggregation query per table, cached.
+
+Cached values are keyed by a version number that signals bump on every
+Lead/Opportunity/Quote/Activity write, so a write invalidates every scope at
+once without having to know which keys exist. DASHBOARD_CACHE_TTL bounds
+staleness for writes that bypass signals (bulk updates).
+"""
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from apps.common import versions
+from .models import Lead, Opportunity, Activity
+from apps.quotes.models import Quote
+
+
+VERSION_KEY = 'dashboard:version'
+
+
+def compute_stats(user=None):
+    """Build the dashboard payload; with `user`, only their own records count."""
+    leads = Lead.objects.all()
+    opportunities = Opportunity.objects.all()
+    quotes = Quote.objects.all()
+    activities = Activity.objects.all()
+    if user is not None:
+        leads = leads.filter(created_by=user)
+        opportunities = opportunities.filter(assigned_to=user)
+        quotes = quotes.filter(created_by=user)
+        activities = activities.filter(assigned_to=user)
+    
+    lead_counts = leads.aggregate(
+        new=Count('id', filter=Q(status='NEW')),
+        qualified=Count('id', filter=Q(status='QUALIFIED')),
+    )
+    opportunity_stats = opportunities.aggregate(
+        total_pipeline_value=Sum('value_estimate', filter=~Q(stage__in=['WON', 'LOST'])),
+        **{
+            stage_code: Count('id', filter=Q(stage=stage_code))
+            for stage_code, stage_name in Opportunity.STAGE_CHOICES
+        }
+    )
+    quote_counts = quotes.aggregate(
+        draft=Count('id', filter=Q(status='DRAFT')),
+        sent=Count('id', filter=Q(status='SENT')),
+    )
+    activities_pending = activities.aggregate(
+        pending=Count('id', filter=Q(done_at__isnull=True))
+    )['pending']
+    
+    total_pipeline_value = opportunity_stats.pop('total_pipeline_value') or 0
+    return {
+        'leads': lead_counts,
+        'opportunities_by_stage': opportunity_stats,
+        'total_pipeline_value': float(total_pipeline_value),
+        'quotes': quote_counts,
+        'activities_pending': activities_pending,
+    }
+
+
+def get_version():
+    return versions.get_version(VERSION_KEY)
+
+
+def invalidate(**kwargs):
+    """Signal receiver: make every cached dashboard stale."""
+    # Again once committed: a dashboard read in between computes from the
+    # old rows and would cache them under the version bumped here.
+    versions.bump(VERSION_KEY)
+    transaction.on_commit(partial(versions.bump, VERSION_KEY))
+
+
+def get_stats(user=None):
+    """Return (stats, cache_hit, age_in_seconds) for the given scope."""
+    scope = f'user:{user.pk}' if user is not None else 'all'
+    key = f'dashboard:stats:{get_version()}:{scope}'
+    cached = cache.get(key)
+    if cached is not None:
+        return cached['stats'], True, int(time.time() - cached['computed_at'])
+    
+    stats = compute_stats(user)
+    cache.set(key, {'stats': stats, 'computed_at': time.time()}, timeout=settings.DASHBOARD_CACHE_TTL)
+    return stats, False, 0
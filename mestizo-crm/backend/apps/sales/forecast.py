@@ -0,0 +1,234 @@
+"""
+Weighted sales forecast over every open opportunity.
+
+The database groups open rows by (stage, assignee, close date) with COUNT
+and SUM, and the groups become NumPy arrays: weighting each group by its
+stage's win probability (settings.FORECAST_WIN_PROBABILITIES, overridable
+per request) and rolling them up by month and assignee are a few bincount
+passes. Monte Carlo bands are optional; they draw every opportunity, so only
+then are the rows themselves streamed into an array, and the runs go to a
+process pool.
+"""
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models import Case, Count, F, FloatField, IntegerField, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, ExtractMonth, ExtractYear
+
+from . import simulation
+from .models import Opportunity
+
+
+logger = logging.getLogger(__name__)
+
+OPEN_STAGES = [code for code, _ in Opportunity.STAGE_CHOICES if code not in ('WON', 'LOST')]
+NO_MONTH = -1
+FETCH_SIZE = 10000
+PERCENTILES = (10, 50, 90)
+
+_pool_lock = threading.Lock()
+
+
+def win_probabilities(overrides=None):
+    probabilities = {**settings.FORECAST_WIN_PROBABILITIES, **(overrides or {})}
+    return {stage: float(probabilities.get(stage, 0)) for stage in OPEN_STAGES}
+
+
+def parse_probabilities(raw):
+    """Parse 'NEW:0.1,NEGOTIATION:0.8'; raises ValueError on bad input."""
+    probabilities = {}
+    for pair in filter(None, raw.split(',')):
+        stage, _, probability = pair.partition(':')
+        probability = float(probability)
+        if stage not in OPEN_STAGES or not 0 <= probability <= 1:
+            raise ValueError(pair)
+        probabilities[stage] = probability
+    return probabilities
+
+
+def fetch_array(queryset, columns):
+    """Rows of an all-numeric queryset as a float64 (rows, columns) array, read in chunks."""
+    data = np.empty((FETCH_SIZE, columns))
+    filled = 0
+    # Straight from the cursor: no Django per-row result processing, and no
+    # list of every row's tuple alongside the array.
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while chunk := cursor.fetchmany(FETCH_SIZE):
+            if filled + len(chunk) > len(data):
+                data = np.concatenate([data, np.empty((len(data), columns))])
+            data[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+    return data[:filled]
+
+
+def month_number(close_date):
+    return NO_MONTH if close_date is None else close_date.year * 12 + close_date.month - 1
+
+
+def load_open_groups():
+    """
+    (stage index, assignee, month, count, value) arrays of open opportunities,
+    one entry per (stage, assignee, close date): the database aggregates.
+    """
+    # Grouped on the bare columns, which is cheaper than computing the month
+    # per row; there are only as many groups as distinct combinations.
+    groups = list(
+        Opportunity.objects.filter(stage__in=OPEN_STAGES).order_by()
+        .values('stage', 'assigned_to_id', 'close_date')
+        .annotate(count=Count('pk'), total=Sum('value_estimate'))
+        .values_list('stage', 'assigned_to_id', 'close_date', 'count', 'total')
+    )
+    stage_index = {stage: index for index, stage in enumerate(OPEN_STAGES)}
+    return (
+        np.array([stage_index[stage] for stage, *_ in groups], dtype=np.intp),
+        np.array([assignee or 0 for _, assignee, *_ in groups], dtype=np.int64),
+        np.array([month_number(close_date) for _, _, close_date, *_ in groups], dtype=np.int64),
+        np.array([count for *_, count, _ in groups], dtype=np.float64),
+        np.array([float(total or 0) for *_, total in groups], dtype=np.float64),
+    )
+
+
+def load_open_opportunities():
+    """The same arrays with one entry per open opportunity, as simulations need."""
+    queryset = Opportunity.objects.filter(stage__in=OPEN_STAGES).order_by().values_list(
+        Case(
+            *[When(stage=stage, then=Value(index)) for index, stage in enumerate(OPEN_STAGES)],
+            output_field=IntegerField(),
+        ),
+        Coalesce(F('assigned_to_id'), Value(0)),
+        Coalesce(
+            Cast(ExtractYear('close_date') * 12 + ExtractMonth('close_date') - 1, IntegerField()),
+            Value(NO_MONTH),
+        ),
+        Cast('value_estimate', FloatField()),
+    )
+    data = fetch_array(queryset, 4)
+    return (
+        data[:, 0].astype(np.intp), data[:, 1].astype(np.int64),
+        data[:, 2].astype(np.int64), np.ones(len(data)), data[:, 3],
+    )
+
+
+def month_label(month):
+    return None if month == NO_MONTH else f'{month // 12:04d}-{month % 12 + 1:02d}'
+
+
+def group_totals(index, size, count, value, weighted):
+    return zip(
+        np.bincount(index, weights=count, minlength=size).astype(np.int64).tolist(),
+        np.bincount(index, weights=value, minlength=size).round(2).tolist(),
+        np.bincount(index, weights=weighted, minlength=size).round(2).tolist(),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_pool():
+    return ProcessPoolExecutor(max_workers=settings.FORECAST_WORKERS)
+
+
+def reset_pool(broken):
+    """Drop `broken` so that the next get_pool() starts new workers."""
+    with _pool_lock:
+        if get_pool.cache_info().currsize and get_pool() is broken:
+            get_pool.cache_clear()
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def run_simulations(win_probability, value, group, group_count, simulations, seed=None):
+    """
+    Split the runs across the process pool (inline with FORECAST_WORKERS <= 1).
+    
+    Each part has its own seed, so the result does not depend on where the
+    parts run.
+    """
+    workers = max(min(settings.FORECAST_WORKERS, simulations), 1)
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    runs = [len(part) for part in np.array_split(np.arange(simulations), workers)]
+    args = [(win_probability, value, group, group_count, count, child) for count, child in zip(runs, seeds)]
+    if workers == 1:
+        return simulation.simulate(*args[0])
+    pool = get_pool()
+    try:
+        futures = [pool.submit(simulation.simulate, *part) for part in args]
+        return np.vstack([future.result() for future in futures])
+    except BrokenProcessPool:
+        # A worker died (OOM kill, crash) and the pool refuses all work from
+        # now on: replace it for the next request and finish this one inline.
+        logger.warning('Forecast process pool broken; starting a new one')
+        reset_pool(pool)
+    return np.vstack([simulation.simulate(*part) for part in args])
+
+
+def bands(samples):
+    """p10/p50/p90 over the first axis of `samples`."""
+    values = np.percentile(samples, PERCENTILES, axis=0).round(2)
+    return {f'p{q}': band.tolist() for q, band in zip(PERCENTILES, values)}
+
+
+def forecast(probabilities, simulations=0, seed=None):
+    """Weighted revenue by close month and assignee, with optional Monte Carlo bands."""
+    if simulations:
+        # Every opportunity is drawn separately, so the rows themselves are needed.
+        stage, assignee, month, count, value = load_open_opportunities()
+    else:
+        stage, assignee, month, count, value = load_open_groups()
+    win_probability = np.array([probabilities[code] for code in OPEN_STAGES])[stage]
+    weighted = value * win_probability
+    
+    months, month_index = np.unique(month, return_inverse=True)
+    assignees, assignee_index = np.unique(assignee, return_inverse=True)
+    cells, cell_index = np.unique(month_index * len(assignees) + assignee_index, return_inverse=True)
+    emails = dict(get_user_model().objects.filter(pk__in=assignees.tolist()).values_list('pk', 'email'))
+    
+    by_month = [
+        {'month': month_label(m), 'count': count, 'pipeline_value': total, 'weighted_value': expected}
+        for m, (count, total, expected) in zip(
+            months.tolist(), group_totals(month_index, len(months), count, value, weighted)
+        )
+    ]
+    by_assignee = [
+        {
+            'assigned_to': user_id or None, 'assigned_to_email': emails.get(user_id),
+            'count': count, 'pipeline_value': total, 'weighted_value': expected,
+        }
+        for user_id, (count, total, expected) in zip(
+            assignees.tolist(), group_totals(assignee_index, len(assignees), count, value, weighted)
+        )
+    ]
+    by_month_assignee = [
+        {
+            'month': month_label(months[cell // len(assignees)]),
+            'assigned_to': int(assignees[cell % len(assignees)]) or None,
+            'weighted_value': expected,
+        }
+        for cell, expected in zip(
+            cells.tolist(), np.bincount(cell_index, weights=weighted, minlength=len(cells)).round(2).tolist()
+        )
+    ]
+    result = {
+        'probabilities': probabilities,
+        'open_count': int(count.sum()),
+        'pipeline_value': round(float(value.sum()), 2),
+        'weighted_value': round(float(weighted.sum()), 2),
+        'by_month': by_month,
+        'by_assignee': by_assignee,
+        'by_month_assignee': by_month_assignee,
+    }
+    
+    if simulations and value.shape[0]:
+        revenue = run_simulations(win_probability, value, month_index, len(months), simulations, seed)
+        month_bands = bands(revenue)
+        for index, row in enumerate(by_month):
+            row['bands'] = {label: values[index] for label, values in month_bands.items()}
+        result['simulations'] = simulations
+        result['bands'] = bands(revenue.sum(axis=1))
+    return result
@@ -0,0 +1,154 @@
+"""
+Stage-transition log and the funnel counters derived from it.
+
+Every transition is appended to StageTransition and, in the same
+transaction, folded into per-day counters: how many opportunities reached
+each funnel stage or were lost from it (StageDayStat), and a histogram of
+whole days spent in the stage that was left (StageDurationStat). A funnel
+report for any date window then sums a few rows per day instead of
+replaying the history.
+"""
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from apps.common.counters import increment
+from .models import Opportunity, StageDayStat, StageDurationStat, StageTransition
+
+
+# Funnel order; LOST is tracked as an exit from the stage it was lost from.
+FUNNEL_STAGES = [code for code, _ in Opportunity.STAGE_CHOICES if code != 'LOST']
+RANK = {stage: index for index, stage in enumerate(FUNNEL_STAGES)}
+SECONDS_PER_DAY = 86400
+DEFAULT_WINDOW_DAYS = 90
+
+
+def reached_stages(from_stage, to_stage):
+    """Funnel stages a move passes into; skipped stages count as reached."""
+    if to_stage not in RANK or from_stage == 'LOST':
+        return []
+    start = RANK[from_stage] + 1 if from_stage else 0
+    return FUNNEL_STAGES[start:RANK[to_stage] + 1]
+
+
+def fill_seconds_in_stage(transitions):
+    """Set seconds_in_stage from each opportunity's previous transition (or creation)."""
+    ids = {transition.opportunity_id for transition in transitions if transition.from_stage}
+    if not ids:
+        return
+    entered = dict(
+        StageTransition.objects.filter(opportunity_id__in=ids).order_by()
+        .values('opportunity_id').annotate(last=Max('changed_at')).values_list('opportunity_id', 'last')
+    )
+    missing = ids - entered.keys()
+    if missing:
+        entered.update(Opportunity.objects.filter(pk__in=missing).values_list('pk', 'created_at'))
+    
+    for transition in sorted(transitions, key=lambda t: t.changed_at):
+        since = entered.get(transition.opportunity_id)
+        if transition.from_stage and since is not None:
+            transition.seconds_in_stage = max(int((transition.changed_at - since).total_seconds()), 0)
+        entered[transition.opportunity_id] = transition.changed_at
+
+
+def tally(transitions):
+    """Counter deltas for a batch of transitions."""
+    day_counts = defaultdict(lambda: [0, 0])
+    durations = Counter()
+    for transition in transitions:
+        day = timezone.localdate(transition.changed_at)
+        for stage in reached_stages(transition.from_stage, transition.to_stage):
+            day_counts[(day, stage)][0] += 1
+        if transition.to_stage == 'LOST' and transition.from_stage:
+            day_counts[(day, transition.from_stage)][1] += 1
+        if transition.seconds_in_stage is not None:
+            days = transition.seconds_in_stage // SECONDS_PER_DAY
+            durations[(day, transition.from_stage, days)] += 1
+    return day_counts, durations
+
+
+def record_transitions(transitions):
+    """Append transitions in one INSERT and fold them into the funnel counters."""
+    if not transitions:
+        return []
+    with transaction.atomic():
+        fill_seconds_in_stage(transitions)
+        StageTransition.objects.bulk_create(transitions)
+        day_counts, durations = tally(transitions)
+        for (day, stage), (reached, lost) in day_counts.items():
+            increment(StageDayStat, {'day': day, 'stage': stage}, reached=reached, lost=lost)
+        for (day, stage, days), count in durations.items():
+            increment(StageDurationStat, {'day': day, 'stage': stage, 'days': days}, count=count)
+    return transitions
+
+
+def percentile(histogram, fraction):
+    """Nearest-rank percentile of a {days: count} histogram."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = max(1, math.ceil(fraction * total))
+    seen = 0
+    for days in sorted(histogram):
+        seen += histogram[days]
+        if seen >= rank:
+            return days
+
+
+def default_window():
+    today = timezone.localdate()
+    return today - timedelta(days=DEFAULT_WINDOW_DAYS - 1), today
+
+
+def report(date_from, date_to):
+    """
+    Funnel conversion and days-in-stage for transitions dated in the window.
+    
+    Ratios are flow-based: opportunities reaching the next stage in the
+    window over those reaching this stage in the window.
+    """
+    window = {'day__range': (date_from, date_to)}
+    counts = {
+        row['stage']: row
+        for row in StageDayStat.objects.filter(**window).order_by().values('stage').annotate(
+            reached=Sum('reached'), lost=Sum('lost'),
+        )
+    }
+    histograms = defaultdict(dict)
+    for stage, days, count in StageDurationStat.objects.filter(**window).order_by().values(
+        'stage', 'days'
+    ).annotate(total=Sum('count')).values_list('stage', 'days', 'total'):
+        histograms[stage][days] = count
+    
+    names = dict(Opportunity.STAGE_CHOICES)
+    stages = []
+    for index, stage in enumerate(FUNNEL_STAGES):
+        reached = counts.get(stage, {}).get('reached', 0)
+        following = FUNNEL_STAGES[index + 1] if index + 1 < len(FUNNEL_STAGES) else None
+        next_reached = counts.get(following, {}).get('reached', 0)
+        histogram = histograms.get(stage, {})
+        stages.append({
+            'stage': stage,
+            'stage_display': names[stage],
+            'reached': reached,
+            'lost': counts.get(stage, {}).get('lost', 0),
+            'conversion_to_next': round(next_reached / reached, 4) if following and reached else None,
+            'days_in_stage': {
+                'samples': sum(histogram.values()),
+                'median': percentile(histogram, 0.5),
+                'p90': percentile(histogram, 0.9),
+            },
+        })
+    
+    entered = stages[0]['reached']
+    won = counts.get('WON', {}).get('reached', 0)
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'stages': stages,
+        'win_rate': round(won / entered, 4) if entered else None,
+    }
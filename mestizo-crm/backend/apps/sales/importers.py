@@ -0,0 +1,26 @@
+from apps.imports.importers import import_csv
+
+from . import dashboard
+from .models import Lead
+
+
+def build_lead(row, user):
+    return Lead(
+        name=row.get('name', row.get('nombre', '')),
+        phone=row.get('phone', row.get('telefono', '')),
+        email=row.get('email', ''),
+        source=row.get('source', row.get('fuente', 'OTHER')).upper(),
+        notes=row.get('notes', row.get('notas', '')),
+        created_by=user,
+    )
+
+
+def import_leads_csv(uploaded_file, user, chunk_size=None, on_progress=None):
+    """Stream leads from a CSV upload, writing them in chunks."""
+    result = import_csv(
+        uploaded_file, lambda row: build_lead(row, user),
+        chunk_size=chunk_size, on_progress=on_progress
+    )
+    # bulk_create sends no post_save, so the dashboard cache is not bumped.
+    dashboard.invalidate()
+    return result
@@ -0,0 +1,72 @@
+import time
+from itertools import islice
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.sales.funnel import tally
+from apps.sales.models import Opportunity, StageDayStat, StageDurationStat, StageTransition
+
+
+CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = 'Recompute the funnel counters from the stage-transition log'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill', action='store_true',
+            help='First log a creation transition for opportunities that have none'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        chunk_size = options['chunk_size']
+        
+        with transaction.atomic():
+            if options['backfill']:
+                self.backfill(chunk_size)
+            
+            day_counts = {}
+            durations = {}
+            rows = StageTransition.objects.order_by('pk').iterator(chunk_size=chunk_size)
+            transitions = 0
+            while chunk := list(islice(rows, chunk_size)):
+                transitions += len(chunk)
+                chunk_counts, chunk_durations = tally(chunk)
+                for key, (reached, lost) in chunk_counts.items():
+                    totals = day_counts.setdefault(key, [0, 0])
+                    totals[0] += reached
+                    totals[1] += lost
+                for key, count in chunk_durations.items():
+                    durations[key] = durations.get(key, 0) + count
+            
+            StageDayStat.objects.all().delete()
+            StageDurationStat.objects.all().delete()
+            StageDayStat.objects.bulk_create([
+                StageDayStat(day=day, stage=stage, reached=reached, lost=lost)
+                for (day, stage), (reached, lost) in day_counts.items()
+            ], batch_size=chunk_size)
+            StageDurationStat.objects.bulk_create([
+                StageDurationStat(day=day, stage=stage, days=days, count=count)
+                for (day, stage, days), count in durations.items()
+            ], batch_size=chunk_size)
+        
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{transitions} transitions folded into {len(day_counts) + len(durations)} counter rows '
+            f'in {elapsed:.1f}s'
+        ))
+    
+    def backfill(self, chunk_size):
+        missing = Opportunity.objects.exclude(
+            pk__in=StageTransition.objects.values('opportunity_id')
+        ).order_by('pk').values_list('pk', 'stage', 'created_at').iterator(chunk_size=chunk_size)
+        created = 0
+        while chunk := list(islice(missing, chunk_size)):
+            StageTransition.objects.bulk_create([
+                StageTransition(opportunity_id=pk, from_stage='', to_stage=stage, changed_at=created_at)
+                for pk, stage, created_at in chunk
+            ])
+            created += len(chunk)
+        self.stdout.write(f'{created} opportunities backfilled')
@@ -0,0 +1,56 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from apps.sales.models import PipelineSummary
+from apps.sales.pipeline import CHUNK_SIZE, bucket_key, compute_buckets
+
+
+def lock_summary():
+    """On PostgreSQL, make apply_delta() writers wait until the transaction ends."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {PipelineSummary._meta.db_table} IN SHARE ROW EXCLUSIVE MODE')
+
+
+class Command(BaseCommand):
+    help = 'Recompute the pipeline summary table and report drift'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report drift')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        
+        with transaction.atomic():
+            lock_summary()
+            # Computed under the lock: writers that committed before it are in
+            # the snapshot, later ones apply their deltas after the rewrite.
+            expected = compute_buckets(chunk_size=options['chunk_size'])
+            stored = {row.bucket: row for row in PipelineSummary.objects.all()}
+            drift = []
+            rows = []
+            for (stage, assigned_to_id, close_month), (count, total) in expected.items():
+                bucket = bucket_key(stage, assigned_to_id, close_month)
+                row = stored.pop(bucket, None)
+                if row is None or row.opportunity_count != count or row.total_value != total:
+                    drift.append(bucket)
+                rows.append(PipelineSummary(
+                    bucket=bucket, stage=stage, assigned_to_id=assigned_to_id,
+                    close_month=close_month, opportunity_count=count, total_value=total,
+                ))
+            # Buckets left over have no opportunities behind them any more.
+            drift.extend(bucket for bucket, row in stored.items() if row.opportunity_count or row.total_value)
+            
+            for bucket in drift:
+                self.stdout.write(self.style.WARNING(f'Drift in bucket {bucket}'))
+            
+            if not options['dry_run']:
+                PipelineSummary.objects.all().delete()
+                PipelineSummary.objects.bulk_create(rows, batch_size=options['chunk_size'])
+        
+        elapsed = time.monotonic() - started
+        verb = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(rows)} buckets recomputed in {elapsed:.1f}s, {len(drift)} drifted buckets {verb}'
+        ))
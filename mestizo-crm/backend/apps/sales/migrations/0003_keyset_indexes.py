@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_initial"),
+        ("sales", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(fields=["-due_at", "-id"], name="activity_due_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="lead_created_id_idx"
+            ),
+        ),
+    ]
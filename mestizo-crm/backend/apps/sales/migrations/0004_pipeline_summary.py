@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales", "0003_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PipelineSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.CharField(max_length=64, unique=True)),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("NEW", "Nuevo"),
+                            ("CONTACTED", "Contactado"),
+                            ("VISIT_SCHEDULED", "Visita Agendada"),
+                            ("QUOTE_SENT", "Cotización Enviada"),
+                            ("NEGOTIATION", "En Negociación"),
+                            ("WON", "Ganado"),
+                            ("LOST", "Perdido"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("close_month", models.DateField(blank=True, null=True)),
+                ("opportunity_count", models.IntegerField(default=0)),
+                (
+                    "total_value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "assigned_to",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de Pipeline",
+                "verbose_name_plural": "Resumen de Pipeline",
+                "ordering": ["stage", "close_month"],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_initial"),
+        ("sales", "0004_pipeline_summary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="opportunity",
+            index=models.Index(
+                fields=["stage", "-created_at", "-id"],
+                name="opportunity_stage_created_idx",
+            ),
+        ),
+    ]
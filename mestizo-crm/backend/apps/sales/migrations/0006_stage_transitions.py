@@ -0,0 +1,168 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales", "0005_opportunity_stage_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StageDayStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("NEW", "Nuevo"),
+                            ("CONTACTED", "Contactado"),
+                            ("VISIT_SCHEDULED", "Visita Agendada"),
+                            ("QUOTE_SENT", "Cotización Enviada"),
+                            ("NEGOTIATION", "En Negociación"),
+                            ("WON", "Ganado"),
+                            ("LOST", "Perdido"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("reached", models.PositiveIntegerField(default=0)),
+                ("lost", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Estadística Diaria de Etapa",
+                "verbose_name_plural": "Estadísticas Diarias de Etapa",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "stage"), name="stage_day_stat_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StageDurationStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("NEW", "Nuevo"),
+                            ("CONTACTED", "Contactado"),
+                            ("VISIT_SCHEDULED", "Visita Agendada"),
+                            ("QUOTE_SENT", "Cotización Enviada"),
+                            ("NEGOTIATION", "En Negociación"),
+                            ("WON", "Ganado"),
+                            ("LOST", "Perdido"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("days", models.PositiveIntegerField()),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Duración en Etapa",
+                "verbose_name_plural": "Duraciones en Etapa",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "stage", "days"),
+                        name="stage_duration_stat_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StageTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_stage",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("NEW", "Nuevo"),
+                            ("CONTACTED", "Contactado"),
+                            ("VISIT_SCHEDULED", "Visita Agendada"),
+                            ("QUOTE_SENT", "Cotización Enviada"),
+                            ("NEGOTIATION", "En Negociación"),
+                            ("WON", "Ganado"),
+                            ("LOST", "Perdido"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "to_stage",
+                    models.CharField(
+                        choices=[
+                            ("NEW", "Nuevo"),
+                            ("CONTACTED", "Contactado"),
+                            ("VISIT_SCHEDULED", "Visita Agendada"),
+                            ("QUOTE_SENT", "Cotización Enviada"),
+                            ("NEGOTIATION", "En Negociación"),
+                            ("WON", "Ganado"),
+                            ("LOST", "Perdido"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "seconds_in_stage",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "opportunity",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="stage_transitions",
+                        to="sales.opportunity",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Cambio de Etapa",
+                "verbose_name_plural": "Cambios de Etapa",
+                "ordering": ["changed_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["opportunity", "changed_at"],
+                        name="transition_opp_changed_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 
 
 class Lead(models.Model):
@@ -41,6 +42,10 @@ class Lead(models.Model):
         verbose_name = 'Lead'
         verbose_name_plural = 'Leads'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination seeks on (ordering, id).
+            models.Index(fields=['-created_at', '-id'], name='lead_created_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.get_source_display()})"
@@ -78,9 +83,32 @@ class Opportunity(models.Model):
         verbose_name = 'Oportunidad'
         verbose_name_plural = 'Oportunidades'
         ordering = ['-created_at']
+        indexes = [
+            # Each board column seeks on (stage, ordering, id).
+            models.Index(fields=['stage', '-created_at', '-id'], name='opportunity_stage_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.customer.name}"
+    
+    def save(self, *args, **kwargs):
+        from .funnel import record_transitions
+        from .pipeline import record_change, state_of
+        with transaction.atomic():
+            old_state = None
+            if not self._state.adding and self.pk:
+                old_state = Opportunity.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'stage', 'assigned_to_id', 'close_date', 'value_estimate'
+                ).first()
+            super().save(*args, **kwargs)
+            record_change(old_state, state_of(self))
+            old_stage = old_state[0] if old_state else ''
+            if old_stage != self.stage:
+                record_transitions([
+                    StageTransition(
+                        opportunity=self, from_stage=old_stage, to_stage=self.stage, changed_at=self.updated_at
+                    )
+                ])
 
 
 class Activity(models.Model):
@@ -110,6 +138,12 @@ class Activity(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
         null=True, blank=True, related_name='assigned_activities'
     )
+    project = models.ForeignKey(
+        'projects.Project', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='activities'
+    )
+    # Date of the recurring visit this activity was generated for
+    occurrence = models.DateField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
@@ -120,6 +154,15 @@ class Activity(models.Model):
         verbose_name = 'Actividad'
         verbose_name_plural = 'Actividades'
         ordering = ['-due_at', '-created_at']
+        indexes = [
+            # Keyset pagination seeks on (ordering, id).
+            models.Index(fields=['-due_at', '-id'], name='activity_due_id_idx'),
+        ]
+        constraints = [
+            # One generated visit per project and date: re-running the
+            # generator can never duplicate them.
+            models.UniqueConstraint(fields=['project', 'occurrence'], name='activity_project_occurrence_uniq'),
+        ]
     
     def __str__(self):
         return f"{self.get_type_display()} - {self.notes[:50]}"
@@ -127,3 +170,93 @@ class Activity(models.Model):
     @property
     def is_done(self):
         return self.done_at is not None
+
+
+class PipelineSummary(models.Model):
+    """
+    Running opportunity totals per stage, salesperson and close-date month.
+    
+    Maintained in the same transaction as every Opportunity write (see
+    apps.sales.pipeline); `manage.py rebuild_pipeline_summary` repairs drift
+    from writes that bypass save(), such as queryset.update().
+    """
+    
+    bucket = models.CharField(max_length=64, unique=True)
+    stage = models.CharField(max_length=20, choices=Opportunity.STAGE_CHOICES)
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False,
+        null=True, blank=True, related_name='+'
+    )
+    close_month = models.DateField(null=True, blank=True)
+    opportunity_count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        verbose_name = 'Resumen de Pipeline'
+        verbose_name_plural = 'Resumen de Pipeline'
+        ordering = ['stage', 'close_month']
+    
+    def __str__(self):
+        return f"{self.bucket}: {self.opportunity_count}"
+
+
+class StageTransition(models.Model):
+    """
+    Append-only log of opportunity stage changes.
+    
+    Rows are never updated and outlive their opportunity (hence no FK
+    constraint). `seconds_in_stage` is how long the opportunity stayed in
+    `from_stage`; an empty `from_stage` marks its creation.
+    """
+    
+    opportunity = models.ForeignKey(
+        Opportunity, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='stage_transitions'
+    )
+    from_stage = models.CharField(max_length=20, choices=Opportunity.STAGE_CHOICES, blank=True)
+    to_stage = models.CharField(max_length=20, choices=Opportunity.STAGE_CHOICES)
+    changed_at = models.DateTimeField(default=timezone.now)
+    seconds_in_stage = models.PositiveIntegerField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Cambio de Etapa'
+        verbose_name_plural = 'Cambios de Etapa'
+        ordering = ['changed_at']
+        indexes = [
+            models.Index(fields=['opportunity', 'changed_at'], name='transition_opp_changed_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.opportunity_id}: {self.from_stage or '-'} -> {self.to_stage}"
+
+
+class StageDayStat(models.Model):
+    """Per-day funnel counters: opportunities reaching each stage or lost from it."""
+    
+    day = models.DateField()
+    stage = models.CharField(max_length=20, choices=Opportunity.STAGE_CHOICES)
+    reached = models.PositiveIntegerField(default=0)
+    lost = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Estadística Diaria de Etapa'
+        verbose_name_plural = 'Estadísticas Diarias de Etapa'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'stage'], name='stage_day_stat_unique'),
+        ]
+
+
+class StageDurationStat(models.Model):
+    """Histogram of whole days spent in a stage, by the day the stage was left."""
+    
+    day = models.DateField()
+    stage = models.CharField(max_length=20, choices=Opportunity.STAGE_CHOICES)
+    days = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Duración en Etapa'
+        verbose_name_plural = 'Duraciones en Etapa'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'stage', 'days'], name='stage_duration_stat_unique'),
+        ]
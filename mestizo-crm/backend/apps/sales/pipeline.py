@@ -0,0 +1,128 @@
+"""
+Incremental maintenance of the PipelineSummary table.
+
+An opportunity's "state" is (stage, assigned_to_id, close_date, value). Every
+write turns the old and new state into +/- deltas applied with F() updates on
+the matching summary buckets, so reads cost O(buckets) rather than a scan
+over all opportunities.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.db.models import Count, Sum
+
+from apps.common.counters import increment
+from .models import Opportunity, PipelineSummary
+
+
+CHUNK_SIZE = 2000
+
+
+def month_of(day):
+    return day.replace(day=1) if day else None
+
+
+def bucket_key(stage, assigned_to_id, close_month):
+    month = close_month.isoformat() if close_month else '-'
+    return f"{stage}|{assigned_to_id or '-'}|{month}"
+
+
+def state_of(opportunity):
+    return (
+        opportunity.stage, opportunity.assigned_to_id,
+        opportunity.close_date, opportunity.value_estimate,
+    )
+
+
+def apply_delta(stage, assigned_to_id, close_month, count, value):
+    increment(
+        PipelineSummary, {'bucket': bucket_key(stage, assigned_to_id, close_month)},
+        defaults={'stage': stage, 'assigned_to_id': assigned_to_id, 'close_month': close_month},
+        opportunity_count=count, total_value=value,
+    )
+
+
+def record_change(old_state, new_state):
+    """Apply the summary deltas for one opportunity going from old to new state."""
+    if old_state == new_state:
+        return
+    if old_state is not None:
+        stage, assigned_to_id, close_date, value = old_state
+        apply_delta(stage, assigned_to_id, month_of(close_date), -1, -Decimal(str(value)))
+    if new_state is not None:
+        stage, assigned_to_id, close_date, value = new_state
+        apply_delta(stage, assigned_to_id, month_of(close_date), 1, Decimal(str(value)))
+
+
+def record_delete(sender, instance, **kwargs):
+    """post_delete receiver; also runs for opportunities removed by cascade."""
+    record_change(state_of(instance), None)
+
+
+def compute_buckets(chunk_size=CHUNK_SIZE):
+    """Recompute every bucket from the opportunities table, in chunks."""
+    buckets = defaultdict(lambda: [0, Decimal('0')])
+    rows = Opportunity.objects.order_by().values_list(
+        'stage', 'assigned_to_id', 'close_date', 'value_estimate'
+    ).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return buckets
+        for stage, assigned_to_id, close_date, value in chunk:
+            totals = buckets[(stage, assigned_to_id, month_of(close_date))]
+            totals[0] += 1
+            totals[1] += value
+
+
+def stage_totals(queryset=None):
+    """
+    {stage: {'count', 'total_value'}} for every stage.
+    
+    Without a queryset the totals come from the summary table; a filtered
+    queryset is grouped by stage in a single query instead.
+    """
+    if queryset is None:
+        rows = PipelineSummary.objects.order_by().values('stage').annotate(
+            count=Sum('opportunity_count'), total_value=Sum('total_value'),
+        )
+    else:
+        rows = queryset.order_by().values('stage').annotate(
+            count=Count('id'), total_value=Sum('value_estimate'),
+        )
+    totals = {code: {'count': 0, 'total_value': Decimal('0')} for code, _ in Opportunity.STAGE_CHOICES}
+    for row in rows:
+        totals[row['stage']] = {'count': row['count'], 'total_value': row['total_value'] or Decimal('0')}
+    return totals
+
+
+def summarize():
+    """Per-stage, per-salesperson and per-month totals read from the summary table."""
+    rows = PipelineSummary.objects.filter(opportunity_count__gt=0).select_related('assigned_to')
+    
+    stages = {
+        code: {'stage': code, 'stage_display': name, 'count': 0, 'total_value': Decimal('0')}
+        for code, name in Opportunity.STAGE_CHOICES
+    }
+    assignees = {}
+    months = {}
+    for row in rows:
+        assignee = assignees.setdefault(row.assigned_to_id, {
+            'assigned_to': row.assigned_to_id,
+            'assigned_to_email': row.assigned_to.email if row.assigned_to else None,
+            'count': 0, 'total_value': Decimal('0'), 'by_stage': {},
+        })
+        assignee['by_stage'][row.stage] = assignee['by_stage'].get(row.stage, 0) + row.opportunity_count
+        month = months.setdefault(row.close_month, {
+            'close_month': row.close_month, 'count': 0, 'total_value': Decimal('0'),
+        })
+        for totals in (stages[row.stage], assignee, month):
+            totals['count'] += row.opportunity_count
+            totals['total_value'] += row.total_value
+    
+    return {
+        'stages': list(stages.values()),
+        'assignees': sorted(assignees.values(), key=lambda a: -a['total_value']),
+        'close_months': sorted(months.values(), key=lambda m: (m['close_month'] is None, m['close_month'])),
+    }
@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from apps.common.sparse import SparseModelSerializer
 from .models import Lead, Opportunity, Activity
 from apps.users.serializers import UserSerializer
 
 
-class LeadSerializer(serializers.ModelSerializer):
+class LeadSerializer(SparseModelSerializer):
     source_display = serializers.CharField(source='get_source_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
@@ -24,7 +25,7 @@ class LeadSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class OpportunitySerializer(serializers.ModelSerializer):
+class OpportunitySerializer(SparseModelSerializer):
     stage_display = serializers.CharField(source='get_stage_display', read_only=True)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     assigned_to_email = serializers.EmailField(source='assigned_to.email', read_only=True)
@@ -39,12 +40,25 @@ class OpportunitySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class OpportunityCardSerializer(SparseModelSerializer):
+    """Compact opportunity for the pipeline board."""
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+    assigned_to_email = serializers.EmailField(source='assigned_to.email', read_only=True, default=None)
+    
+    class Meta:
+        model = Opportunity
+        fields = [
+            'id', 'customer', 'customer_name', 'title', 'stage', 'value_estimate',
+            'close_date', 'assigned_to', 'assigned_to_email', 'created_at'
+        ]
+
+
 class OpportunityStageSerializer(serializers.Serializer):
     """Serializer for stage change action."""
     stage = serializers.ChoiceField(choices=Opportunity.STAGE_CHOICES)
 
 
-class ActivitySerializer(serializers.ModelSerializer):
+class ActivitySerializer(SparseModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     opportunity_title = serializers.CharField(source='opportunity.title', read_only=True)
@@ -54,9 +68,10 @@ class ActivitySerializer(serializers.ModelSerializer):
         fields = [
             'id', 'type', 'type_display', 'notes', 'due_at', 'done_at',
             'customer', 'customer_name', 'opportunity', 'opportunity_title',
-            'assigned_to', 'created_at', 'created_by', 'is_done'
+            'project', 'occurrence', 'assigned_to', 'created_at', 'created_by', 'is_done'
         ]
-        read_only_fields = ['id', 'created_at', 'created_by', 'is_done']
+        read_only_fields = ['id', 'occurrence', 'created_at', 'created_by', 'is_done']
+        field_sources = {'is_done': ['done_at']}
     
     def create(self, validated_data):
         request = self.context.get('request')
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+
+from . import dashboard, pipeline
+
+
+def connect_signals():
+    from apps.quotes.models import Quote
+    from .models import Lead, Opportunity, Activity
+    
+    for model in (Lead, Opportunity, Quote, Activity):
+        label = model._meta.label
+        post_save.connect(dashboard.invalidate, sender=model, dispatch_uid=f'dashboard_save_{label}')
+        post_delete.connect(dashboard.invalidate, sender=model, dispatch_uid=f'dashboard_delete_{label}')
+    
+    # Saves update the summary inside Opportunity.save(); deletes (cascades
+    # included) only announce themselves through the signal.
+    post_delete.connect(pipeline.record_delete, sender=Opportunity, dispatch_uid='pipeline_summary_delete')
@@ -0,0 +1,17 @@
+"""
+Monte Carlo worker for the sales forecast.
+
+Kept free of Django imports so process-pool workers can import it without
+setting up Django.
+"""
+import numpy as np
+
+
+def simulate(win_probability, value, group, group_count, runs, seed):
+    """Revenue per group for `runs` simulated outcomes, as a (runs, group_count) array."""
+    rng = np.random.default_rng(seed)
+    revenue = np.empty((runs, group_count))
+    for run in range(runs):
+        won = rng.random(value.shape[0]) < win_probability
+        revenue[run] = np.bincount(group, weights=value * won, minlength=group_count)
+    return revenue
@@ -1,38 +1,44 @@
-import csv
-import io
 from rest_framework import viewsets, status
 from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser
+from django.conf import settings
+from django.utils.dateparse import parse_date
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Count, Sum
+from rest_framework.filters import OrderingFilter
+from rest_framework.utils.urls import replace_query_param
+from apps.common.pagination import KeysetPagination
+from apps.common.conditional import ConditionalGetMixin
+from apps.common.sparse import SparseQuerysetMixin
+from apps.search.filters import IndexedSearchFilter
 
+from . import dashboard, forecast, funnel, pipeline
 from .models import Lead, Opportunity, Activity
 from .serializers import (
-    LeadSerializer, OpportunitySerializer, OpportunityStageSerializer,
-    ActivitySerializer
+    LeadSerializer, OpportunitySerializer, OpportunityCardSerializer,
+    OpportunityStageSerializer, ActivitySerializer
 )
-from apps.quotes.models import Quote
+from apps.imports.jobs import create_import_job
+from apps.imports.serializers import ImportJobSerializer
 
 
-class LeadViewSet(viewsets.ModelViewSet):
+class LeadViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Lead CRUD operations."""
     queryset = Lead.objects.all()
     serializer_class = LeadSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
     filterset_fields = ['status', 'source', 'customer']
     search_fields = ['name', 'email', 'phone']
     ordering_fields = ['name', 'created_at', 'status']
     ordering = ['-created_at']
 
 
-class OpportunityViewSet(viewsets.ModelViewSet):
+class OpportunityViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Opportunity CRUD operations."""
     queryset = Opportunity.objects.all()
     serializer_class = OpportunitySerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
     filterset_fields = ['stage', 'customer', 'assigned_to']
     search_fields = ['title', 'customer__name']
     ordering_fields = ['title', 'created_at', 'value_estimate', 'close_date']
@@ -50,14 +56,97 @@ class OpportunityViewSet(viewsets.ModelViewSet):
             return Response(OpportunitySerializer(opportunity).data)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """
+        Kanban board: each stage with its totals and its first cards.
+        
+        Every column carries its own keyset `next` link; following it (it adds
+        `?stage=` and `?cursor=`) returns just that column's next cards.
+        """
+        stage = request.query_params.get('stage')
+        if KeysetPagination.cursor_query_param in request.query_params and not stage:
+            return Response({'error': 'El cursor requiere el parámetro stage'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        queryset = self.filter_queryset(self.get_queryset()).select_related('customer', 'assigned_to')
+        filter_params = [param for param in self.filterset_fields if param != 'stage']
+        filter_params.append(IndexedSearchFilter.search_param)
+        if any(request.query_params.get(param) for param in filter_params):
+            totals = pipeline.stage_totals(queryset)
+        else:
+            totals = pipeline.stage_totals()
+        
+        page_size = self.paginator.get_page_size(request)
+        columns = []
+        for code, name in Opportunity.STAGE_CHOICES:
+            if stage and code != stage:
+                continue
+            keyset = KeysetPagination(page_size)
+            cards = keyset.paginate_queryset(queryset.filter(stage=code), request, self)
+            links = [keyset.next_link, keyset.previous_link]
+            links = [replace_query_param(link, 'stage', code) if link else None for link in links]
+            columns.append({
+                'stage': code,
+                'stage_display': name,
+                **totals[code],
+                'results': OpportunityCardSerializer(cards, many=True).data,
+                'next': links[0],
+                'previous': links[1],
+            })
+        return Response({'stages': columns})
+    
+    @action(detail=False, methods=['get'])
+    def forecast(self, request):
+        """
+        Weighted revenue of open opportunities by close month and salesperson.
+        
+        ?probabilities=NEW:0.1,NEGOTIATION:0.8 overrides the configured win
+        probabilities; ?simulations=N (and optional ?seed=) adds Monte Carlo
+        p10/p50/p90 bands.
+        """
+        try:
+            overrides = forecast.parse_probabilities(request.query_params.get('probabilities', ''))
+            simulations = int(request.query_params.get('simulations', 0))
+            seed = request.query_params.get('seed')
+            seed = abs(int(seed)) if seed else None
+        except ValueError:
+            return Response({'error': 'Parámetros de pronóstico inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= simulations <= settings.FORECAST_MAX_SIMULATIONS:
+            return Response(
+                {'error': f'simulations debe estar entre 0 y {settings.FORECAST_MAX_SIMULATIONS}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        probabilities = forecast.win_probabilities(overrides)
+        return Response(forecast.forecast(probabilities, simulations=simulations, seed=seed))
+    
+    @action(detail=False, methods=['get'])
+    def funnel(self, request):
+        """Conversion ratios and days-in-stage for ?date_from=&date_to= (last 90 days by default)."""
+        date_from, date_to = funnel.default_window()
+        try:
+            if 'date_from' in request.query_params:
+                date_from = parse_date(request.query_params['date_from'])
+            if 'date_to' in request.query_params:
+                date_to = parse_date(request.query_params['date_to'])
+        except ValueError:
+            date_from = None
+        if date_from is None or date_to is None or date_from > date_to:
+            return Response({'error': 'Rango de fechas inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(funnel.report(date_from, date_to))
+    
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Pipeline totals per stage, salesperson and close month."""
+        return Response(pipeline.summarize())
 
 
-class ActivityViewSet(viewsets.ModelViewSet):
+class ActivityViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Activity CRUD operations."""
     queryset = Activity.objects.all()
     serializer_class = ActivitySerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['type', 'customer', 'opportunity', 'assigned_to']
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, OrderingFilter]
+    filterset_fields = ['type', 'customer', 'opportunity', 'project', 'assigned_to']
     search_fields = ['notes']
     ordering_fields = ['due_at', 'created_at', 'done_at']
     ordering = ['-due_at']
@@ -73,7 +162,7 @@ class ActivityViewSet(viewsets.ModelViewSet):
 
 
 class ImportLeadsView(APIView):
-    """Import leads from CSV file."""
+    """Queue a background import of leads from a CSV file."""
     parser_classes = [MultiPartParser]
     
     def post(self, request):
@@ -81,71 +170,19 @@ class ImportLeadsView(APIView):
         if not file:
             return Response({'error': 'No se proporcionó archivo'}, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            decoded_file = file.read().decode('utf-8')
-            reader = csv.DictReader(io.StringIO(decoded_file))
-            
-            created = 0
-            errors = []
-            
-            for row_num, row in enumerate(reader, start=2):
-                try:
-                    Lead.objects.create(
-                        name=row.get('name', row.get('nombre', '')),
-                        phone=row.get('phone', row.get('telefono', '')),
-                        email=row.get('email', ''),
-                        source=row.get('source', row.get('fuente', 'OTHER')).upper(),
-                        notes=row.get('notes', row.get('notas', '')),
-                        created_by=request.user
-                    )
-                    created += 1
-                except Exception as e:
-                    errors.append(f"Fila {row_num}: {str(e)}")
-            
-            return Response({
-                'created': created,
-                'errors': errors[:10]
-            }, status=status.HTTP_201_CREATED)
-        
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        job = create_import_job('LEADS', file, request.user)
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
 class DashboardStatsView(APIView):
-    """Dashboard statistics endpoint."""
+    """Dashboard statistics endpoint, cached until the next sales write."""
     
     def get(self, request):
-        # Leads count by status
-        leads_new = Lead.objects.filter(status='NEW').count()
-        leads_qualified = Lead.objects.filter(status='QUALIFIED').count()
-        
-        # Opportunities by stage
-        opportunities_by_stage = {}
-        for stage_code, stage_name in Opportunity.STAGE_CHOICES:
-            opportunities_by_stage[stage_code] = Opportunity.objects.filter(stage=stage_code).count()
-        
-        # Total opportunity value
-        total_pipeline_value = Opportunity.objects.exclude(
-            stage__in=['WON', 'LOST']
-        ).aggregate(total=Sum('value_estimate'))['total'] or 0
-        
-        # Quotes pending
-        quotes_draft = Quote.objects.filter(status='DRAFT').count()
-        quotes_sent = Quote.objects.filter(status='SENT').count()
-        
-        # Activities pending
-        activities_pending = Activity.objects.filter(done_at__isnull=True).count()
+        # ?assigned_to=me limits the stats to the current salesperson
+        user = request.user if request.query_params.get('assigned_to') == 'me' else None
+        stats, cache_hit, age = dashboard.get_stats(user)
         
-        return Response({
-            'leads': {
-                'new': leads_new,
-                'qualified': leads_qualified,
-            },
-            'opportunities_by_stage': opportunities_by_stage,
-            'total_pipeline_value': float(total_pipeline_value),
-            'quotes': {
-                'draft': quotes_draft,
-                'sent': quotes_sent,
-            },
-            'activities_pending': activities_pending,
-        })
+        response = Response(stats)
+        response['X-Cache'] = 'HIT' if cache_hit else 'MISS'
+        response['Age'] = str(age)
+        return response
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import SearchEntry
+
+
+@admin.register(SearchEntry)
+class SearchEntryAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'content_type', 'object_id', 'updated_at')
+    list_filter = ('content_type',)
+    search_fields = ('document',)
+    readonly_fields = ('content_type', 'object_id', 'document', 'updated_at')
+    exclude = ('vector',)
@@ -0,0 +1,249 @@
+"""
+Typeahead over catalog item and customer names.
+
+Each process keeps, per source, the folded names in a sorted list (one key
+per word, so 'perez' finds 'Juan Pérez') and answers a prefix with two
+bisections, ranking matches by usage (quote lines of a catalog item, quotes
+of a customer) and then by recency.
+
+Committed saves and deletes of a source model patch the index of the
+process that made them and bump the source's version in the shared cache;
+other processes keep answering from their index and rebuild it in the
+background once they see the new version. Usage counts are only patched
+locally, so a new quote line does not trigger rebuilds everywhere, and are
+caught up by AUTOCOMPLETE_TTL. A process with no index yet answers from the
+database, matching the start of the name through the prefix index on
+SearchEntry.document (search migration 0002).
+"""
+import bisect
+import heapq
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import Left
+
+from apps.common import versions
+from .models import SearchEntry
+from .registry import fold
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Must match the expression of the index created by migration 0002.
+PREFIX_LENGTH = 200
+# Prefixes matching more keys than this are ranked once and memoised until
+# the next change to the index.
+SCAN_LIMIT = 500
+
+
+@dataclass(frozen=True)
+class Source:
+    model: str
+    fields: tuple
+    usage: str
+    filters: dict = field(default_factory=dict)
+    
+    @property
+    def version_key(self):
+        return f'autocomplete:{self.model}:version'
+    
+    def get_model(self):
+        return apps.get_model(self.model)
+    
+    def rows(self):
+        """Payload fields, updated_at and usage of every row the source offers."""
+        return self.get_model().objects.filter(**self.filters).values(
+            *self.fields, 'updated_at'
+        ).annotate(usage=Count(self.usage))
+
+
+SOURCES = {
+    'catalog': Source(
+        'catalog.CatalogItem', ('id', 'name', 'type', 'category', 'price_ref'), 'quote_items', {'active': True}
+    ),
+    'customers': Source('customers.Customer', ('id', 'name', 'type', 'email', 'phone'), 'quotes'),
+}
+
+
+def normalize(text):
+    return ' '.join(fold(text).split())
+
+
+def name_keys(name):
+    """'Juan Pérez' -> {'juan perez', 'perez'}: a key from every word on."""
+    words = normalize(name).split()
+    return {' '.join(words[start:]) for start in range(len(words))}
+
+
+def payload(row):
+    # Decimals are rendered as strings, like the serializers do.
+    return {key: str(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+
+
+class PrefixIndex:
+    """Sorted (key, id) pairs of one source plus each id's rank and payload."""
+    
+    def __init__(self, version, rows):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.keys = []
+        self.ranked = {}
+        for row in rows:
+            self.entries[row['id']] = self.entry(row)
+        self.keys = sorted((key, pk) for pk, (_, _, keys) in self.entries.items() for key in keys)
+    
+    @staticmethod
+    def entry(row):
+        row = dict(row)
+        rank = (row.pop('usage'), row.pop('updated_at').timestamp(), row['id'])
+        return rank, payload(row), name_keys(row['name'])
+    
+    def put(self, row):
+        with self.lock:
+            self._remove(row['id'])
+            self.entries[row['id']] = entry = self.entry(row)
+            for key in entry[2]:
+                bisect.insort(self.keys, (key, row['id']))
+            self.ranked.clear()
+    
+    def remove(self, pk):
+        with self.lock:
+            self._remove(pk)
+            self.ranked.clear()
+    
+    def _remove(self, pk):
+        entry = self.entries.pop(pk, None)
+        for key in entry[2] if entry else ():
+            del self.keys[bisect.bisect_left(self.keys, (key, pk))]
+    
+    def add_usage(self, pk, delta):
+        with self.lock:
+            if pk in self.entries:
+                (usage, updated, _), data, keys = self.entries[pk]
+                self.entries[pk] = (usage + delta, updated, pk), data, keys
+                self.ranked.clear()
+    
+    def search(self, prefix, limit):
+        with self.lock:
+            start = bisect.bisect_left(self.keys, (prefix,))
+            end = bisect.bisect_left(self.keys, (prefix + '\uffff',))
+            if end - start <= SCAN_LIMIT:
+                return self.top(start, end, limit)
+            if prefix not in self.ranked:
+                self.ranked[prefix] = self.top(start, end, MAX_LIMIT)
+            return self.ranked[prefix][:limit]
+    
+    def top(self, start, end, limit):
+        ids = {pk for _, pk in self.keys[start:end]}
+        best = heapq.nlargest(limit, ids, key=lambda pk: self.entries[pk][0])
+        return [self.entries[pk][1] for pk in best]
+
+
+_indexes = {}
+_building = set()
+_lock = threading.Lock()
+
+
+def build(name, version):
+    _indexes[name] = PrefixIndex(version, SOURCES[name].rows().order_by().iterator(chunk_size=2000))
+
+
+def build_in_background(name, version):
+    try:
+        build(name, version)
+    except Exception:
+        # The stale index (or the database) keeps answering; the next lookup retries.
+        logger.exception('Autocomplete index build failed for %s', name)
+    finally:
+        _building.discard(name)
+        # The thread owns its own connection.
+        connection.close()
+
+
+def schedule_build(name, version):
+    with _lock:
+        if name in _building:
+            return
+        _building.add(name)
+    if settings.AUTOCOMPLETE_BACKGROUND_BUILD:
+        threading.Thread(
+            target=build_in_background, args=(name, version), name=f'autocomplete-{name}', daemon=True
+        ).start()
+    else:
+        try:
+            build(name, version)
+        finally:
+            _building.discard(name)
+
+
+def get_index(name):
+    """The process's index of `name`, possibly stale while its rebuild runs; None when cold."""
+    index = _indexes.get(name)
+    version = versions.get_version(SOURCES[name].version_key)
+    if index is None or index.version != version or time.monotonic() - index.built_at >= settings.AUTOCOMPLETE_TTL:
+        schedule_build(name, version)
+        index = _indexes.get(name)
+    return index
+
+
+def search_database(name, prefix, limit):
+    """Rows whose name starts with `prefix`, through the SearchEntry prefix index."""
+    source = SOURCES[name]
+    entries = SearchEntry.objects.filter(
+        content_type=ContentType.objects.get_for_model(source.get_model())
+    ).alias(head=Left('document', PREFIX_LENGTH)).filter(head__startswith=prefix[:PREFIX_LENGTH])
+    rows = source.rows().filter(pk__in=entries.values('object_id')).order_by('-usage', '-updated_at', '-id')
+    results = []
+    for row in rows[:limit]:
+        del row['usage'], row['updated_at']
+        results.append(payload(row))
+    return results
+
+
+def search(name, query, limit=DEFAULT_LIMIT):
+    """(results, 'memory' or 'database') for the names matching `query`."""
+    prefix = normalize(query)
+    if not prefix:
+        return [], 'memory'
+    index = get_index(name)
+    if index is None:
+        return search_database(name, prefix, limit), 'database'
+    return index.search(prefix, limit), 'memory'
+
+
+def reset():
+    """Drop every index of this process (tests, or after bulk writes)."""
+    _indexes.clear()
+
+
+def apply_change(name, pk):
+    """Bump the source's version and patch this process's index if it was current."""
+    version = versions.bump(SOURCES[name].version_key)
+    index = _indexes.get(name)
+    if index is None or index.version != version - 1:
+        # Stale already; the next lookup rebuilds it.
+        return
+    row = SOURCES[name].rows().filter(pk=pk).first()
+    if row is None:
+        index.remove(pk)
+    else:
+        index.put(row)
+    index.version = version
+
+
+def add_usage(name, pk, delta):
+    index = _indexes.get(name)
+    if index is not None and pk is not None:
+        index.add_usage(pk, delta)
@@ -0,0 +1,51 @@
+"""
+Search backends answering `?search=` from the precomputed SearchEntry rows.
+
+Each term must match the document (terms are ANDed, like DRF's SearchFilter).
+On PostgreSQL a term matches through the GIN indexes: as a substring via the
+trigram index, as a word via the Spanish tsvector, or fuzzily via trigram word
+similarity. Other databases (SQLite test runs) use an in-process matcher over
+the same folded documents.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.db.models import Q
+
+from .models import SearchEntry
+from .registry import SEARCH_CONFIG, fold
+
+
+class PostgresSearchBackend:
+    def matching_ids(self, model, terms):
+        entries = SearchEntry.objects.filter(content_type=ContentType.objects.get_for_model(model))
+        for term in terms:
+            entries = entries.filter(
+                Q(document__contains=term)
+                | Q(vector=SearchQuery(term, config=SEARCH_CONFIG))
+                | Q(document__trigram_word_similar=term)
+            )
+        return entries.values('object_id')
+
+
+class InProcessSearchBackend:
+    def matching_ids(self, model, terms):
+        entries = SearchEntry.objects.filter(
+            content_type=ContentType.objects.get_for_model(model)
+        ).values_list('object_id', 'document')
+        return [
+            object_id for object_id, document in entries.iterator()
+            if all(term in document for term in terms)
+        ]
+
+
+def get_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return InProcessSearchBackend()
+
+
+def search(queryset, search_terms):
+    """Restrict a queryset of an indexed model to rows matching all terms."""
+    terms = [fold(term) for term in search_terms]
+    return queryset.filter(pk__in=get_backend().matching_ids(queryset.model, terms))
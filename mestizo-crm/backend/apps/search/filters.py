@@ -0,0 +1,19 @@
+from rest_framework.filters import SearchFilter
+
+from . import registry
+from .backends import search
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    SearchFilter answered from the precomputed search index.
+
+    Models without an index entry in apps.search.registry keep DRF's
+    ILIKE-based behaviour over the view's search_fields.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms or not registry.is_indexed(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+        return search(queryset, search_terms)
@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.search import registry
+from apps.search.models import SearchEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search index of every searchable model'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--if-empty', action='store_true', help='Only build when the index is empty')
+        parser.add_argument('--chunk-size', type=int, default=registry.CHUNK_SIZE)
+    
+    def handle(self, *args, **options):
+        if options['if_empty'] and SearchEntry.objects.exists():
+            self.stdout.write('Search index already built')
+            return
+        
+        for model in registry.indexed_models():
+            started = time.monotonic()
+            count = registry.index_queryset(model.objects.all(), chunk_size=options['chunk_size'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'{model._meta.label}: {count} rows indexed in {elapsed:.1f}s')
+        
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:17
+
+from django.db import migrations
+
+
+def create_prefix_index(apps, schema_editor):
+    # Autocomplete's cold-process fallback matches left(document, 200) LIKE
+    # 'prefix%'; text_pattern_ops makes that a btree range scan whatever the
+    # collation. Other databases scan.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX search_entry_document_prefix ON search_searchentry "
+        "(content_type_id, left(document, 200) text_pattern_ops)"
+    )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS search_entry_document_prefix")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
@@ -0,0 +1,29 @@
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """
+    Precomputed search document for one CRM entity.
+    
+    `document` holds the entity's searchable fields (related names included)
+    lowercased and with accents folded; on PostgreSQL `vector` holds its
+    tsvector. Both are GIN-indexed by migration 0001.
+    """
+    
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.BigIntegerField()
+    document = models.TextField(blank=True)
+    vector = SearchVectorField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Entrada de Búsqueda'
+        verbose_name_plural = 'Entradas de Búsqueda'
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='search_entry_unique_object'),
+        ]
+    
+    def __str__(self):
+        return f"{self.content_type.model}:{self.object_id}"
@@ -0,0 +1,125 @@
+"""
+Which models are searchable, and how their search documents are built.
+
+Keep SEARCH_FIELDS in sync with the `search_fields` of each viewset: the
+IndexedSearchFilter answers `?search=` from these documents instead of
+running ILIKE over the listed columns.
+"""
+import unicodedata
+from itertools import islice
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+
+from .models import SearchEntry
+
+
+SEARCH_FIELDS = {
+    'customers.Customer': ['name', 'email', 'phone'],
+    'sales.Lead': ['name', 'email', 'phone'],
+    'sales.Opportunity': ['title', 'customer__name'],
+    'sales.Activity': ['notes'],
+    'quotes.Quote': ['customer__name', 'notes'],
+    'projects.Project': ['title', 'customer__name', 'description'],
+    'catalog.CatalogItem': ['name', 'description', 'category'],
+}
+
+SEARCH_CONFIG = 'spanish'
+FIELD_SEPARATOR = ' | '
+CHUNK_SIZE = 1000
+
+
+def fold(text):
+    """Lowercase and strip accents, so 'Pérez' and 'perez' compare equal."""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def get_search_fields(model):
+    return SEARCH_FIELDS.get(model._meta.label)
+
+
+def is_indexed(model):
+    return model._meta.label in SEARCH_FIELDS
+
+
+def indexed_models():
+    return [apps.get_model(label) for label in SEARCH_FIELDS]
+
+
+def related_paths(fields):
+    """select_related() arguments needed to build documents without N+1."""
+    return sorted({field.rsplit('__', 1)[0] for field in fields if '__' in field})
+
+
+def resolve(instance, path):
+    value = instance
+    for attr in path.split('__'):
+        value = getattr(value, attr, None)
+        if value is None:
+            return ''
+    return value
+
+
+def build_document(instance, fields):
+    values = (str(resolve(instance, field)) for field in fields)
+    return fold(FIELD_SEPARATOR.join(value for value in values if value))
+
+
+def index_objects(objects):
+    """Create or refresh the search entries of saved instances of one model."""
+    objects = [obj for obj in objects if obj.pk is not None]
+    if not objects:
+        return 0
+    model = type(objects[0])
+    fields = get_search_fields(model)
+    content_type = ContentType.objects.get_for_model(model)
+    
+    SearchEntry.objects.bulk_create(
+        [
+            SearchEntry(content_type=content_type, object_id=obj.pk, document=build_document(obj, fields))
+            for obj in objects
+        ],
+        update_conflicts=True,
+        unique_fields=['content_type', 'object_id'],
+        update_fields=['document', 'updated_at'],
+    )
+    if connection.vendor == 'postgresql':
+        SearchEntry.objects.filter(
+            content_type=content_type, object_id__in=[obj.pk for obj in objects]
+        ).update(vector=SearchVector('document', config=SEARCH_CONFIG))
+    return len(objects)
+
+
+def index_queryset(queryset, chunk_size=CHUNK_SIZE):
+    """Reindex every row of a queryset in chunks; returns the row count."""
+    fields = get_search_fields(queryset.model)
+    paths = related_paths(fields)
+    if paths:
+        queryset = queryset.select_related(*paths)
+    rows = queryset.order_by('pk').iterator(chunk_size=chunk_size)
+    
+    indexed = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return indexed
+        indexed += index_objects(chunk)
+
+
+def unindex(model, pks):
+    content_type = ContentType.objects.get_for_model(model)
+    SearchEntry.objects.filter(content_type=content_type, object_id__in=pks).delete()
+
+
+def dependents(model):
+    """(dependent model, FK name) pairs whose documents embed fields of `model`."""
+    result = []
+    for dependent in indexed_models():
+        for path in related_paths(get_search_fields(dependent)):
+            relation = path.split('__')[0]
+            if dependent._meta.get_field(relation).related_model is model:
+                result.append((dependent, relation))
+    return result
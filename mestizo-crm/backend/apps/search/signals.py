@@ -0,0 +1,54 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import autocomplete, registry
+
+
+def update_search_entry(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    registry.index_objects([instance])
+    if not created:
+        # Documents of dependents embed this row's fields (e.g. customer name).
+        for dependent, relation in registry.dependents(sender):
+            registry.index_queryset(dependent.objects.filter(**{relation: instance}))
+
+
+def delete_search_entry(sender, instance, **kwargs):
+    registry.unindex(sender, [instance.pk])
+
+
+def update_autocomplete(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for name, source in autocomplete.SOURCES.items():
+        if source.model == sender._meta.label:
+            # Other processes must not rebuild before the row is visible to them.
+            transaction.on_commit(partial(autocomplete.apply_change, name, instance.pk))
+
+
+def count_autocomplete_usage(sender, instance, created=None, raw=False, **kwargs):
+    """Quote lines rank catalog items, quotes rank customers; `created` is None on delete."""
+    if raw or created is False:
+        return
+    delta = 1 if created else -1
+    if sender._meta.label == 'quotes.QuoteItem':
+        transaction.on_commit(partial(autocomplete.add_usage, 'catalog', instance.catalog_item_id, delta))
+    else:
+        transaction.on_commit(partial(autocomplete.add_usage, 'customers', instance.customer_id, delta))
+
+
+def connect_signals():
+    for model in registry.indexed_models():
+        post_save.connect(update_search_entry, sender=model, dispatch_uid=f'search_index_{model._meta.label}')
+        post_delete.connect(delete_search_entry, sender=model, dispatch_uid=f'search_unindex_{model._meta.label}')
+    
+    for source in autocomplete.SOURCES.values():
+        uid = f'autocomplete_{source.model}'
+        post_save.connect(update_autocomplete, sender=source.model, dispatch_uid=f'{uid}_save')
+        post_delete.connect(update_autocomplete, sender=source.model, dispatch_uid=f'{uid}_delete')
+    for label in ('quotes.QuoteItem', 'quotes.Quote'):
+        post_save.connect(count_autocomplete_usage, sender=label, dispatch_uid=f'autocomplete_usage_{label}_save')
+        post_delete.connect(count_autocomplete_usage, sender=label, dispatch_uid=f'autocomplete_usage_{label}_delete')
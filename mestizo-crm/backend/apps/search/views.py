@@ -0,0 +1,31 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import autocomplete
+
+
+class AutocompleteView(APIView):
+    """
+    Typeahead for pickers: /api/autocomplete/<catalog|customers>/?q=<prefix>.
+    
+    Returns at most ?limit= (10 by default) matches, most used first.
+    """
+    
+    def get(self, request, source):
+        if source not in autocomplete.SOURCES:
+            return Response({'error': 'Fuente de autocompletado desconocida'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            limit = int(request.query_params.get('limit', autocomplete.DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= autocomplete.MAX_LIMIT:
+            return Response(
+                {'error': f'limit debe estar entre 1 y {autocomplete.MAX_LIMIT}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results, answered_by = autocomplete.search(source, request.query_params.get('q', ''), limit)
+        response = Response({'results': results})
+        response['X-Autocomplete-Source'] = answered_by
+        return response
@@ -5,3 +5,7 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     verbose_name = 'Usuarios'
+    
+    def ready(self):
+        from . import signals
+        signals.connect_signals()
@@ -0,0 +1,82 @@
+"""
+JWT authentication that resolves the user from an in-process cache.
+
+simplejwt's JWTAuthentication loads the user with one query per request.
+Here the loaded user is kept for AUTH_USER_CACHE_TTL seconds under its id
+and the user's version counter in the shared cache. Saving a user (changes
+to is_active, role or the password go through save()) bumps that counter in
+every process at once, before the commit and again after it; the TTL only
+bounds queryset updates, which bypass signals.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.common import versions
+
+
+MAX_USERS = 1000
+
+_users = {}
+_lock = threading.Lock()
+
+
+def version_key(user_id):
+    return f'users:{user_id}:auth_version'
+
+
+def invalidate(user_id):
+    versions.bump(version_key(user_id))
+
+
+def reset():
+    with _lock:
+        _users.clear()
+
+
+def get_cached(key):
+    entry = _users.get(key)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+
+def store(key, user):
+    now = time.monotonic()
+    with _lock:
+        if len(_users) >= MAX_USERS:
+            # Entries of older versions are never read again; drop what expired.
+            for stale in [k for k, (_, expires) in _users.items() if expires <= now]:
+                del _users[stale]
+            if len(_users) >= MAX_USERS:
+                _users.clear()
+        _users[key] = (user, now + settings.AUTH_USER_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication whose user lookup costs one shared-cache read when warm."""
+    
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or settings.AUTH_USER_CACHE_TTL <= 0:
+            return super().get_user(validated_token)
+        
+        key = (user_id, versions.get_version(version_key(user_id)))
+        user = get_cached(key)
+        if user is None:
+            # Raises for unknown or inactive users, which are never cached.
+            user = super().get_user(validated_token)
+            store(key, user)
+        elif api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        # Requests must not share one instance.
+        return copy.copy(user)
@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.users.authentication import CachedJWTAuthentication
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request cost of simplejwt authentication and the cached user lookup'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='User to authenticate as (default: first active user)')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per authentication class')
+    
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options['email']:
+            users = users.filter(email=options['email'])
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No hay usuarios activos para autenticar')
+        
+        token = AccessToken.for_user(user)
+        request = Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+        count = options['requests']
+        for authentication_class in (JWTAuthentication, CachedJWTAuthentication):
+            authenticator = authentication_class()
+            # Warm up: the cached class loads the user here.
+            authenticator.authenticate(request)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(count):
+                    authenticator.authenticate(request)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{authentication_class.__name__}: {elapsed / count * 1e6:.0f} us/request, '
+                f'{len(queries) / count:.2f} queries/request'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Authenticated {count} requests per class as {user.email}'))
@@ -1,15 +1,16 @@
 from rest_framework import serializers
+from apps.common.sparse import SparseModelSerializer
 from .models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'first_name', 'last_name', 'role', 'phone', 'is_active']
         read_only_fields = ['id']
 
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(SparseModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     
     class Meta:
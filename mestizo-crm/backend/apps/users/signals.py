@@ -0,0 +1,25 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import authentication
+
+
+AUTH_FIELDS = {'is_active', 'role', 'password'}
+
+
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    # save() without update_fields may have changed any of them.
+    if update_fields is None or AUTH_FIELDS & set(update_fields):
+        authentication.invalidate(instance.pk)
+        # Again once committed: a request in between reloads the old row and
+        # caches it under the version bumped above.
+        transaction.on_commit(partial(authentication.invalidate, instance.pk))
+
+
+def connect_signals():
+    from .models import User
+    
+    post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='users_auth_cache_save')
+    post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='users_auth_cache_delete')
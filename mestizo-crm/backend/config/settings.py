@@ -1,6 +1,7 @@
 """
 Django settings for Mestizo CRM project.
 """
+import json
 import os
 from datetime import timedelta
 from pathlib import Path
@@ -24,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third party
     'rest_framework',
     'rest_framework_simplejwt',
@@ -31,15 +33,19 @@ INSTALLED_APPS = [
     'django_filters',
     'drf_spectacular',
     # Local apps
+    'apps.common',
     'apps.users',
     'apps.customers',
     'apps.sales',
     'apps.quotes',
     'apps.projects',
     'apps.catalog',
+    'apps.imports',
+    'apps.search',
 ]
 
 MIDDLEWARE = [
+    'apps.common.timing.ServerTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -103,22 +109,107 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Uploaded files
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Project photos live on the 'project_media' storage: the local filesystem
+# by default, any Django storage backend (e.g. S3) via PROJECT_MEDIA_STORAGE
+# and PROJECT_MEDIA_STORAGE_OPTIONS (JSON). Thumbnails are generated in a
+# process pool of PROJECT_MEDIA_WORKERS (<= 0 runs inline). Uploads above
+# PROJECT_MEDIA_MAX_UPLOAD bytes or PROJECT_MEDIA_MAX_PIXELS are rejected
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'project_media': {
+        'BACKEND': os.environ.get('PROJECT_MEDIA_STORAGE', 'django.core.files.storage.FileSystemStorage'),
+        'OPTIONS': json.loads(os.environ.get('PROJECT_MEDIA_STORAGE_OPTIONS', 'null')) or {
+            'location': str(MEDIA_ROOT / 'projects'),
+            'base_url': '/media/projects/',
+        },
+    },
+}
+PROJECT_MEDIA_WORKERS = int(os.environ.get('PROJECT_MEDIA_WORKERS', '2'))
+PROJECT_MEDIA_MAX_UPLOAD = int(os.environ.get('PROJECT_MEDIA_MAX_UPLOAD', str(20 * 1024 * 1024)))
+PROJECT_MEDIA_MAX_PIXELS = int(os.environ.get('PROJECT_MEDIA_MAX_PIXELS', str(60 * 1000 * 1000)))
+
+# Quote PDFs are cached on disk by content hash; batch rendering uses a
+# process pool of QUOTE_PDF_WORKERS and prune_quote_pdfs deletes the ones
+# unused for QUOTE_PDF_MAX_AGE_DAYS
+QUOTE_PDF_DIR = os.environ.get('QUOTE_PDF_DIR', str(BASE_DIR / 'var' / 'quote-pdfs'))
+QUOTE_PDF_WORKERS = int(os.environ.get('QUOTE_PDF_WORKERS', '4'))
+QUOTE_PDF_MAX_AGE_DAYS = float(os.environ.get('QUOTE_PDF_MAX_AGE_DAYS', '30'))
+
+# Cache
+# Per-process memory by default. With more than one process, set
+# DJANGO_CACHE_LOCATION to a Redis URL (redis://host:6379/0): the backend
+# becomes RedisCache, so the version counters behind the dashboard, the
+# catalog snapshot, the auth cache and the ETag stamps reach every worker.
+# DJANGO_CACHE_BACKEND picks any other backend explicitly
+cache_location = os.environ.get('DJANGO_CACHE_LOCATION', 'mestizo-crm')
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.redis.RedisCache'
+            if cache_location.startswith(('redis://', 'rediss://', 'unix://'))
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': cache_location,
+    }
+}
+
+# Dashboard stats are invalidated on writes; the TTL only bounds staleness
+DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', '300'))
+
+# The catalog snapshot is rebuilt on CatalogItem writes; the TTL only bounds
+# staleness for writes that bypass signals
+CATALOG_SNAPSHOT_TTL = int(os.environ.get('CATALOG_SNAPSHOT_TTL', '3600'))
+
+# Autocomplete prefix indexes are patched on writes; the TTL bounds drift of
+# usage counts and of writes that bypass signals. Cold indexes are built in a
+# background thread unless AUTOCOMPLETE_BACKGROUND_BUILD is off
+AUTOCOMPLETE_TTL = int(os.environ.get('AUTOCOMPLETE_TTL', '3600'))
+AUTOCOMPLETE_BACKGROUND_BUILD = os.environ.get('AUTOCOMPLETE_BACKGROUND_BUILD', 'True').lower() in ('true', '1', 'yes')
+
+# POST /api/batch/: sub-requests per batch, and threads running consecutive
+# reads concurrently (<= 1 runs them one after another)
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', '20'))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '4'))
+
+# Sales forecast: per-stage win probabilities (JSON object, merged over the
+# defaults) and process-pool size for Monte Carlo bands (<= 1 runs inline)
+FORECAST_WIN_PROBABILITIES = {
+    'NEW': 0.05,
+    'CONTACTED': 0.1,
+    'VISIT_SCHEDULED': 0.25,
+    'QUOTE_SENT': 0.5,
+    'NEGOTIATION': 0.75,
+    **json.loads(os.environ.get('FORECAST_WIN_PROBABILITIES', '{}')),
+}
+FORECAST_WORKERS = int(os.environ.get('FORECAST_WORKERS', '2'))
+FORECAST_MAX_SIMULATIONS = int(os.environ.get('FORECAST_MAX_SIMULATIONS', '10000'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.common.timing.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'apps.common.pagination.FlexiblePagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'apps.search.filters.IndexedSearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -133,6 +224,34 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Authenticated users are cached per process; saving a user invalidates them
+# everywhere, the TTL bounds queryset updates (<= 0 disables the cache)
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', '60'))
+
+# Share of requests answered with a Server-Timing header (SQL, serializer and
+# renderer time) and logged as JSON on apps.common.timing (0 disables it)
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', '1' if DEBUG else '0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'apps.common.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Import jobs
+# ThreadPoolJobExecutor runs imports inside each API process; use
+# apps.imports.executors.DatabaseQueueExecutor plus `manage.py run_import_worker`
+# when running several nodes (MEDIA_ROOT must then be shared).
+IMPORT_JOB_EXECUTOR = os.environ.get(
+    'IMPORT_JOB_EXECUTOR', 'apps.imports.executors.ThreadPoolJobExecutor'
+)
+IMPORT_JOB_WORKERS = int(os.environ.get('IMPORT_JOB_WORKERS', '2'))
+# RUNNING jobs without progress for this many seconds are marked FAILED
+IMPORT_JOB_TIMEOUT = int(os.environ.get('IMPORT_JOB_TIMEOUT', '600'))
+
 # CORS
 cors_origins = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:5173')
 CORS_ALLOWED_ORIGINS = [origin.strip() for origin in cors_origins.split(',') if origin.strip()]
@@ -9,11 +9,14 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from apps.customers.views import AddressViewSet, ContactViewSet, CustomerViewSet
 from apps.sales.views import ActivityViewSet, LeadViewSet, OpportunityViewSet, DashboardStatsView
-from apps.quotes.views import QuoteViewSet, QuoteItemViewSet
-from apps.projects.views import ProjectViewSet, ProjectMediaViewSet
+from apps.quotes.views import QuoteViewSet, QuoteItemViewSet, QuoteTemplateViewSet
+from apps.projects.views import ProjectViewSet, ProjectMediaViewSet, serve_media_file
 from apps.catalog.views import CatalogItemViewSet
 from apps.customers.views import ImportCustomersView
 from apps.sales.views import ImportLeadsView
+from apps.imports.views import ImportJobDetailView
+from apps.search.views import AutocompleteView
+from apps.common.views import BatchView
 
 # API Router
 router = DefaultRouter()
@@ -31,6 +34,7 @@ router.register(r'activities', ActivityViewSet, basename='activity')
 # Quotes
 router.register(r'quotes', QuoteViewSet, basename='quote')
 router.register(r'quote-items', QuoteItemViewSet, basename='quote-item')
+router.register(r'quote-templates', QuoteTemplateViewSet, basename='quote-template')
 
 # Projects
 router.register(r'projects', ProjectViewSet, basename='project')
@@ -53,10 +57,20 @@ urlpatterns = [
     # Import endpoints
     path('api/import/customers/', ImportCustomersView.as_view(), name='import-customers'),
     path('api/import/leads/', ImportLeadsView.as_view(), name='import-leads'),
+    path('api/import/jobs/<int:pk>/', ImportJobDetailView.as_view(), name='import-job-detail'),
     
     # Dashboard
     path('api/dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     
+    # Autocomplete for catalog and customer pickers
+    path('api/autocomplete/<str:source>/', AutocompleteView.as_view(), name='autocomplete'),
+    
+    # Several API calls in one round trip
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    
+    # Project photos on the local filesystem storage
+    path('media/projects/<path:name>', serve_media_file, name='project-media-file'),
+    
     # OpenAPI Schema
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
@@ -1,7 +1,57 @@
+import copy
+import gzip
+import io
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
 import pytest
+from PIL import Image
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.test import APIClient
+from unittest import mock
+
+from apps.common import batch, timing, versions
+from apps.customers.importers import import_customers_csv
+from apps.customers.models import Address, Contact, Customer
+from apps.imports import importers
+from apps.imports.models import ImportJob
+from apps.projects import images, media, recurrence
+from apps.projects.models import Project, ProjectMedia
+from apps.quotes import documents
+from apps.quotes.models import Quote, QuoteItem, QuoteTemplate, QuoteTemplateItem
+from apps.sales import forecast
+from apps.sales.models import Activity, Lead, Opportunity, PipelineSummary, StageDayStat, StageTransition
+from apps.sales.pipeline import bucket_key, compute_buckets
+from apps.catalog.models import CatalogItem
+from apps.search import autocomplete
+from apps.users import authentication
+from apps.search.models import SearchEntry
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached values would otherwise outlive each test's rolled-back rows.
+    cache.clear()
+
+
+@contextmanager
+def freeze_now(when):
+    with mock.patch('django.utils.timezone.now', return_value=when):
+        yield
 
 
 @pytest.fixture
@@ -63,6 +113,114 @@ class TestCustomerEndpoints:
         assert response.data['name'] == 'Test Customer'
 
 
+@pytest.mark.django_db
+class TestImportJobs:
+    @pytest.fixture(autouse=True)
+    def sync_executor(self, settings, tmp_path):
+        settings.IMPORT_JOB_EXECUTOR = 'apps.imports.executors.SynchronousJobExecutor'
+        settings.MEDIA_ROOT = tmp_path
+    
+    def upload(self, client, url, content, django_capture_on_commit_callbacks):
+        csv_file = SimpleUploadedFile('datos.csv', content.encode('utf-8'), content_type='text/csv')
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(url, {'file': csv_file}, format='multipart')
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        return client.get(f"/api/import/jobs/{response.data['id']}/")
+    
+    def test_customer_import_job_reports_progress_and_row_errors(
+        self, authenticated_client, django_capture_on_commit_callbacks
+    ):
+        client, user = authenticated_client
+        response = self.upload(client, '/api/import/customers/', (
+            'nombre,tipo,telefono,email\n'
+            'María García,individual,011-2345-6789,maria@email.com\n'
+            ',COMPANY,,\n'
+            'Hotel Paradise,COMPANY,,no-es-un-email\n'
+            'Roberto Fernández,COMPANY,,roberto@email.com\n'
+        ), django_capture_on_commit_callbacks)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'DONE'
+        assert response.data['rows_processed'] == 4
+        assert response.data['rows_created'] == 2
+        assert response.data['errors_count'] == 2
+        assert response.data['errors'][0].startswith('Fila 3:')
+        assert response.data['errors'][1].startswith('Fila 4:')
+        assert response.data['rows_per_second'] > 0
+        assert set(Customer.objects.values_list('name', flat=True)) == {'María García', 'Roberto Fernández'}
+        assert Customer.objects.filter(created_by=user).count() == 2
+    
+    def test_lead_import_job(self, authenticated_client, django_capture_on_commit_callbacks):
+        client, user = authenticated_client
+        response = self.upload(client, '/api/import/leads/', (
+            'name,phone,source\n'
+            'Laura Martínez,011-6789-0123,ig\n'
+            'Pedro Sánchez,011-7890-1234,FAX\n'
+        ), django_capture_on_commit_callbacks)
+        
+        assert response.data['status'] == 'DONE'
+        assert response.data['rows_created'] == 1
+        assert response.data['errors'][0].startswith('Fila 3: source:')
+        assert Lead.objects.get().source == 'IG'
+    
+    def test_import_writes_one_insert_per_chunk(self, authenticated_client, monkeypatch, django_assert_max_num_queries):
+        client, user = authenticated_client
+        monkeypatch.setattr(importers, 'CHUNK_SIZE', 50)
+        rows = ''.join(f'Cliente {i},INDIVIDUAL\n' for i in range(200))
+        csv_file = io.BytesIO(('name,type\n' + rows).encode('utf-8'))
+        
+        # Four chunks, each: savepoint, INSERT, search index upsert
+        # (plus tsvector UPDATE on PostgreSQL), release.
+        with django_assert_max_num_queries(20):
+            result = import_customers_csv(csv_file, user)
+        
+        assert result.created == 200
+        assert Customer.objects.count() == 200
+    
+    def test_database_queue_worker_claims_pending_jobs(
+        self, authenticated_client, settings, django_capture_on_commit_callbacks
+    ):
+        client, user = authenticated_client
+        settings.IMPORT_JOB_EXECUTOR = 'apps.imports.executors.DatabaseQueueExecutor'
+        response = self.upload(
+            client, '/api/import/customers/', 'name\nHotel Paradise\n', django_capture_on_commit_callbacks
+        )
+        assert response.data['status'] == 'PENDING'
+        
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+        
+        job = ImportJob.objects.get(pk=response.data['id'])
+        assert job.status == 'DONE'
+        assert job.rows_created == 1
+    
+    def test_jobs_of_dead_workers_are_failed(self, authenticated_client, settings):
+        client, user = authenticated_client
+        settings.IMPORT_JOB_TIMEOUT = 60
+        now = timezone.now()
+        stale, alive = [
+            ImportJob.objects.create(
+                kind='CUSTOMERS', file='imports/datos.csv', status='RUNNING', started_at=now, heartbeat_at=beat,
+            )
+            for beat in (now - timedelta(seconds=61), now - timedelta(seconds=30))
+        ]
+        
+        # Reads catch them when no worker polls (in-process executors)...
+        response = client.get(f'/api/import/jobs/{stale.id}/')
+        assert response.data['status'] == 'FAILED'
+        assert response.data['error_message'] == 'La importación se interrumpió antes de terminar'
+        assert client.get(f'/api/import/jobs/{alive.id}/').data['status'] == 'RUNNING'
+        
+        # ...and so does the queue worker.
+        ImportJob.objects.filter(pk=alive.pk).update(heartbeat_at=now - timedelta(minutes=5))
+        call_command('run_import_worker', '--once', stdout=io.StringIO())
+        alive.refresh_from_db()
+        assert alive.status == 'FAILED' and alive.finished_at is not None
+    
+    def test_job_detail_requires_auth(self, api_client):
+        response = api_client.get('/api/import/jobs/1/')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 @pytest.mark.django_db
 class TestLeadEndpoints:
     def test_list_leads_authenticated(self, authenticated_client):
@@ -88,6 +246,1437 @@ class TestOpportunityEndpoints:
         assert response.status_code == status.HTTP_200_OK
 
 
+@pytest.mark.django_db
+class TestPipelineSummary:
+    def expected(self):
+        buckets = compute_buckets()
+        return {
+            bucket_key(stage, assigned_to_id, month): (count, total)
+            for (stage, assigned_to_id, month), (count, total) in buckets.items()
+        }
+    
+    def stored(self):
+        return {
+            row.bucket: (row.opportunity_count, row.total_value)
+            for row in PipelineSummary.objects.exclude(opportunity_count=0)
+        }
+    
+    def test_summary_follows_every_write(self, authenticated_client):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Hotel Paradise')
+        close = date(2026, 11, 20)
+        
+        response = client.post('/api/opportunities/', {
+            'customer': customer.id, 'title': 'Rediseño', 'value_estimate': '150000.00',
+            'close_date': close.isoformat(), 'assigned_to': user.id,
+        })
+        opportunity_id = response.data['id']
+        Opportunity.objects.create(customer=customer, title='Riego', value_estimate=35000)
+        client.post(f'/api/opportunities/{opportunity_id}/change_stage/', {'stage': 'NEGOTIATION'})
+        client.patch(f'/api/opportunities/{opportunity_id}/', {'value_estimate': '120000.00'})
+        assert self.stored() == self.expected()
+        
+        summary = client.get('/api/opportunities/summary/').data
+        stages = {row['stage']: row for row in summary['stages']}
+        assert stages['NEGOTIATION']['count'] == 1
+        assert stages['NEGOTIATION']['total_value'] == Decimal('120000')
+        assert stages['NEW']['count'] == 1
+        assert stages['NEW']['total_value'] == Decimal('35000')
+        mine = next(row for row in summary['assignees'] if row['assigned_to'] == user.id)
+        assert mine['by_stage'] == {'NEGOTIATION': 1}
+        assert {row['close_month'] for row in summary['close_months']} == {date(2026, 11, 1), None}
+        
+        client.delete(f'/api/opportunities/{opportunity_id}/')
+        customer.delete()
+        assert self.stored() == {}
+    
+    def test_rebuild_command_repairs_drift(self):
+        customer = Customer.objects.create(name='Country Club Norte')
+        for value in (1000, 2000, 3000):
+            Opportunity.objects.create(customer=customer, title='Mantenimiento', value_estimate=value)
+        # Queryset updates bypass save() and leave the summary stale.
+        Opportunity.objects.update(stage='WON')
+        assert self.stored() != self.expected()
+        
+        out = io.StringIO()
+        call_command('rebuild_pipeline_summary', '--dry-run', stdout=out)
+        assert '2 drifted buckets found' in out.getvalue()
+        assert self.stored() != self.expected()
+        
+        call_command('rebuild_pipeline_summary', stdout=io.StringIO())
+        assert self.stored() == self.expected() == {'WON|-|-': (3, Decimal('6000'))}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rebuild_does_not_wipe_concurrent_deltas():
+    from django.db import connection
+    if connection.vendor != 'postgresql':
+        pytest.skip('The summary table is only locked on PostgreSQL')
+    customer = Customer.objects.create(name='Country Club Norte')
+    Opportunity.objects.create(customer=customer, title='Mantenimiento', value_estimate=1000)
+    writer = threading.Thread(
+        target=lambda: Opportunity.objects.create(customer=customer, title='Riego', value_estimate=500)
+    )
+    original = compute_buckets
+    
+    def compute_while_writing(**kwargs):
+        buckets = original(**kwargs)
+        # Another request saves an opportunity right after the snapshot.
+        writer.start()
+        writer.join(timeout=1)
+        return buckets
+    
+    with mock.patch('apps.sales.management.commands.rebuild_pipeline_summary.compute_buckets', compute_while_writing):
+        call_command('rebuild_pipeline_summary', stdout=io.StringIO())
+    writer.join()
+    summary = TestPipelineSummary()
+    assert summary.stored() == summary.expected() == {'NEW|-|-': (2, Decimal('1500'))}
+
+
+@pytest.mark.django_db
+class TestPipelineBoard:
+    @pytest.fixture
+    def opportunities(self, authenticated_client):
+        client, user = authenticated_client
+        customers = [Customer.objects.create(name=f'Cliente {i}') for i in range(3)]
+        for i in range(7):
+            Opportunity.objects.create(
+                customer=customers[i % 3], title=f'Nueva {i}', value_estimate=1000, assigned_to=user,
+            )
+        Opportunity.objects.create(customer=customers[0], title='Ganada', stage='WON', value_estimate=5000)
+        return client, user, customers
+    
+    def test_board_returns_every_stage(self, opportunities, django_assert_max_num_queries):
+        client, user, customers = opportunities
+        
+        # One totals query plus one per column, regardless of the card count.
+        with django_assert_max_num_queries(len(Opportunity.STAGE_CHOICES) + 3):
+            response = client.get('/api/opportunities/board/?limit=5')
+        
+        assert response.status_code == status.HTTP_200_OK
+        columns = {column['stage']: column for column in response.data['stages']}
+        assert list(columns) == [code for code, _ in Opportunity.STAGE_CHOICES]
+        assert columns['NEW']['count'] == 7
+        assert columns['NEW']['total_value'] == Decimal('7000')
+        assert len(columns['NEW']['results']) == 5
+        assert columns['NEW']['results'][0]['customer_name'].startswith('Cliente')
+        assert columns['NEW']['results'][0]['assigned_to_email'] == user.email
+        assert columns['WON']['count'] == 1
+        assert columns['WON']['next'] is None
+        assert columns['LOST']['results'] == []
+    
+    def test_column_loads_more(self, opportunities):
+        client, user, customers = opportunities
+        board = client.get('/api/opportunities/board/?limit=5').data
+        new = next(column for column in board['stages'] if column['stage'] == 'NEW')
+        
+        response = client.get(new['next'])
+        assert response.status_code == status.HTTP_200_OK
+        assert [column['stage'] for column in response.data['stages']] == ['NEW']
+        more = response.data['stages'][0]
+        assert len(more['results']) == 2
+        assert more['next'] is None
+        seen = {card['id'] for card in new['results'] + more['results']}
+        assert len(seen) == 7
+    
+    def test_filtered_totals_and_cursor_without_stage(self, opportunities):
+        client, user, customers = opportunities
+        response = client.get(f'/api/opportunities/board/?customer={customers[0].id}')
+        columns = {column['stage']: column for column in response.data['stages']}
+        assert columns['NEW']['count'] == 3
+        assert columns['WON']['total_value'] == Decimal('5000')
+        
+        response = client.get('/api/opportunities/board/?cursor=abc')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestFunnel:
+    def move(self, opportunity, stage, when):
+        with freeze_now(when):
+            opportunity.stage = stage
+            opportunity.save()
+    
+    def test_transitions_feed_the_funnel(self, authenticated_client):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Estancia La Paz')
+        start = timezone.now() - timedelta(days=30)
+        opportunities = []
+        for i in range(4):
+            with freeze_now(start):
+                opportunities.append(Opportunity.objects.create(customer=customer, title=f'Parque {i}'))
+        for i, opportunity in enumerate(opportunities):
+            self.move(opportunity, 'CONTACTED', start + timedelta(days=i + 1))
+        self.move(opportunities[0], 'QUOTE_SENT', start + timedelta(days=10))
+        self.move(opportunities[0], 'WON', start + timedelta(days=12))
+        self.move(opportunities[1], 'LOST', start + timedelta(days=5))
+        
+        assert StageTransition.objects.filter(opportunity=opportunities[0]).count() == 4
+        
+        response = client.get('/api/opportunities/funnel/')
+        assert response.status_code == status.HTTP_200_OK
+        stages = {row['stage']: row for row in response.data['stages']}
+        assert stages['NEW']['reached'] == 4
+        assert stages['CONTACTED']['reached'] == 4
+        # Jumping from CONTACTED to QUOTE_SENT passes through VISIT_SCHEDULED.
+        assert stages['VISIT_SCHEDULED']['reached'] == 1
+        assert stages['CONTACTED']['conversion_to_next'] == 0.25
+        assert stages['CONTACTED']['lost'] == 1
+        assert stages['NEW']['days_in_stage'] == {'samples': 4, 'median': 2, 'p90': 4}
+        assert stages['QUOTE_SENT']['days_in_stage']['median'] == 2
+        assert response.data['win_rate'] == 0.25
+        
+        window = timezone.localdate(start + timedelta(days=3))
+        response = client.get(f'/api/opportunities/funnel/?date_from={window.isoformat()}')
+        stages = {row['stage']: row for row in response.data['stages']}
+        assert stages['NEW']['reached'] == 0
+        assert stages['CONTACTED']['reached'] == 2
+    
+    def test_invalid_window(self, authenticated_client):
+        client, user = authenticated_client
+        response = client.get('/api/opportunities/funnel/?date_from=2026-05-01&date_to=2026-04-01')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = client.get('/api/opportunities/funnel/?date_from=ayer')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_rebuild_command_backfills_and_matches(self):
+        customer = Customer.objects.create(name='Vivero Sur')
+        opportunity = Opportunity.objects.create(customer=customer, title='Poda')
+        opportunity.stage = 'CONTACTED'
+        opportunity.save()
+        stored = sorted(StageDayStat.objects.values_list('day', 'stage', 'reached', 'lost'))
+        
+        StageTransition.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_funnel_stats', '--backfill', stdout=out)
+        assert '1 opportunities backfilled' in out.getvalue()
+        assert StageTransition.objects.get().to_stage == 'CONTACTED'
+        # The backfilled creation row reaches NEW and CONTACTED, as the live log did.
+        assert sorted(StageDayStat.objects.values_list('day', 'stage', 'reached', 'lost')) == stored
+
+
+@pytest.mark.django_db
+class TestForecast:
+    @pytest.fixture
+    def pipeline(self, authenticated_client):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Barrio Los Álamos')
+        november, december = date(2026, 11, 10), date(2026, 12, 5)
+        for stage, value, close_date, assigned_to in [
+            ('NEW', 10000, november, user),
+            ('NEGOTIATION', 20000, november, user),
+            ('QUOTE_SENT', 40000, december, None),
+            ('WON', 99000, november, user),
+            ('LOST', 99000, december, user),
+        ]:
+            Opportunity.objects.create(
+                customer=customer, title=stage, stage=stage, value_estimate=value,
+                close_date=close_date, assigned_to=assigned_to,
+            )
+        return client, user
+    
+    def test_weighted_projection(self, pipeline, settings):
+        client, user = pipeline
+        settings.FORECAST_WIN_PROBABILITIES = {'NEW': 0.1, 'NEGOTIATION': 0.5, 'QUOTE_SENT': 0.25}
+        
+        response = client.get('/api/opportunities/forecast/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['open_count'] == 3
+        assert response.data['pipeline_value'] == 70000
+        assert response.data['weighted_value'] == 21000
+        months = {row['month']: row for row in response.data['by_month']}
+        assert months['2026-11']['weighted_value'] == 11000
+        assert months['2026-12']['count'] == 1
+        assignees = {row['assigned_to']: row for row in response.data['by_assignee']}
+        assert assignees[user.id]['assigned_to_email'] == user.email
+        assert assignees[None]['weighted_value'] == 10000
+        assert 'bands' not in response.data
+        
+        response = client.get('/api/opportunities/forecast/?probabilities=QUOTE_SENT:1')
+        assert response.data['weighted_value'] == 51000
+    
+    def test_monte_carlo_bands(self, pipeline, settings):
+        client, user = pipeline
+        settings.FORECAST_WORKERS = 2
+        
+        url = '/api/opportunities/forecast/?probabilities=NEW:0,NEGOTIATION:1,QUOTE_SENT:0.5&simulations=400&seed=7'
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['simulations'] == 400
+        months = {row['month']: row for row in response.data['by_month']}
+        assert months['2026-11']['bands'] == {'p10': 20000, 'p50': 20000, 'p90': 20000}
+        assert months['2026-12']['bands']['p10'] == 0
+        assert months['2026-12']['bands']['p90'] == 40000
+        assert response.data['bands']['p90'] == 60000
+        assert client.get(url).data['bands'] == response.data['bands']
+    
+    def test_simulations_survive_a_dead_worker(self, pipeline, settings):
+        client, user = pipeline
+        settings.FORECAST_WORKERS = 2
+        url = '/api/opportunities/forecast/?probabilities=NEW:0,NEGOTIATION:1,QUOTE_SENT:0.5&simulations=400&seed=7'
+        expected = client.get(url).data['bands']
+        
+        broken = forecast.get_pool()
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+        
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['bands'] == expected
+        assert forecast.get_pool() is not broken
+        assert client.get(url).data['bands'] == expected
+    
+    def test_grouped_and_per_row_totals_agree(self, authenticated_client, settings):
+        client, user = authenticated_client
+        settings.FORECAST_WORKERS = 1
+        customer = Customer.objects.create(name='Barrio Norte')
+        Opportunity.objects.bulk_create(
+            Opportunity(customer=customer, title='Poda', value_estimate=1000, close_date=date(2026, 11, day))
+            for day in (1, 1, 15)
+        )
+        
+        grouped = client.get('/api/opportunities/forecast/?probabilities=NEW:0.5').data
+        assert grouped['open_count'] == 3 and grouped['weighted_value'] == 1500
+        assert grouped['by_month'] == [
+            {'month': '2026-11', 'count': 3, 'pipeline_value': 3000, 'weighted_value': 1500}
+        ]
+        per_row = client.get('/api/opportunities/forecast/?probabilities=NEW:0.5&simulations=10&seed=1').data
+        for key in ('open_count', 'pipeline_value', 'weighted_value', 'by_assignee', 'by_month_assignee'):
+            assert per_row[key] == grouped[key]
+    
+    def test_invalid_parameters(self, authenticated_client):
+        client, user = authenticated_client
+        for query in ('probabilities=WON:0.5', 'probabilities=NEW:2', 'simulations=-1', 'simulations=999999'):
+            response = client.get(f'/api/opportunities/forecast/?{query}')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestQuoteItems:
+    @pytest.fixture
+    def quote(self):
+        customer = Customer.objects.create(name='Club Náutico')
+        return Quote.objects.create(customer=customer)
+    
+    def test_single_item_endpoint_keeps_total_current(self, authenticated_client, quote):
+        client, user = authenticated_client
+        response = client.post('/api/quote-items/', {
+            'quote': quote.id, 'name': 'Césped en rollo', 'qty': '12.50', 'unit_price': '800.00',
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        quote.refresh_from_db()
+        assert quote.total == Decimal('10000.00')
+        
+        client.delete(f"/api/quote-items/{response.data['id']}/")
+        quote.refresh_from_db()
+        assert quote.total == 0
+    
+    def test_bulk_add_replace_delete(self, authenticated_client, quote, django_assert_max_num_queries):
+        client, user = authenticated_client
+        kept, replaced, deleted = QuoteItem.objects.bulk_create(
+            QuoteItem(quote=quote, name=name, qty=1, unit_price=100) for name in ('Poda', 'Riego', 'Flete')
+        )
+        payload = {
+            'add': [
+                {'name': f'Planta {i}', 'item_type': 'PRODUCT', 'qty': '2', 'unit_price': '150.00'}
+                for i in range(150)
+            ],
+            'replace': [{'id': replaced.id, 'name': 'Riego por goteo', 'item_type': 'SERVICE',
+                         'qty': '3', 'unit_price': '1000.00'}],
+            'delete': [deleted.id],
+        }
+        
+        # The statement count does not grow with the number of items.
+        with django_assert_max_num_queries(20):
+            response = client.post(f'/api/quotes/{quote.id}/items/bulk/', payload, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['items']) == 152
+        assert Decimal(response.data['total']) == Decimal('100') + Decimal('3000') + 150 * Decimal('300')
+        replaced.refresh_from_db()
+        assert (replaced.name, replaced.item_type, replaced.description) == ('Riego por goteo', 'SERVICE', '')
+        assert not QuoteItem.objects.filter(pk=deleted.id).exists()
+        assert QuoteItem.objects.filter(pk=kept.id).exists()
+    
+    def test_bulk_rejects_foreign_items_atomically(self, authenticated_client, quote):
+        client, user = authenticated_client
+        other = Quote.objects.create(customer=quote.customer)
+        foreign = QuoteItem.objects.create(quote=other, name='Ajeno', qty=1, unit_price=10)
+        
+        response = client.post(f'/api/quotes/{quote.id}/items/bulk/', {
+            'add': [{'name': 'Maceta', 'qty': '1', 'unit_price': '50.00'}],
+            'delete': [foreign.id],
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not quote.items.exists()
+        assert QuoteItem.objects.filter(pk=foreign.id).exists()
+        
+        response = client.post(f'/api/quotes/{quote.id}/items/bulk/', {
+            'replace': [{'name': 'Sin id'}],
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_bulk_add_cannot_choose_ids(self, authenticated_client, quote):
+        client, user = authenticated_client
+        other = Quote.objects.create(customer=quote.customer)
+        foreign = QuoteItem.objects.create(quote=other, name='Ajeno', qty=1, unit_price=10)
+        
+        for item_id in (foreign.id, foreign.id + 1000):
+            response = client.post(f'/api/quotes/{quote.id}/items/bulk/', {
+                'add': [{'id': item_id, 'name': 'Maceta', 'qty': '1', 'unit_price': '50.00'}],
+            }, format='json')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert 'add' in response.data
+        assert not quote.items.exists()
+        assert QuoteItem.objects.get(pk=foreign.id).quote == other
+    
+    def test_item_writes_apply_deltas(self, authenticated_client, quote, django_assert_num_queries):
+        client, user = authenticated_client
+        QuoteItem.objects.bulk_create(
+            QuoteItem(quote=quote, name=f'Bolsa {i}', qty=1, unit_price=10) for i in range(50)
+        )
+        quote.recalculate_total()
+        item = QuoteItem.objects.create(quote=quote, name='Tierra', qty=2, unit_price=500)
+        quote.refresh_from_db()
+        assert quote.total == Decimal('1500.00')
+        
+        # Savepoint, locked read of the old row, the item UPDATE and one
+        # UPDATE total = total + delta: no other item is read.
+        item = QuoteItem.objects.get(pk=item.pk)
+        item.qty = 3
+        with django_assert_num_queries(5):
+            item.save()
+        quote.refresh_from_db()
+        assert quote.total == Decimal('2000.00')
+        
+        other = Quote.objects.create(customer=quote.customer)
+        client.patch(f'/api/quote-items/{item.id}/', {'quote': other.id})
+        quote.refresh_from_db()
+        other.refresh_from_db()
+        assert (quote.total, other.total) == (Decimal('500.00'), Decimal('1500.00'))
+    
+    def test_reconcile_command_fixes_drift(self, quote):
+        QuoteItem.objects.create(quote=quote, name='Abono', qty=3, unit_price='33.33')
+        empty = Quote.objects.create(customer=quote.customer)
+        Quote.objects.filter(pk=quote.pk).update(total=1)
+        Quote.objects.filter(pk=empty.pk).update(total=5)
+        
+        out = io.StringIO()
+        call_command('reconcile_quote_totals', '--dry-run', '--chunk-size', '1', stdout=out)
+        assert '2 quotes checked' in out.getvalue()
+        assert '2 drifted totals found' in out.getvalue()
+        
+        call_command('reconcile_quote_totals', stdout=io.StringIO())
+        quote.refresh_from_db()
+        empty.refresh_from_db()
+        assert (quote.total, empty.total) == (Decimal('99.99'), Decimal('0'))
+        out = io.StringIO()
+        call_command('reconcile_quote_totals', stdout=out)
+        assert '0 drifted totals fixed' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestQuotePdf:
+    @pytest.fixture(autouse=True)
+    def pdf_dir(self, settings, tmp_path):
+        settings.QUOTE_PDF_DIR = str(tmp_path)
+        return tmp_path
+    
+    @pytest.fixture
+    def quote(self):
+        customer = Customer.objects.create(name='Familia Peña', email='pena@example.com')
+        quote = Quote.objects.create(customer=customer, notes='Incluye mano de obra (2 jornadas)')
+        for i in range(80):
+            QuoteItem.objects.create(quote=quote, name=f'Arbusto nº {i}', qty=2, unit_price='1250.50')
+        return quote
+    
+    def test_pdf_is_cached_and_revalidated(self, authenticated_client, quote, pdf_dir):
+        client, user = authenticated_client
+        url = f'/api/quotes/{quote.id}/pdf/'
+        
+        response = client.get(url, HTTP_ACCEPT='application/pdf')
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/pdf'
+        assert f'COT-{quote.id:04d}.pdf' in response['Content-Disposition']
+        body = b''.join(response.streaming_content)
+        assert body.startswith(b'%PDF-1.4') and body.rstrip().endswith(b'%%EOF')
+        assert body.count(b'/Type /Page ') == 2
+        etag = response['ETag']
+        
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        assert len(list(pdf_dir.rglob('*.pdf'))) == 1
+        
+        QuoteItem.objects.create(quote=quote, name='Flete', qty=1, unit_price=100)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert len(list(pdf_dir.rglob('*.pdf'))) == 2
+    
+    def test_batch_renders_over_a_process_pool(self, quote, pdf_dir):
+        for _ in range(3):
+            Quote.objects.create(customer=quote.customer, status='SENT')
+        
+        out = io.StringIO()
+        call_command('render_quote_pdfs', '--status', 'SENT', '--workers', '2', stdout=out)
+        assert '3 PDFs rendered, 0 already cached' in out.getvalue()
+        call_command('render_quote_pdfs', stdout=out)
+        assert '1 PDFs rendered, 3 already cached' in out.getvalue()
+    
+    def test_pdfs_unused_for_days_are_pruned(self, quote, pdf_dir):
+        stale, _ = documents.get_pdf(quote)
+        QuoteItem.objects.create(quote=quote, name='Flete', qty=1, unit_price=100)
+        current, _ = documents.get_pdf(quote)
+        long_ago = time.time() - 40 * 86400
+        for path in (stale, current):
+            os.utime(path, (long_ago, long_ago))
+        # Serving the current PDF marks it as used.
+        documents.get_pdf(quote)
+        
+        out = io.StringIO()
+        call_command('prune_quote_pdfs', '--days', '30', '--dry-run', stdout=out)
+        assert '1 PDFs would be removed' in out.getvalue()
+        assert stale.exists()
+        call_command('prune_quote_pdfs', stdout=out)
+        assert '1 PDFs removed' in out.getvalue() and '1 kept' in out.getvalue()
+        assert not stale.exists() and current.exists()
+
+
+@pytest.mark.django_db
+class TestCatalogPricePropagation:
+    @pytest.fixture
+    def quotes(self):
+        customer = Customer.objects.create(name='Consorcio Belgrano')
+        kit = CatalogItem.objects.create(name='Kit de riego', price_ref=1000)
+        poda = CatalogItem.objects.create(name='Poda', type='SERVICE', price_ref=500)
+        drafts = [Quote.objects.create(customer=customer) for _ in range(2)]
+        sent = Quote.objects.create(customer=customer, status='SENT')
+        for quote in drafts + [sent]:
+            QuoteItem.objects.create(quote=quote, catalog_item=kit, name=kit.name, qty=2, unit_price=1000)
+            QuoteItem.objects.create(quote=quote, catalog_item=poda, name=poda.name, qty=1, unit_price=500)
+            QuoteItem.objects.create(quote=quote, name='Flete', qty=1, unit_price=300)
+        # list_editable in the admin saves straight to the catalog.
+        CatalogItem.objects.filter(pk=kit.pk).update(price_ref=1200)
+        return kit, poda, drafts, sent
+    
+    def test_dry_run_reports_without_writing(self, authenticated_client, quotes):
+        client, user = authenticated_client
+        kit, poda, drafts, sent = quotes
+        response = client.post('/api/catalog/propagate_prices/', {'dry_run': True}, format='json')
+        assert response.data == {'rows': 2, 'quotes': 2, 'dry_run': True}
+        assert not QuoteItem.objects.filter(unit_price=1200).exists()
+    
+    def test_propagation_updates_drafts_only(self, authenticated_client, quotes, django_assert_max_num_queries):
+        client, user = authenticated_client
+        kit, poda, drafts, sent = quotes
+        
+        with django_assert_max_num_queries(8):
+            response = client.post('/api/catalog/propagate_prices/', {'items': [kit.id]}, format='json')
+        assert response.data == {'rows': 2, 'quotes': 2, 'dry_run': False}
+        for quote in drafts:
+            quote.refresh_from_db()
+            assert quote.total == Decimal('3200.00')
+            assert quote.items.get(catalog_item=kit).unit_price == Decimal('1200.00')
+        sent.refresh_from_db()
+        assert sent.total == Decimal('2800.00')
+        
+        out = io.StringIO()
+        call_command('propagate_catalog_prices', '--dry-run', stdout=out)
+        assert '0 quote lines in 0 draft quotes would change' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestQuoteCloning:
+    @pytest.fixture
+    def customer(self):
+        return Customer.objects.create(name='Vivero del Sur')
+    
+    def test_clone_quote_copies_lines_in_constant_queries(
+        self, authenticated_client, customer, django_assert_max_num_queries
+    ):
+        client, user = authenticated_client
+        source = Quote.objects.create(customer=customer, status='SENT', notes='Incluye flete')
+        QuoteItem.objects.bulk_create(
+            QuoteItem(quote=source, name=f'Planta {i}', qty=3, unit_price='99.99') for i in range(100)
+        )
+        
+        with django_assert_max_num_queries(15):
+            response = client.post('/api/quotes/clone/', {'quote': source.id}, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        clone = Quote.objects.get(pk=response.data['id'])
+        assert clone.pk != source.pk
+        assert clone.status == 'DRAFT'
+        assert clone.customer_id == customer.id
+        assert clone.notes == 'Incluye flete'
+        assert clone.created_by == user
+        assert clone.items.count() == 100
+        assert clone.total == 100 * 3 * Decimal('99.99')
+        assert source.items.count() == 100
+    
+    def test_quote_from_template(self, authenticated_client, customer):
+        client, user = authenticated_client
+        response = client.post('/api/quote-templates/', {
+            'name': 'Mantenimiento mensual',
+            'notes': 'Precios válidos por 30 días',
+            'items': [
+                {'name': 'Corte de césped', 'item_type': 'SERVICE', 'qty': '4', 'unit_price': '2500.00'},
+                {'name': 'Fertilizante', 'item_type': 'PRODUCT', 'qty': '1.5', 'unit_price': '1200.00'},
+            ],
+        }, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        template = QuoteTemplate.objects.get(pk=response.data['id'])
+        assert template.items.count() == 2
+        
+        response = client.post('/api/quotes/clone/', {
+            'template': template.id, 'customer': customer.id, 'valid_until': '2026-12-31',
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Decimal(response.data['total']) == Decimal('11800.00')
+        assert [item['name'] for item in response.data['items']] == ['Corte de césped', 'Fertilizante']
+        assert response.data['notes'] == 'Precios válidos por 30 días'
+        assert response.data['valid_until'] == '2026-12-31'
+    
+    def test_clone_requires_one_source(self, authenticated_client, customer):
+        client, user = authenticated_client
+        source = Quote.objects.create(customer=customer)
+        template = QuoteTemplate.objects.create(name='Vacía')
+        
+        assert client.post('/api/quotes/clone/', {}, format='json').status_code == 400
+        response = client.post('/api/quotes/clone/', {'quote': source.id, 'template': template.id}, format='json')
+        assert response.status_code == 400
+        response = client.post('/api/quotes/clone/', {'template': template.id}, format='json')
+        assert response.status_code == 400
+        assert 'customer' in response.data
+    
+    def test_template_update_replaces_items(self, authenticated_client):
+        client, user = authenticated_client
+        template = QuoteTemplate.objects.create(name='Riego')
+        QuoteTemplateItem.objects.create(template=template, name='Aspersor', qty=10, unit_price=500)
+        
+        response = client.patch(f'/api/quote-templates/{template.id}/', {
+            'items': [{'name': 'Goteo', 'item_type': 'SERVICE', 'qty': '1', 'unit_price': '9000.00'}],
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert [item.name for item in template.items.all()] == ['Goteo']
+
+
+def image_bytes(size=(2000, 1500), color=(40, 120, 60), image_format='JPEG'):
+    output = io.BytesIO()
+    Image.new('RGB', size, color).save(output, image_format)
+    return output.getvalue()
+
+
+@pytest.mark.django_db
+class TestProjectMediaUpload:
+    @pytest.fixture(autouse=True)
+    def media_storage(self, settings, tmp_path):
+        settings.STORAGES = {
+            **settings.STORAGES,
+            'project_media': {
+                'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                'OPTIONS': {'location': str(tmp_path), 'base_url': '/media/projects/'},
+            },
+        }
+        settings.PROJECT_MEDIA_WORKERS = 0
+        return tmp_path
+    
+    @pytest.fixture
+    def project(self):
+        customer = Customer.objects.create(name='Estancia La Paz')
+        return Project.objects.create(customer=customer, title='Jardín de entrada')
+    
+    def upload(self, client, project, data, name='foto.jpg'):
+        return client.post('/api/project-media/upload/', {
+            'project': project.id, 'media_type': 'BEFORE', 'caption': 'Antes',
+            'file': SimpleUploadedFile(name, data, content_type='image/jpeg'),
+        }, format='multipart')
+    
+    def test_upload_stores_original_and_thumbnails(self, authenticated_client, project, media_storage):
+        client, user = authenticated_client
+        data = image_bytes()
+        
+        response = self.upload(client, project, data)
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        media = ProjectMedia.objects.get(pk=response.data['id'])
+        assert (media.width, media.height, media.file_size) == (2000, 1500, len(data))
+        assert len(media.content_hash) == 64
+        assert response.data['url'] == f'http://testserver/media/projects/originals/{media.content_hash[:2]}/{media.content_hash}.jpg'
+        assert set(response.data['thumbnails']) == set(images.THUMBNAIL_SIZES)
+        for label, size in images.THUMBNAIL_SIZES.items():
+            with Image.open(media_storage / media.thumbnails[label]) as thumbnail:
+                assert max(thumbnail.size) == size
+    
+    def test_same_content_is_stored_and_rendered_once(self, authenticated_client, project, media_storage):
+        client, user = authenticated_client
+        data = image_bytes()
+        
+        with mock.patch.object(images, 'make_thumbnails', wraps=images.make_thumbnails) as render:
+            first = self.upload(client, project, data, name='a.jpg')
+            second = self.upload(client, project, data, name='b.jpg')
+        
+        assert render.call_count == 1
+        assert first.data['id'] != second.data['id']
+        assert first.data['url'] == second.data['url']
+        assert first.data['thumbnails'] == second.data['thumbnails']
+        assert len(list((media_storage / 'originals').rglob('*.jpg'))) == 1
+    
+    def test_thumbnails_survive_a_dead_worker(self, authenticated_client, project, settings):
+        client, user = authenticated_client
+        photo = ProjectMedia.objects.get(pk=self.upload(client, project, image_bytes()).data['id'])
+        settings.PROJECT_MEDIA_WORKERS = 2
+        media.get_process_pool.cache_clear()
+        
+        broken = media.get_process_pool()
+        with pytest.raises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()
+        
+        assert set(media.generate_thumbnails(photo, in_pool=True)) == set(images.THUMBNAIL_SIZES)
+        assert media.get_process_pool() is not broken
+        media.get_process_pool().shutdown()
+        media.get_process_pool.cache_clear()
+    
+    def test_rejects_non_images(self, authenticated_client, project):
+        client, user = authenticated_client
+        response = self.upload(client, project, b'%PDF-1.4 no soy una foto', name='foto.pdf')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'file' in response.data
+        
+        response = client.post('/api/project-media/', {'project': project.id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'url' in response.data
+    
+    def test_rejects_images_with_too_many_pixels(self, authenticated_client, project, settings):
+        client, user = authenticated_client
+        settings.PROJECT_MEDIA_MAX_PIXELS = 1000 * 1000
+        response = self.upload(client, project, image_bytes())
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'megapíxeles' in response.data['file'][0]
+        
+        # A few KB that Pillow refuses to open as a decompression bomb.
+        output = io.BytesIO()
+        Image.new('1', (15000, 15000)).save(output, 'PNG')
+        response = self.upload(client, project, output.getvalue(), name='bomba.png')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'megapíxeles' in response.data['file'][0]
+        assert not ProjectMedia.objects.exists()
+    
+    def test_files_are_served_with_long_lived_cache(self, authenticated_client, project, api_client):
+        client, user = authenticated_client
+        url = self.upload(client, project, image_bytes(size=(300, 200))).data['url']
+        
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Cache-Control'] == 'public, max-age=31536000, immutable'
+        assert b''.join(response.streaming_content)[:2] == b'\xff\xd8'
+        
+        revalidated = api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+        assert api_client.get('/media/projects/originals/../../settings.py').status_code == 404
+    
+    def test_command_generates_missing_thumbnails(self, authenticated_client, project):
+        client, user = authenticated_client
+        for color in [(200, 0, 0), (0, 200, 0)]:
+            self.upload(client, project, image_bytes(size=(800, 600), color=color, image_format='PNG'), 'p.png')
+        ProjectMedia.objects.update(thumbnails={})
+        
+        output = io.StringIO()
+        call_command('generate_thumbnails', workers=2, stdout=output)
+        
+        assert 'Thumbnails generated for 2 images' in output.getvalue()
+        assert all(set(media.thumbnails) == set(images.THUMBNAIL_SIZES) for media in ProjectMedia.objects.all())
+
+
+@pytest.mark.django_db
+class TestProjectTimeline:
+    @pytest.fixture
+    def projects(self):
+        customer = Customer.objects.create(name='Barrio Los Álamos')
+        spec = {
+            'finished before': ('DONE', date(2026, 9, 1), date(2026, 9, 30)),
+            'starts after': ('PLANNING', date(2026, 11, 2), date(2026, 11, 20)),
+            'spans window': ('IN_PROGRESS', date(2026, 9, 15), date(2026, 11, 30)),
+            'first week': ('DONE', date(2026, 10, 1), date(2026, 10, 6)),
+            'open ended': ('MAINTENANCE', date(2026, 10, 14), None),
+            'unscheduled': ('PLANNING', None, None),
+            'ends before start': ('DONE', date(2026, 10, 20), date(2026, 10, 1)),
+        }
+        return {
+            title: Project.objects.create(
+                customer=customer, title=title, status=status_code, start_date=start, end_date=end
+            )
+            for title, (status_code, start, end) in spec.items()
+        }
+    
+    def test_projects_overlapping_window_grouped_per_week(
+        self, authenticated_client, projects, django_assert_num_queries
+    ):
+        client, user = authenticated_client
+        
+        with django_assert_num_queries(1):
+            response = client.get('/api/projects/timeline/', {'date_from': '2026-10-05', 'date_to': '2026-10-25'})
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.data
+        assert [row['title'] for row in data['projects']] == [
+            'spans window', 'first week', 'open ended', 'ends before start'
+        ]
+        assert data['count'] == 4
+        assert data['projects'][0]['customer_name'] == 'Barrio Los Álamos'
+        ids = {title: project.id for title, project in projects.items()}
+        assert [(week['week_start'], week['projects']) for week in data['weeks']] == [
+            (date(2026, 10, 5), [ids['spans window'], ids['first week']]),
+            (date(2026, 10, 12), [ids['spans window'], ids['open ended']]),
+            (date(2026, 10, 19), [ids['spans window'], ids['open ended'], ids['ends before start']]),
+        ]
+    
+    def test_status_filter(self, authenticated_client, projects):
+        client, user = authenticated_client
+        response = client.get('/api/projects/timeline/', {
+            'date_from': '2026-10-05', 'date_to': '2026-10-25', 'status': 'IN_PROGRESS,MAINTENANCE',
+        })
+        assert [row['title'] for row in response.data['projects']] == ['spans window', 'open ended']
+    
+    def test_invalid_parameters(self, authenticated_client):
+        client, user = authenticated_client
+        for params in [
+            {'date_from': '2026-10-25', 'date_to': '2026-10-05'},
+            {'date_from': 'ayer'},
+            {'date_from': '2026-01-01', 'date_to': '2027-06-01'},
+            {'status': 'CANCELLED'},
+        ]:
+            response = client.get('/api/projects/timeline/', params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, params
+
+
+@pytest.mark.django_db
+class TestRecurringActivities:
+    @pytest.fixture
+    def customer(self):
+        return Customer.objects.create(name='Consorcio Torre Sur')
+    
+    def test_occurrences(self):
+        monthly = recurrence.occurrences('MONTHLY', date(2026, 1, 31), date(2026, 2, 1), date(2026, 5, 31))
+        assert list(monthly) == [date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30), date(2026, 5, 31)]
+        biweekly = recurrence.occurrences('BIWEEKLY', date(2026, 10, 1), date(2026, 10, 20), date(2026, 11, 30))
+        assert list(biweekly) == [date(2026, 10, 29), date(2026, 11, 12), date(2026, 11, 26)]
+        quarterly = recurrence.occurrences('QUARTERLY', date(2027, 1, 15), date(2026, 10, 1), date(2027, 12, 31))
+        assert list(quarterly) == [date(2027, 1, 15), date(2027, 4, 15), date(2027, 7, 15), date(2027, 10, 15)]
+    
+    def test_command_generates_visits_once(self, customer):
+        Project.objects.create(
+            customer=customer, title='Jardines del edificio', status='MAINTENANCE',
+            recurrence='MONTHLY', start_date=date(2026, 3, 10),
+        )
+        Project.objects.create(
+            customer=customer, title='Terraza', status='MAINTENANCE', recurrence='WEEKLY',
+            start_date=date(2026, 1, 1), recurrence_start=date(2026, 10, 20), end_date=date(2026, 11, 5),
+        )
+        Project.objects.create(customer=customer, title='Sin regla', status='MAINTENANCE', start_date=date(2026, 1, 1))
+        Project.objects.create(
+            customer=customer, title='Terminado', status='DONE', recurrence='WEEKLY', start_date=date(2026, 1, 1)
+        )
+        
+        output = io.StringIO()
+        call_command('generate_recurring_activities', '--from', '2026-10-17', '--days', '60', stdout=output)
+        
+        assert '5 activities created, 0 already existed, 2 projects' in output.getvalue()
+        visits = Activity.objects.filter(type='VISIT').order_by('due_at')
+        assert [(visit.project.title, visit.occurrence) for visit in visits] == [
+            ('Terraza', date(2026, 10, 20)),
+            ('Terraza', date(2026, 10, 27)),
+            ('Terraza', date(2026, 11, 3)),
+            ('Jardines del edificio', date(2026, 11, 10)),
+            ('Jardines del edificio', date(2026, 12, 10)),
+        ]
+        first = visits[0]
+        assert first.customer == customer
+        assert timezone.localtime(first.due_at).hour == 9
+        assert SearchEntry.objects.filter(object_id=first.pk, document__contains='terraza').exists()
+        
+        output = io.StringIO()
+        call_command('generate_recurring_activities', '--from', '2026-10-17', '--days', '60', stdout=output)
+        assert '0 activities created, 5 already existed' in output.getvalue()
+        assert Activity.objects.count() == 5
+    
+    def test_unique_key_rejects_duplicates(self, customer):
+        from django.db import IntegrityError, transaction
+        project = Project.objects.create(customer=customer, title='Plaza', status='MAINTENANCE', recurrence='WEEKLY')
+        Activity.objects.create(type='VISIT', project=project, occurrence=date(2026, 10, 20))
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Activity.objects.create(type='VISIT', project=project, occurrence=date(2026, 10, 20))
+    
+    def test_query_count_does_not_grow_with_projects(self, customer, django_assert_max_num_queries):
+        Project.objects.bulk_create(
+            Project(
+                customer=customer, title=f'Mantenimiento {i}', status='MAINTENANCE',
+                recurrence='WEEKLY', start_date=date(2026, 1, 1) + timedelta(days=i % 7),
+            )
+            for i in range(300)
+        )
+        
+        # A handful of statements per chunk (SQLite splits bulk INSERTs at its
+        # parameter limit), never one per project.
+        with django_assert_max_num_queries(20):
+            result = recurrence.generate(7, date_from=date(2026, 10, 1))
+        
+        assert (result.projects, result.created) == (300, 300)
+
+
+@pytest.mark.django_db
+class TestCatalogSnapshot:
+    @pytest.fixture
+    def items(self):
+        return CatalogItem.objects.bulk_create([
+            CatalogItem(name='Césped en rollo', category='Plantas', price_ref='800.00'),
+            CatalogItem(name='Poda', type='SERVICE', category='Servicios', price_ref='5000.00'),
+            CatalogItem(name='Maceta discontinuada', category='Macetas', active=False),
+        ])
+    
+    def test_snapshot_is_built_once_per_version(self, authenticated_client, items, django_assert_num_queries):
+        client, user = authenticated_client
+        response = client.get('/api/catalog/snapshot/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [item['name'] for item in data['results']] == ['Césped en rollo', 'Poda']
+        assert data['count'] == 2
+        assert response['ETag'].startswith('"') and not response['ETag'].startswith('W/')
+        
+        # Served from memory without touching the database.
+        with django_assert_num_queries(0):
+            again = client.get('/api/catalog/snapshot/')
+        assert again.content == response.content
+        assert again['ETag'] == response['ETag']
+    
+    def test_conditional_get_and_gzip(self, authenticated_client, items):
+        client, user = authenticated_client
+        etag = client.get('/api/catalog/snapshot/')['ETag']
+        
+        response = client.get('/api/catalog/snapshot/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        
+        response = client.get('/api/catalog/snapshot/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        assert json.loads(gzip.decompress(response.content))['count'] == 2
+    
+    def test_writes_change_the_version_and_etag(self, authenticated_client, items):
+        client, user = authenticated_client
+        first = client.get('/api/catalog/snapshot/')
+        
+        client.patch(f'/api/catalog/{items[0].id}/', {'price_ref': '900.00'}, format='json')
+        
+        second = client.get('/api/catalog/snapshot/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert second.status_code == status.HTTP_200_OK
+        assert second['ETag'] != first['ETag']
+        assert second.json()['version'] > first.json()['version']
+        assert second.json()['results'][0]['price_ref'] == '900.00'
+        
+        items[1].delete()
+        assert client.get('/api/catalog/snapshot/').json()['count'] == 1
+    
+    def test_snapshots_built_before_commit_are_rebuilt_after_it(
+        self, authenticated_client, items, django_capture_on_commit_callbacks
+    ):
+        client, user = authenticated_client
+        with django_capture_on_commit_callbacks(execute=True):
+            CatalogItem.objects.create(name='Tierra negra', category='Sustratos', price_ref='300.00')
+            # Another process building the snapshot between the save and the commit.
+            first = client.get('/api/catalog/snapshot/')
+        second = client.get('/api/catalog/snapshot/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json()['version'] > first.json()['version']
+
+
+@pytest.mark.django_db
+class TestAutocomplete:
+    @pytest.fixture(autouse=True)
+    def fresh_indexes(self, settings):
+        settings.AUTOCOMPLETE_BACKGROUND_BUILD = False
+        autocomplete.reset()
+        yield
+        autocomplete.reset()
+    
+    @pytest.fixture
+    def customers(self):
+        return [
+            Customer.objects.create(name='Juan Pérez'),
+            Customer.objects.create(name='Pedro Gómez'),
+            Customer.objects.create(name='Perla Díaz'),
+            Customer.objects.create(name='Ana Ruiz'),
+        ]
+    
+    def names(self, response):
+        return [row['name'] for row in response.json()['results']]
+    
+    def test_prefix_of_any_word_folded_and_ranked_by_usage(self, authenticated_client, customers):
+        client, user = authenticated_client
+        Quote.objects.create(customer=customers[2])
+        cesped = CatalogItem.objects.create(name='Césped en rollo', price_ref='800.00')
+        cesto = CatalogItem.objects.create(name='Cesto de mimbre', price_ref='1200.00')
+        CatalogItem.objects.create(name='Cerco de cesped', active=False)
+        quote = Quote.objects.create(customer=customers[0])
+        QuoteItem.objects.create(quote=quote, catalog_item=cesto, name=cesto.name, qty=1, unit_price=1200)
+        
+        response = client.get('/api/autocomplete/catalog/', {'q': 'CES'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Autocomplete-Source'] == 'memory'
+        assert self.names(response) == ['Cesto de mimbre', 'Césped en rollo']
+        assert response.json()['results'][1] == {
+            'id': cesped.id, 'name': 'Césped en rollo', 'type': 'PRODUCT', 'category': '', 'price_ref': '800.00',
+        }
+        
+        # Word prefixes match too, and the most quoted customer comes first.
+        names = self.names(client.get('/api/autocomplete/customers/', {'q': 'pe'}))
+        assert names[0] == 'Perla Díaz'
+        assert sorted(names[1:]) == ['Juan Pérez', 'Pedro Gómez']
+        assert self.names(client.get('/api/autocomplete/customers/', {'q': 'juan  PER', 'limit': 1})) == ['Juan Pérez']
+        assert client.get('/api/autocomplete/customers/', {'q': ' '}).json()['results'] == []
+    
+    def test_writes_patch_the_index_without_rebuilding(
+        self, authenticated_client, customers, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        client, user = authenticated_client
+        client.get('/api/autocomplete/customers/', {'q': 'a'})
+        with django_assert_num_queries(0):
+            response = client.get('/api/autocomplete/customers/', {'q': 'ana'})
+        assert self.names(response) == ['Ana Ruiz']
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            created = client.post('/api/customers/', {'name': 'Anahí Sosa'}, format='json').json()
+            customers[3].delete()
+        with django_assert_num_queries(0):
+            response = client.get('/api/autocomplete/customers/', {'q': 'ana'})
+        assert self.names(response) == ['Anahí Sosa']
+        assert response.json()['results'][0]['id'] == created['id']
+        
+        # Usage from new quotes reorders the matches in place.
+        with django_capture_on_commit_callbacks(execute=True):
+            Quote.objects.create(customer=customers[1])
+        assert self.names(client.get('/api/autocomplete/customers/', {'q': 'pe'}))[0] == 'Pedro Gómez'
+    
+    def test_cold_process_answers_from_the_database(self, authenticated_client, customers):
+        client, user = authenticated_client
+        with mock.patch.object(autocomplete, 'schedule_build') as schedule_build:
+            response = client.get('/api/autocomplete/customers/', {'q': 'Pé'})
+        
+        schedule_build.assert_called_once()
+        assert response['X-Autocomplete-Source'] == 'database'
+        # Only the start of the name is indexed in the database.
+        assert sorted(self.names(response)) == ['Pedro Gómez', 'Perla Díaz']
+        assert response.json()['results'][0].keys() == {'id', 'name', 'type', 'email', 'phone'}
+    
+    def test_invalid_requests(self, authenticated_client):
+        client, user = authenticated_client
+        assert client.get('/api/autocomplete/leads/', {'q': 'a'}).status_code == status.HTTP_404_NOT_FOUND
+        assert client.get('/api/autocomplete/catalog/', {'q': 'a', 'limit': 'x'}).status_code == 400
+        assert client.get('/api/autocomplete/catalog/', {'q': 'a', 'limit': 51}).status_code == 400
+        assert APIClient().get('/api/autocomplete/catalog/', {'q': 'a'}).status_code == 401
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    @pytest.fixture
+    def user(self, django_user_model):
+        authentication.reset()
+        return django_user_model.objects.create_user(email='cache@test.com', password='testpass123')
+    
+    @pytest.fixture
+    def token_client(self, api_client, user):
+        token = api_client.post('/api/token/', {'email': 'cache@test.com', 'password': 'testpass123'}).data['access']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # Builds the catalog snapshot, so later requests only query for the user.
+        api_client.get('/api/catalog/snapshot/')
+        return api_client
+    
+    def test_user_is_loaded_once(self, token_client, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            response = token_client.get('/api/catalog/snapshot/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.wsgi_request.user.email == 'cache@test.com'
+    
+    def test_auth_fields_invalidate_the_cached_user(self, token_client, user, django_assert_num_queries):
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        with django_assert_num_queries(0):
+            token_client.get('/api/catalog/snapshot/')
+        
+        user.role = 'OPS'
+        user.save()
+        with django_assert_num_queries(1):
+            response = token_client.get('/api/catalog/snapshot/')
+        assert response.wsgi_request.user.role == 'OPS'
+        
+        user.set_password('otherpass456')
+        user.save(update_fields=['password'])
+        with django_assert_num_queries(1):
+            token_client.get('/api/catalog/snapshot/')
+        
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        assert token_client.get('/api/catalog/snapshot/').status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_users_cached_before_commit_are_dropped_after_it(
+        self, token_client, user, django_capture_on_commit_callbacks
+    ):
+        # The id as the token carries it.
+        [(user_id, _)] = authentication._users
+        with django_capture_on_commit_callbacks(execute=True):
+            stale = copy.copy(user)
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+            # Another process authenticating before the commit still reads the active row.
+            authentication.store((user_id, versions.get_version(authentication.version_key(user_id))), stale)
+        assert token_client.get('/api/catalog/snapshot/').status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_ttl_zero_disables_the_cache(self, token_client, settings, django_assert_num_queries):
+        settings.AUTH_USER_CACHE_TTL = 0
+        with django_assert_num_queries(1):
+            token_client.get('/api/catalog/snapshot/')
+    
+    def test_benchmark_command(self, user):
+        out = io.StringIO()
+        call_command('benchmark_auth', requests=20, stdout=out)
+        lines = out.getvalue().splitlines()
+        assert lines[0].startswith('JWTAuthentication:') and lines[0].endswith('1.00 queries/request')
+        assert lines[1].startswith('CachedJWTAuthentication:') and lines[1].endswith('0.00 queries/request')
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    @pytest.fixture
+    def customer(self):
+        return Customer.objects.create(name='Vivero Central')
+    
+    def test_list_revalidates_before_serializing(
+        self, authenticated_client, customer, django_user_model, django_assert_num_queries
+    ):
+        client, user = authenticated_client
+        response = client.get('/api/customers/')
+        etag = response['ETag']
+        assert etag.startswith('W/"')
+        assert 'Last-Modified' in response
+        assert 'no-cache' in response['Cache-Control']
+        
+        # Only the aggregate computing the validator runs.
+        with django_assert_num_queries(1):
+            response = client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        
+        assert client.get('/api/customers/?type=COMPANY', HTTP_IF_NONE_MATCH=etag).status_code == 200
+        other = APIClient()
+        other.force_authenticate(user=django_user_model.objects.create_user(email='otro@test.com', password='x'))
+        assert other.get('/api/customers/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+        
+        Customer.objects.create(name='Jardines del Sur')
+        response = client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+        
+        etag = response['ETag']
+        Customer.objects.filter(name='Jardines del Sur').delete()
+        assert client.get('/api/customers/', HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+    
+    def test_detail_sees_nested_rows(self, authenticated_client, customer):
+        client, user = authenticated_client
+        url = f'/api/customers/{customer.id}/?expand=contacts'
+        response = client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == status.HTTP_304_NOT_MODIFIED
+        
+        Contact.objects.create(customer=customer, name='Marta')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert [contact['name'] for contact in response.data['contacts']] == ['Marta']
+    
+    def test_quote_total_changes_invalidate(self, authenticated_client, customer):
+        client, user = authenticated_client
+        quote = Quote.objects.create(customer=customer)
+        etag = client.get(f'/api/quotes/{quote.id}/')['ETag']
+        list_etag = client.get('/api/quotes/')['ETag']
+        
+        # The total is written with a queryset UPDATE, but the item save is tracked.
+        QuoteItem.objects.create(quote=quote, name='Poda', qty=1, unit_price=5000)
+        response = client.get(f'/api/quotes/{quote.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total'] == '5000.00'
+        assert client.get('/api/quotes/', HTTP_IF_NONE_MATCH=list_etag).status_code == status.HTTP_200_OK
+    
+    def test_keyset_lists_validate_from_the_page(self, authenticated_client, django_assert_num_queries):
+        client, user = authenticated_client
+        leads = Lead.objects.bulk_create(Lead(name=f'Lead {i}') for i in range(3))
+        url = '/api/leads/?pagination=cursor&limit=2'
+        with django_assert_num_queries(1) as queries:
+            response = client.get(url)
+        assert 'COUNT' not in queries.captured_queries[0]['sql'].upper()
+        etag = response['ETag']
+        
+        with django_assert_num_queries(1):
+            assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        
+        # Rows on the page, and rows entering it, change the ETag.
+        on_page = response.data['results'][0]['id']
+        Lead.objects.filter(pk=on_page).update(notes='Llamar', updated_at=timezone.now())
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+        etag = client.get(url)['ETag']
+        Lead.objects.create(name='Lead nuevo')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+    
+    def test_etags_served_before_commit_go_stale_after_it(
+        self, authenticated_client, customer, django_capture_on_commit_callbacks
+    ):
+        client, user = authenticated_client
+        quote = Quote.objects.create(customer=customer)
+        url = f'/api/quotes/{quote.id}/'
+        with django_capture_on_commit_callbacks(execute=True):
+            QuoteItem.objects.create(quote=quote, name='Poda', qty=1, unit_price=5000)
+            # Another process reading between the item save and the commit.
+            etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    @pytest.fixture
+    def customer(self):
+        customer = Customer.objects.create(name='Vivero Central', email='vivero@test.com')
+        Contact.objects.create(customer=customer, name='Marta')
+        Address.objects.create(customer=customer, city='Rosario')
+        return customer
+    
+    def test_fields_narrow_the_payload_and_the_select(self, authenticated_client, customer, django_assert_num_queries):
+        client, user = authenticated_client
+        with django_assert_num_queries(2) as queries:
+            response = client.get('/api/customers/', {'fields': 'id,name'})
+        
+        assert response.data['results'] == [{'id': customer.id, 'name': 'Vivero Central'}]
+        page_sql = queries.captured_queries[-1]['sql']
+        assert '"email"' not in page_sql and 'customers_contact' not in page_sql
+        
+        row = client.get('/api/customers/').data['results'][0]
+        assert row['email'] == 'vivero@test.com' and row['contacts_count'] == 1
+    
+    def test_nested_relations_are_opt_in(self, authenticated_client, customer, django_assert_num_queries):
+        client, user = authenticated_client
+        url = f'/api/customers/{customer.id}/'
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert 'contacts' not in response.data and 'addresses' not in response.data
+        assert response.data['name'] == 'Vivero Central'
+        
+        # One query for the customer, one prefetch per expanded relation.
+        with django_assert_num_queries(3):
+            response = client.get(url, {'expand': 'contacts,addresses'})
+        assert [contact['name'] for contact in response.data['contacts']] == ['Marta']
+        assert [address['city'] for address in response.data['addresses']] == ['Rosario']
+        
+        response = client.get(url, {'fields': 'id,contacts'})
+        assert set(response.data) == {'id', 'contacts'}
+        
+        # Writes keep answering with the full representation.
+        response = client.patch(url, {'notes': 'Riego'}, format='json')
+        assert response.data['contacts'][0]['name'] == 'Marta'
+    
+    def test_quote_items_and_related_names(self, authenticated_client, customer, django_assert_num_queries):
+        client, user = authenticated_client
+        quote = Quote.objects.create(customer=customer)
+        QuoteItem.objects.create(quote=quote, name='Poda', qty=2, unit_price=500)
+        url = f'/api/quotes/{quote.id}/'
+        
+        assert 'items' not in client.get(url).data
+        response = client.get(url, {'expand': 'items', 'fields': 'id,customer_name,total'})
+        assert response.data['customer_name'] == 'Vivero Central'
+        assert response.data['items'][0]['line_total'] == '1000.00'
+        assert set(response.data) == {'id', 'customer_name', 'total', 'items'}
+        
+        with django_assert_num_queries(2) as queries:
+            response = client.get('/api/quotes/', {'fields': 'id,customer_name'})
+        assert response.data['results'] == [{'id': quote.id, 'customer_name': 'Vivero Central'}]
+        assert 'quotes_quoteitem' not in queries.captured_queries[-1]['sql']
+    
+    def test_keyset_pages_load_their_ordering_columns(self, authenticated_client, customer, django_assert_num_queries):
+        client, user = authenticated_client
+        Project.objects.bulk_create(Project(customer=customer, title=f'Proyecto {i}') for i in range(3))
+        
+        with django_assert_num_queries(1):
+            response = client.get('/api/projects/', {'pagination': 'cursor', 'page_size': 2, 'fields': 'id,title'})
+        assert [set(row) for row in response.data['results']] == [{'id', 'title'}] * 2
+        
+        response = client.get(response.data['next'])
+        assert [row['title'] for row in response.data['results']] == ['Proyecto 0']
+
+
+@pytest.mark.django_db
+class TestBatchEndpoint:
+    @pytest.fixture(autouse=True)
+    def inline(self, settings):
+        settings.BATCH_WORKERS = 1
+    
+    @pytest.fixture
+    def customer(self):
+        return Customer.objects.create(name='Vivero Central')
+    
+    def test_reads_answer_like_separate_requests(self, authenticated_client, customer):
+        client, user = authenticated_client
+        Quote.objects.create(customer=customer, status='SENT')
+        response = client.post('/api/batch/', {'requests': [
+            {'method': 'GET', 'url': '/quotes/?status=SENT'},
+            {'url': '/customers/?fields=id,name'},
+            {'url': '/no-existe/'},
+        ]}, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        quotes, customers, missing = response.data['responses']
+        assert quotes['status'] == 200
+        assert quotes['body'] == json.loads(client.get('/api/quotes/', {'status': 'SENT'}).content)
+        assert customers['body']['results'] == [{'id': customer.id, 'name': 'Vivero Central'}]
+        assert missing == {'status': 404, 'headers': {}, 'body': {'error': 'Ruta no encontrada'}}
+    
+    def test_writes_run_in_order(self, authenticated_client, customer):
+        client, user = authenticated_client
+        response = client.post('/api/batch/', {'requests': [
+            {'url': '/customers/?fields=id'},
+            {'method': 'POST', 'url': '/customers/', 'body': {'name': 'Jardín Central'}},
+            {'url': '/customers/?fields=id'},
+            {'method': 'PATCH', 'url': f'/customers/{customer.id}/', 'body': {'email': 'no-es-email'}},
+        ]}, format='json')
+        
+        before, created, after, invalid = response.data['responses']
+        assert before['body']['count'] == 1 and after['body']['count'] == 2
+        assert created['status'] == 201 and created['body']['name'] == 'Jardín Central'
+        assert invalid['status'] == 400 and 'email' in invalid['body']
+    
+    def test_sub_requests_share_the_batch_authentication(self, api_client, django_user_model, customer):
+        django_user_model.objects.create_user(email='batch@test.com', password='testpass123')
+        token = api_client.post('/api/token/', {'email': 'batch@test.com', 'password': 'testpass123'}).data['access']
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        
+        with mock.patch.object(
+            authentication.CachedJWTAuthentication, 'authenticate', autospec=True,
+            side_effect=authentication.CachedJWTAuthentication.authenticate,
+        ) as authenticate:
+            response = api_client.post('/api/batch/', {'requests': [
+                {'url': '/customers/'}, {'url': '/quotes/'}, {'url': '/projects/'},
+            ]}, format='json')
+        assert [item['status'] for item in response.data['responses']] == [200, 200, 200]
+        assert authenticate.call_count == 1
+        
+        api_client.credentials()
+        assert api_client.post('/api/batch/', {'requests': [{'url': '/customers/'}]}, format='json').status_code == 401
+    
+    def test_conditional_headers_reach_the_sub_request(self, authenticated_client, customer):
+        client, user = authenticated_client
+        etag = client.get(f'/api/customers/{customer.id}/')['ETag']
+        response = client.post('/api/batch/', {'requests': [
+            {'url': f'/customers/{customer.id}/', 'headers': {'If-None-Match': etag}},
+        ]}, format='json')
+        assert response.data['responses'][0]['status'] == 304
+        assert response.data['responses'][0]['headers']['ETag'] == etag
+    
+    @pytest.mark.parametrize('payload, message', [
+        ({'requests': []}, 'requests debe ser una lista no vacía'),
+        ({'requests': [{'url': '/customers/'}] * 21}, 'Se admiten como máximo 20 solicitudes por lote'),
+        ({'requests': [{'url': 'customers/'}]}, 'La solicitud 0 necesita una url que empiece con /'),
+        ({'requests': [{'url': '/customers/', 'method': 'TRACE'}]}, 'La solicitud 0 tiene un método no soportado'),
+    ])
+    def test_rejects_invalid_envelopes(self, authenticated_client, payload, message):
+        client, user = authenticated_client
+        response = client.post('/api/batch/', payload, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'error': message}
+    
+    def test_batches_do_not_nest(self, authenticated_client):
+        client, user = authenticated_client
+        response = client.post('/api/batch/', {'requests': [
+            {'method': 'POST', 'url': '/batch/', 'body': {'requests': [{'url': '/customers/'}]}},
+        ]}, format='json')
+        assert response.data['responses'][0] == {
+            'status': 400, 'headers': {}, 'body': {'error': 'No se puede anidar un lote'}
+        }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_reads_run_concurrently(authenticated_client, settings):
+    settings.BATCH_WORKERS = 3
+    client, user = authenticated_client
+    Customer.objects.create(name='Vivero Central')
+    threads = []
+    original = batch.dispatch
+    
+    def dispatch(request, item):
+        threads.append(threading.current_thread().name)
+        return original(request, item)
+    
+    with mock.patch.object(batch, 'dispatch', side_effect=dispatch):
+        response = client.post('/api/batch/', {'requests': [
+            {'url': '/customers/'}, {'url': '/quotes/'}, {'url': '/projects/'},
+            {'method': 'POST', 'url': '/customers/', 'body': {'name': 'Jardín Norte'}},
+            {'url': '/customers/'},
+        ]}, format='json')
+    
+    statuses = [item['status'] for item in response.data['responses']]
+    assert statuses == [200, 200, 200, 201, 200]
+    assert response.data['responses'][0]['body']['count'] == 1
+    assert response.data['responses'][4]['body']['count'] == 2
+    assert all(name.startswith('batch') for name in threads[:3])
+    assert not threads[3].startswith('batch') and not threads[4].startswith('batch')
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+    SERVER_TIMING = re.compile(
+        r'db;dur=[\d.]+;desc="(\d+) queries, (\d+) duplicates", serialize;dur=([\d.]+), '
+        r'render;dur=([\d.]+), total;dur=([\d.]+)'
+    )
+    
+    @pytest.fixture(autouse=True)
+    def sampled(self, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+    
+    def test_header_breaks_down_the_request(self, authenticated_client):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Vivero Central')
+        Quote.objects.bulk_create(Quote(customer=customer) for _ in range(5))
+        
+        with mock.patch.object(timing.logger, 'info') as log:
+            response = client.get('/api/quotes/')
+        
+        queries, duplicates, serialize, render, total = self.SERVER_TIMING.fullmatch(response['Server-Timing']).groups()
+        assert (queries, duplicates) == ('2', '0')
+        assert 0 < float(serialize) < float(total) and 0 < float(render) < float(total)
+        line = json.loads(log.call_args.args[0])
+        assert line['path'] == '/api/quotes/' and line['status'] == 200
+        assert line['queries'] == 2 and 'most_repeated' not in line
+    
+    def test_repeated_statements_are_reported(self, rf):
+        def view(request):
+            for name in ('Ana', 'Beto', 'Carla'):
+                Customer.objects.filter(name=name).exists()
+            return HttpResponse()
+        
+        with mock.patch.object(timing.logger, 'info') as log:
+            response = timing.ServerTimingMiddleware(view)(rf.get('/api/customers/'))
+        
+        assert self.SERVER_TIMING.fullmatch(response['Server-Timing']).groups()[:2] == ('3', '2')
+        line = json.loads(log.call_args.args[0])
+        assert line['duplicate_queries'] == 2 and line['most_repeated']['count'] == 3
+        assert 'customers_customer' in line['most_repeated']['sql']
+    
+    def test_unsampled_requests_are_left_alone(self, authenticated_client, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        client, user = authenticated_client
+        with mock.patch.object(timing.logger, 'info') as log:
+            response = client.get('/api/quotes/')
+        assert 'Server-Timing' not in response and not log.called
+
+
 @pytest.mark.django_db
 class TestDashboardEndpoint:
     def test_dashboard_stats(self, authenticated_client):
@@ -96,6 +1685,258 @@ class TestDashboardEndpoint:
         assert response.status_code == status.HTTP_200_OK
         assert 'leads' in response.data
         assert 'opportunities_by_stage' in response.data
+    
+    def test_dashboard_stats_single_pass_and_cached(self, authenticated_client, django_assert_num_queries):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Hotel Paradise')
+        Lead.objects.create(name='Laura Martínez', status='NEW')
+        Lead.objects.create(name='Pedro Sánchez', status='QUALIFIED')
+        Opportunity.objects.create(customer=customer, title='Jardín', stage='NEW', value_estimate=1000)
+        Opportunity.objects.create(customer=customer, title='Riego', stage='WON', value_estimate=500)
+        Quote.objects.create(customer=customer, status='SENT')
+        Activity.objects.create(notes='Llamar')
+        
+        # One aggregate query per table.
+        with django_assert_num_queries(4):
+            response = client.get('/api/dashboard/stats/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.data == {
+            'leads': {'new': 1, 'qualified': 1},
+            'opportunities_by_stage': {
+                'NEW': 1, 'CONTACTED': 0, 'VISIT_SCHEDULED': 0, 'QUOTE_SENT': 0,
+                'NEGOTIATION': 0, 'WON': 1, 'LOST': 0,
+            },
+            'total_pipeline_value': 1000.0,
+            'quotes': {'draft': 0, 'sent': 1},
+            'activities_pending': 1,
+        }
+        
+        with django_assert_num_queries(0):
+            response = client.get('/api/dashboard/stats/')
+        assert response['X-Cache'] == 'HIT'
+        assert int(response['Age']) >= 0
+        
+        Lead.objects.create(name='Empresa ABC', status='NEW')
+        response = client.get('/api/dashboard/stats/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['leads']['new'] == 2
+    
+    def test_stats_cached_before_commit_are_dropped_after_it(
+        self, authenticated_client, django_capture_on_commit_callbacks
+    ):
+        client, user = authenticated_client
+        with django_capture_on_commit_callbacks(execute=True):
+            Lead.objects.create(name='Laura Martínez', status='NEW')
+            # Another process computing the stats between the save and the commit.
+            assert client.get('/api/dashboard/stats/')['X-Cache'] == 'MISS'
+        assert client.get('/api/dashboard/stats/')['X-Cache'] == 'MISS'
+    
+    def test_dashboard_stats_scoped_to_me(self, authenticated_client, django_user_model):
+        client, user = authenticated_client
+        other = django_user_model.objects.create_user(email='otro@test.com', password='x')
+        customer = Customer.objects.create(name='Hotel Paradise')
+        Opportunity.objects.create(customer=customer, title='Mía', stage='NEW', assigned_to=user)
+        Opportunity.objects.create(customer=customer, title='Ajena', stage='NEW', assigned_to=other)
+        
+        assert client.get('/api/dashboard/stats/').data['opportunities_by_stage']['NEW'] == 2
+        response = client.get('/api/dashboard/stats/', {'assigned_to': 'me'})
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['opportunities_by_stage']['NEW'] == 1
+
+
+@pytest.mark.django_db
+class TestListQueryCounts:
+    """List endpoints must run a fixed number of queries whatever the page size."""
+    
+    # One COUNT for the paginator plus one SELECT for the page.
+    EXPECTED_QUERIES = 2
+    
+    @pytest.fixture(autouse=True)
+    def page_size(self, request, monkeypatch):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', request.param)
+        return request.param
+    
+    @pytest.mark.parametrize('page_size', [1, 20, 200], indirect=True)
+    def test_customers_list(self, authenticated_client, page_size, django_assert_num_queries):
+        client, user = authenticated_client
+        customers = Customer.objects.bulk_create(
+            Customer(name=f'Cliente {i}') for i in range(page_size)
+        )
+        Contact.objects.bulk_create(
+            Contact(customer=customer, name=f'Contacto {n}')
+            for customer in customers for n in range(2)
+        )
+        
+        with django_assert_num_queries(self.EXPECTED_QUERIES):
+            response = client.get('/api/customers/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == page_size
+        assert all(row['contacts_count'] == 2 for row in response.data['results'])
+    
+    @pytest.mark.parametrize('page_size', [1, 20, 200], indirect=True)
+    def test_projects_list(self, authenticated_client, page_size, django_assert_num_queries):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Country Club Norte')
+        projects = Project.objects.bulk_create(
+            Project(customer=customer, title=f'Proyecto {i}') for i in range(page_size)
+        )
+        ProjectMedia.objects.bulk_create(
+            ProjectMedia(project=project, url='https://example.com/foto.jpg')
+            for project in projects
+        )
+        
+        with django_assert_num_queries(self.EXPECTED_QUERIES):
+            response = client.get('/api/projects/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == page_size
+        row = response.data['results'][0]
+        assert row['customer_name'] == 'Country Club Norte'
+        assert row['media_count'] == 1
+    
+    @pytest.mark.parametrize('page_size', [1, 20, 200], indirect=True)
+    def test_quotes_list(self, authenticated_client, page_size, django_assert_num_queries):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Hotel Paradise')
+        quotes = Quote.objects.bulk_create(
+            Quote(customer=customer) for i in range(page_size)
+        )
+        QuoteItem.objects.bulk_create(
+            QuoteItem(quote=quote, name=f'Item {n}', qty=1, unit_price=100)
+            for quote in quotes for n in range(3)
+        )
+        
+        with django_assert_num_queries(self.EXPECTED_QUERIES):
+            response = client.get('/api/quotes/')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == page_size
+        row = response.data['results'][0]
+        assert row['customer_name'] == 'Hotel Paradise'
+        assert row['items_count'] == 3
+
+
+@pytest.mark.django_db
+class TestPagination:
+    @pytest.fixture
+    def activities(self):
+        due = timezone.now()
+        # Duplicate and NULL due dates exercise the id tiebreak and NULL handling.
+        return Activity.objects.bulk_create(
+            Activity(notes=f'Actividad {i}', due_at=None if i % 4 == 0 else due - timedelta(days=i % 3))
+            for i in range(23)
+        )
+    
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.data
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+    
+    def test_limit_and_page_size_are_honoured(self, authenticated_client, activities):
+        client, user = authenticated_client
+        assert len(client.get('/api/activities/', {'limit': 5}).data['results']) == 5
+        assert len(client.get('/api/activities/', {'page_size': 7}).data['results']) == 7
+        assert client.get('/api/activities/', {'page_size': 7}).data['count'] == 23
+    
+    def test_cursor_mode_matches_page_mode_order(self, authenticated_client, activities):
+        client, user = authenticated_client
+        expected = [row['id'] for row in client.get('/api/activities/', {'page_size': 100}).data['results']]
+        expected_by_due = sorted(
+            activities, key=lambda a: (a.due_at is not None, -(a.due_at.timestamp() if a.due_at else 0), -a.id)
+        )
+        
+        ids = self.walk(client, '/api/activities/?pagination=cursor&limit=5')
+        
+        # NULL due dates sort first in descending order, as PostgreSQL does.
+        assert ids == [a.id for a in expected_by_due]
+        assert sorted(ids) == sorted(expected)
+    
+    def test_cursor_mode_follows_ordering_param_and_walks_back(self, authenticated_client, activities):
+        client, user = authenticated_client
+        ids = self.walk(client, '/api/activities/?pagination=cursor&limit=4&ordering=due_at')
+        assert len(ids) == len(set(ids)) == 23
+        
+        last_page = client.get('/api/activities/?pagination=cursor&limit=4&ordering=due_at')
+        for _ in range(2):
+            last_page = client.get(last_page.data['next'])
+        previous = client.get(last_page.data['previous'])
+        
+        assert [row['id'] for row in previous.data['results']] == ids[4:8]
+    
+    def test_cursor_mode_counts_on_request(self, authenticated_client, activities):
+        client, user = authenticated_client
+        # A planner estimate on PostgreSQL, so only its presence is checked.
+        response = client.get('/api/activities/', {'pagination': 'cursor', 'count': 'estimate'})
+        assert isinstance(response.data['count'], int)
+        
+        response = client.get('/api/activities/', {'pagination': 'cursor', 'count': 'exact', 'limit': 5})
+        assert response.data['count'] == 23
+        assert len(response.data['results']) == 5
+    
+    def test_invalid_cursor(self, authenticated_client):
+        client, user = authenticated_client
+        response = client.get('/api/leads/', {'cursor': 'no-es-un-cursor'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestSearch:
+    def search(self, client, url, term):
+        response = client.get(url, {'search': term})
+        assert response.status_code == status.HTTP_200_OK
+        return [row['id'] for row in response.data['results']]
+    
+    def test_accented_names_match_unaccented_queries(self, authenticated_client):
+        client, user = authenticated_client
+        perez = Customer.objects.create(name='Juan Pérez')
+        fernandez = Customer.objects.create(name='Roberto Fernández', email='roberto.f@email.com')
+        Customer.objects.create(name='María García')
+        
+        assert self.search(client, '/api/customers/', 'perez') == [perez.id]
+        assert self.search(client, '/api/customers/', 'FERNANDEZ') == [fernandez.id]
+        assert self.search(client, '/api/customers/', 'Fernández roberto.f') == [fernandez.id]
+        assert self.search(client, '/api/customers/', 'gonzalez') == []
+    
+    def test_related_customer_name_is_denormalized_and_reindexed(self, authenticated_client):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Hotel Paradise')
+        opportunity = Opportunity.objects.create(customer=customer, title='Rediseño jardines')
+        quote = Quote.objects.create(customer=customer, notes='Cotización inicial')
+        
+        assert self.search(client, '/api/opportunities/', 'paradise') == [opportunity.id]
+        assert self.search(client, '/api/opportunities/', 'rediseno') == [opportunity.id]
+        
+        customer.name = 'Hotel Edén'
+        customer.save()
+        
+        assert self.search(client, '/api/opportunities/', 'paradise') == []
+        assert self.search(client, '/api/opportunities/', 'eden') == [opportunity.id]
+        assert self.search(client, '/api/quotes/', 'eden cotizacion') == [quote.id]
+    
+    def test_deleted_rows_leave_the_index(self, authenticated_client):
+        client, user = authenticated_client
+        item = CatalogItem.objects.create(name='Césped Bermuda (m2)', category='Césped')
+        
+        assert self.search(client, '/api/catalog/', 'cesped') == [item.id]
+        item.delete()
+        assert not SearchEntry.objects.exists()
+    
+    def test_rebuild_command_indexes_existing_rows(self, authenticated_client):
+        client, user = authenticated_client
+        customer = Customer.objects.create(name='Country Club Norte')
+        Project.objects.create(customer=customer, title='Mantenimiento', description='Poda de árboles')
+        SearchEntry.objects.all().delete()
+        
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        
+        assert SearchEntry.objects.count() == 2
+        assert len(self.search(client, '/api/projects/', 'arboles norte')) == 1
 
 
 @pytest.mark.django_db
@@ -3,6 +3,15 @@ import { TokenResponse } from '../types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
+export interface BatchGet {
+    url: string;
+    params?: Record<string, string>;
+}
+
+interface BatchResponse {
+    responses: { status: number; headers: Record<string, string>; body: unknown }[];
+}
+
 class ApiClient {
     private client: AxiosInstance;
 
@@ -87,6 +96,21 @@ class ApiClient {
         return response.data;
     }
 
+    // Several GETs in one round trip (POST /batch/); rejects if any of them failed
+    async getMany<T extends unknown[]>(requests: { [K in keyof T]: BatchGet }): Promise<T> {
+        const response = await this.client.post<BatchResponse>('/batch/', {
+            requests: requests.map(({ url, params }) => {
+                const query = new URLSearchParams(params).toString();
+                return { method: 'GET', url: query ? `${url}?${query}` : url };
+            }),
+        });
+        const failed = response.data.responses.find((item) => item.status >= 400);
+        if (failed) {
+            throw new Error(`Batch request failed with status ${failed.status}`);
+        }
+        return response.data.responses.map((item) => item.body) as T;
+    }
+
     async post<T>(url: string, data?: unknown): Promise<T> {
         const response = await this.client.post<T>(url, data);
         return response.data;
@@ -106,10 +130,17 @@ class ApiClient {
         await this.client.delete(url);
     }
 
+    // File download
+    async getBlob(url: string): Promise<Blob> {
+        const response = await this.client.get<Blob>(url, { responseType: 'blob' });
+        return response.data;
+    }
+
     // File upload
-    async uploadFile<T>(url: string, file: File): Promise<T> {
+    async uploadFile<T>(url: string, file: File, fields: Record<string, string> = {}): Promise<T> {
         const formData = new FormData();
         formData.append('file', file);
+        Object.entries(fields).forEach(([name, value]) => formData.append(name, value));
 
         const response = await this.client.post<T>(url, formData, {
             headers: {
@@ -15,7 +15,7 @@ export default function CustomerDetail() {
     useEffect(() => {
         const fetchCustomer = async () => {
             try {
-                const data = await api.get<Customer>(`/customers/${id}/`);
+                const data = await api.get<Customer>(`/customers/${id}/?expand=contacts,addresses`);
                 setCustomer(data);
             } catch (error) {
                 console.error('Error fetching customer:', error);
@@ -15,9 +15,12 @@ export default function History() {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [oppsData, projectsData] = await Promise.all([
-                    api.get<PaginatedResponse<Opportunity>>('/opportunities/'),
-                    api.get<PaginatedResponse<Project>>('/projects/'),
+                const [oppsData, projectsData] = await api.getMany<[
+                    PaginatedResponse<Opportunity>,
+                    PaginatedResponse<Project>,
+                ]>([
+                    { url: '/opportunities/' },
+                    { url: '/projects/' },
                 ]);
 
                 const opps = oppsData.results || [];
@@ -1,12 +1,15 @@
 import { useState } from 'react';
 import { api } from '../api/client';
-import { ImportResponse } from '../types';
+import { ImportJob } from '../types';
+
+const POLL_INTERVAL_MS = 1000;
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
 export default function ImportData() {
     const [customerFile, setCustomerFile] = useState<File | null>(null);
     const [leadFile, setLeadFile] = useState<File | null>(null);
     const [isLoading, setIsLoading] = useState(false);
-    const [result, setResult] = useState<{ type: string; data: ImportResponse } | null>(null);
+    const [result, setResult] = useState<{ type: string; data: ImportJob } | null>(null);
     const [error, setError] = useState<string | null>(null);
 
     const handleImport = async (type: 'customers' | 'leads', file: File | null) => {
@@ -17,10 +20,22 @@ export default function ImportData() {
         setResult(null);
 
         try {
-            const data = await api.uploadFile<ImportResponse>(`/import/${type}/`, file);
-            setResult({ type, data });
+            let job = await api.uploadFile<ImportJob>(`/import/${type}/`, file);
             if (type === 'customers') setCustomerFile(null);
             if (type === 'leads') setLeadFile(null);
+
+            // The import runs in the background; poll until it finishes
+            while (job.status === 'PENDING' || job.status === 'RUNNING') {
+                setResult({ type, data: job });
+                await sleep(POLL_INTERVAL_MS);
+                job = await api.get<ImportJob>(`/import/jobs/${job.id}/`);
+            }
+
+            if (job.status === 'FAILED') {
+                setError(`Error al importar ${type === 'customers' ? 'clientes' : 'leads'}: ${job.error_message}`);
+            } else {
+                setResult({ type, data: job });
+            }
         } catch (err) {
             setError(`Error al importar ${type === 'customers' ? 'clientes' : 'leads'}`);
         } finally {
@@ -41,12 +56,19 @@ export default function ImportData() {
 
             {error && <div className="alert alert-error">{error}</div>}
 
-            {result && (
+            {result && result.data.status !== 'DONE' && (
+                <div className="alert alert-info">
+                    <strong>Importando...</strong> {result.data.rows_processed} filas procesadas
+                    ({result.data.rows_per_second} filas/s).
+                </div>
+            )}
+
+            {result && result.data.status === 'DONE' && (
                 <div className="alert alert-success">
-                    <strong>¡Importación exitosa!</strong> Se crearon {result.data.created} {result.type === 'customers' ? 'clientes' : 'leads'}.
-                    {result.data.errors.length > 0 && (
+                    <strong>¡Importación exitosa!</strong> Se crearon {result.data.rows_created} {result.type === 'customers' ? 'clientes' : 'leads'}.
+                    {result.data.errors_count > 0 && (
                         <div style={{ marginTop: '0.5rem' }}>
-                            <strong>Errores ({result.data.errors.length}):</strong>
+                            <strong>Errores ({result.data.errors_count}):</strong>
                             <ul style={{ marginTop: '0.25rem', paddingLeft: '1.5rem' }}>
                                 {result.data.errors.map((err, i) => (
                                     <li key={i}>{err}</li>
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { api } from '../api/client';
-import { Opportunity, PaginatedResponse, OpportunityStage, Customer } from '../types';
+import { PaginatedResponse, OpportunityStage, Customer, PipelineBoard, PipelineColumn } from '../types';
 
 const STAGES: { key: OpportunityStage; label: string; color: string }[] = [
     { key: 'NEW', label: 'Nuevos', color: '#1976d2' },
@@ -13,7 +13,7 @@ const STAGES: { key: OpportunityStage; label: string; color: string }[] = [
 ];
 
 export default function Pipeline() {
-    const [opportunities, setOpportunities] = useState<Opportunity[]>([]);
+    const [columns, setColumns] = useState<Partial<Record<OpportunityStage, PipelineColumn>>>({});
     const [customers, setCustomers] = useState<Customer[]>([]);
     const [isLoading, setIsLoading] = useState(true);
     const [showModal, setShowModal] = useState(false);
@@ -25,8 +25,8 @@ export default function Pipeline() {
 
     const fetchOpportunities = async () => {
         try {
-            const data = await api.get<PaginatedResponse<Opportunity>>('/opportunities/');
-            setOpportunities(data.results || []);
+            const data = await api.get<PipelineBoard>('/opportunities/board/');
+            setColumns(Object.fromEntries(data.stages.map(column => [column.stage, column])));
         } catch (error) {
             console.error('Error fetching opportunities:', error);
         } finally {
@@ -68,20 +68,28 @@ export default function Pipeline() {
     const handleStageChange = async (opportunityId: number, newStage: OpportunityStage) => {
         try {
             await api.post(`/opportunities/${opportunityId}/change_stage/`, { stage: newStage });
-            setOpportunities(prev =>
-                prev.map(opp =>
-                    opp.id === opportunityId ? { ...opp, stage: newStage } : opp
-                )
-            );
+            fetchOpportunities();
         } catch (error) {
             console.error('Error changing stage:', error);
         }
     };
 
-    const getOpportunitiesByStage = (stage: OpportunityStage) => {
-        return opportunities.filter(opp => opp.stage === stage);
+    const handleLoadMore = async (column: PipelineColumn) => {
+        if (!column.next) return;
+        try {
+            const data = await api.get<PipelineBoard>(column.next);
+            const more = data.stages[0];
+            setColumns(prev => ({
+                ...prev,
+                [column.stage]: { ...more, results: [...column.results, ...more.results] }
+            }));
+        } catch (error) {
+            console.error('Error loading opportunities:', error);
+        }
     };
 
+    const totalCount = Object.values(columns).reduce((sum, column) => sum + (column?.count || 0), 0);
+
     const formatCurrency = (value: number) => {
         return new Intl.NumberFormat('es-AR', {
             style: 'currency',
@@ -100,7 +108,7 @@ export default function Pipeline() {
                 <h1>🎯 Seguimiento de Ventas</h1>
                 <div style={{ display: 'flex', alignItems: 'center', gap: '1rem' }}>
                     <span style={{ color: '#6c757d' }}>
-                        {opportunities.length} oportunidades
+                        {totalCount} oportunidades
                     </span>
                     <button className="btn btn-primary" onClick={() => setShowModal(true)}>
                         ➕ Nueva Oportunidad
@@ -110,8 +118,9 @@ export default function Pipeline() {
 
             <div className="pipeline-board">
                 {STAGES.map(stage => {
-                    const stageOpps = getOpportunitiesByStage(stage.key);
-                    const stageValue = stageOpps.reduce((sum, o) => sum + Number(o.value_estimate), 0);
+                    const column = columns[stage.key];
+                    const stageOpps = column?.results || [];
+                    const stageValue = Number(column?.total_value || 0);
 
                     return (
                         <div key={stage.key} className="pipeline-column">
@@ -125,7 +134,7 @@ export default function Pipeline() {
                                     }}></span>
                                     {stage.label}
                                 </h4>
-                                <span className="pipeline-count">{stageOpps.length}</span>
+                                <span className="pipeline-count">{column?.count || 0}</span>
                             </div>
 
                             {stageValue > 0 && (
@@ -191,6 +200,16 @@ export default function Pipeline() {
                                 </div>
                             ))}
 
+                            {column?.next && (
+                                <button
+                                    className="btn btn-sm btn-secondary"
+                                    style={{ width: '100%' }}
+                                    onClick={() => handleLoadMore(column)}
+                                >
+                                    Ver más ({column.count - stageOpps.length})
+                                </button>
+                            )}
+
                             {stageOpps.length === 0 && (
                                 <div style={{
                                     textAlign: 'center',
@@ -9,10 +9,11 @@ export default function ProjectDetail() {
     const [isLoading, setIsLoading] = useState(true);
     const [showMediaModal, setShowMediaModal] = useState(false);
     const [newMedia, setNewMedia] = useState({ media_type: 'PROGRESS', url: '', caption: '' });
+    const [mediaFile, setMediaFile] = useState<File | null>(null);
 
     const fetchProject = async () => {
         try {
-            const data = await api.get<Project>(`/projects/${id}/`);
+            const data = await api.get<Project>(`/projects/${id}/?expand=media`);
             setProject(data);
         } catch (error) {
             console.error('Error fetching project:', error);
@@ -28,9 +29,18 @@ export default function ProjectDetail() {
     const handleAddMedia = async (e: React.FormEvent) => {
         e.preventDefault();
         try {
-            await api.post('/project-media/', { ...newMedia, project: Number(id) });
+            if (mediaFile) {
+                await api.uploadFile('/project-media/upload/', mediaFile, {
+                    project: String(id),
+                    media_type: newMedia.media_type,
+                    caption: newMedia.caption,
+                });
+            } else {
+                await api.post('/project-media/', { ...newMedia, project: Number(id) });
+            }
             setShowMediaModal(false);
             setNewMedia({ media_type: 'PROGRESS', url: '', caption: '' });
+            setMediaFile(null);
             fetchProject();
         } catch (error) {
             console.error('Error adding media:', error);
@@ -128,7 +138,7 @@ export default function ProjectDetail() {
                                     {groupedMedia.BEFORE.map(media => (
                                         <div key={media.id} style={{ position: 'relative' }}>
                                             <img
-                                                src={media.url}
+                                                src={media.thumbnails?.medium || media.url}
                                                 alt={media.caption || 'Antes'}
                                                 style={{ width: '100%', height: '150px', objectFit: 'cover', borderRadius: '8px' }}
                                                 onError={(e) => { (e.target as HTMLImageElement).src = 'https://via.placeholder.com/200x150?text=Error'; }}
@@ -154,7 +164,7 @@ export default function ProjectDetail() {
                                     {groupedMedia.PROGRESS.map(media => (
                                         <div key={media.id} style={{ position: 'relative' }}>
                                             <img
-                                                src={media.url}
+                                                src={media.thumbnails?.medium || media.url}
                                                 alt={media.caption || 'Progreso'}
                                                 style={{ width: '100%', height: '150px', objectFit: 'cover', borderRadius: '8px' }}
                                                 onError={(e) => { (e.target as HTMLImageElement).src = 'https://via.placeholder.com/200x150?text=Error'; }}
@@ -180,7 +190,7 @@ export default function ProjectDetail() {
                                     {groupedMedia.AFTER.map(media => (
                                         <div key={media.id} style={{ position: 'relative' }}>
                                             <img
-                                                src={media.url}
+                                                src={media.thumbnails?.medium || media.url}
                                                 alt={media.caption || 'Después'}
                                                 style={{ width: '100%', height: '150px', objectFit: 'cover', borderRadius: '8px' }}
                                                 onError={(e) => { (e.target as HTMLImageElement).src = 'https://via.placeholder.com/200x150?text=Error'; }}
@@ -260,19 +270,30 @@ export default function ProjectDetail() {
                                 </select>
                             </div>
                             <div className="form-group">
-                                <label>URL de la imagen *</label>
+                                <label>Archivo</label>
                                 <input
-                                    type="url"
+                                    type="file"
                                     className="form-control"
-                                    value={newMedia.url}
-                                    onChange={(e) => setNewMedia({ ...newMedia, url: e.target.value })}
-                                    placeholder="https://..."
-                                    required
+                                    accept="image/jpeg,image/png,image/webp,image/gif"
+                                    onChange={(e) => setMediaFile(e.target.files?.[0] || null)}
                                 />
-                                <small style={{ color: 'var(--color-text-light)' }}>
-                                    Ingresa la URL de una imagen (puedes usar Imgur, Google Drive, etc.)
-                                </small>
                             </div>
+                            {!mediaFile && (
+                                <div className="form-group">
+                                    <label>URL de la imagen *</label>
+                                    <input
+                                        type="url"
+                                        className="form-control"
+                                        value={newMedia.url}
+                                        onChange={(e) => setNewMedia({ ...newMedia, url: e.target.value })}
+                                        placeholder="https://..."
+                                        required
+                                    />
+                                    <small style={{ color: 'var(--color-text-light)' }}>
+                                        Sube una foto o ingresa la URL de una imagen (Imgur, Google Drive, etc.)
+                                    </small>
+                                </div>
+                            )}
                             <div className="form-group">
                                 <label>Descripción</label>
                                 <input
@@ -24,10 +24,14 @@ export default function Projects() {
                 const params: Record<string, string> = {};
                 if (statusFilter) params.status = statusFilter;
 
-                const [projectsData, customersData, quotesData] = await Promise.all([
-                    api.get<PaginatedResponse<Project>>('/projects/', params),
-                    api.get<PaginatedResponse<Customer>>('/customers/'),
-                    api.get<PaginatedResponse<Quote>>('/quotes/', { status: 'ACCEPTED' }),
+                const [projectsData, customersData, quotesData] = await api.getMany<[
+                    PaginatedResponse<Project>,
+                    PaginatedResponse<Customer>,
+                    PaginatedResponse<Quote>,
+                ]>([
+                    { url: '/projects/', params },
+                    { url: '/customers/' },
+                    { url: '/quotes/', params: { status: 'ACCEPTED' } },
                 ]);
                 setProjects(projectsData.results || []);
                 setCustomers(customersData.results || []);
@@ -1,10 +1,11 @@
 import { useState, useEffect } from 'react';
-import { useParams, Link } from 'react-router-dom';
+import { useParams, Link, useNavigate } from 'react-router-dom';
 import { api } from '../api/client';
-import { Quote, QuoteItem, CatalogItem, PaginatedResponse } from '../types';
+import { Quote, QuoteItem, CatalogItem, CatalogSnapshot } from '../types';
 
 export default function QuoteDetail() {
     const { id } = useParams<{ id: string }>();
+    const navigate = useNavigate();
     const [quote, setQuote] = useState<Quote | null>(null);
     const [catalog, setCatalog] = useState<CatalogItem[]>([]);
     const [isLoading, setIsLoading] = useState(true);
@@ -19,8 +20,9 @@ export default function QuoteDetail() {
     const fetchQuote = async () => {
         try {
             const [quoteData, catalogData] = await Promise.all([
-                api.get<Quote>(`/quotes/${id}/`),
-                api.get<PaginatedResponse<CatalogItem>>('/catalog/', { active: 'true' }),
+                api.get<Quote>(`/quotes/${id}/?expand=items`),
+                // Whole active catalog; revalidated by the browser with its ETag.
+                api.get<CatalogSnapshot>('/catalog/snapshot/'),
             ]);
             setQuote(quoteData);
             setCatalog(catalogData.results || []);
@@ -66,8 +68,27 @@ export default function QuoteDetail() {
         }
     };
 
+    const handleDownloadPdf = async () => {
+        try {
+            const blob = await api.getBlob(`/quotes/${id}/pdf/`);
+            window.open(URL.createObjectURL(blob), '_blank');
+        } catch (error) {
+            console.error('Error downloading PDF:', error);
+        }
+    };
+
+    const handleDuplicate = async () => {
+        try {
+            const copy = await api.post<Quote>('/quotes/clone/', { quote: Number(id) });
+            navigate(`/quotes/${copy.id}`);
+        } catch (error) {
+            console.error('Error duplicating quote:', error);
+        }
+    };
+
     const handleCatalogSelect = (catalogItem: CatalogItem) => {
         setNewItem({
+            catalog_item: catalogItem.id,
             item_type: catalogItem.type,
             name: catalogItem.name,
             qty: 1,
@@ -101,6 +122,12 @@ export default function QuoteDetail() {
                     <h1 style={{ marginTop: '0.5rem' }}>📋 COT-{String(quote.id).padStart(4, '0')}</h1>
                 </div>
                 <div style={{ display: 'flex', gap: '0.5rem' }}>
+                    <button className="btn btn-secondary" onClick={handleDownloadPdf}>
+                        📄 PDF
+                    </button>
+                    <button className="btn btn-secondary" onClick={handleDuplicate}>
+                        📑 Duplicar
+                    </button>
                     {quote.status === 'DRAFT' && (
                         <button className="btn btn-primary" onClick={() => handleStatusChange('SENT')}>
                             📤 Marcar como Enviada
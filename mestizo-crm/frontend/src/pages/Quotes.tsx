@@ -18,10 +18,14 @@ export default function Quotes() {
                 const params: Record<string, string> = {};
                 if (statusFilter) params.status = statusFilter;
 
-                const [quotesData, customersData, opportunitiesData] = await Promise.all([
-                    api.get<PaginatedResponse<Quote>>('/quotes/', params),
-                    api.get<PaginatedResponse<Customer>>('/customers/'),
-                    api.get<PaginatedResponse<Opportunity>>('/opportunities/'),
+                const [quotesData, customersData, opportunitiesData] = await api.getMany<[
+                    PaginatedResponse<Quote>,
+                    PaginatedResponse<Customer>,
+                    PaginatedResponse<Opportunity>,
+                ]>([
+                    { url: '/quotes/', params },
+                    { url: '/customers/' },
+                    { url: '/opportunities/' },
                 ]);
                 setQuotes(quotesData.results || []);
                 setCustomers(customersData.results || []);
@@ -77,6 +77,20 @@ export interface Opportunity {
     created_at: string;
 }
 
+export interface PipelineColumn {
+    stage: OpportunityStage;
+    stage_display: string;
+    count: number;
+    total_value: number;
+    results: Opportunity[];
+    next: string | null;
+    previous: string | null;
+}
+
+export interface PipelineBoard {
+    stages: PipelineColumn[];
+}
+
 // Activity types
 export interface Activity {
     id: number;
@@ -112,6 +126,7 @@ export interface Quote {
 export interface QuoteItem {
     id?: number;
     quote?: number;
+    catalog_item?: number | null;
     item_type: 'PRODUCT' | 'SERVICE';
     name: string;
     description?: string;
@@ -145,6 +160,10 @@ export interface ProjectMedia {
     media_type_display?: string;
     url: string;
     caption?: string;
+    width?: number | null;
+    height?: number | null;
+    file_size?: number | null;
+    thumbnails?: Partial<Record<'small' | 'medium' | 'large', string>>;
 }
 
 // Catalog types
@@ -159,6 +178,12 @@ export interface CatalogItem {
     active: boolean;
 }
 
+export interface CatalogSnapshot {
+    version: number;
+    count: number;
+    results: CatalogItem[];
+}
+
 // Dashboard stats
 export interface DashboardStats {
     leads: {
@@ -187,7 +212,21 @@ export interface TokenResponse {
     refresh: string;
 }
 
-export interface ImportResponse {
-    created: number;
+export type ImportJobStatus = 'PENDING' | 'RUNNING' | 'DONE' | 'FAILED';
+
+export interface ImportJob {
+    id: number;
+    kind: 'CUSTOMERS' | 'LEADS';
+    kind_display?: string;
+    status: ImportJobStatus;
+    status_display?: string;
+    rows_processed: number;
+    rows_created: number;
+    rows_per_second: number;
+    errors_count: number;
     errors: string[];
+    error_message: string;
+    created_at: string;
+    started_at: string | null;
+    finished_at: string | null;
 }